@@ -8,7 +8,6 @@ echo "FINALIZADO A INSTALAÇÃO DAS DEPENDENCIAS"
 echo "INICIANDO A CRIAÇÃO DA PASTA STATICFILES E MIGRACOES"
 # Use o python versionado
 python3.12 manage.py collectstatic --noinput --clear -v 3
-python3.12 manage.py makemigrations --noinput
 python3.12 manage.py migrate --noinput
 echo "FINALIZADO A CRIAÇÃO DA PASTA STATICFILES E MIGRACOES"
 
@@ -0,0 +1,166 @@
+from collections import defaultdict, namedtuple
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Sum
+from django.utils import timezone
+
+from .conditional import bump_data_version
+from .models import Account, AccountBalance, AccountEntry, Category, DailyBalance, Transfer
+from .money import cents_to_decimal, decimal_to_cents
+from .upsert import lock_rows
+
+ZERO = Decimal('0.00')
+
+DAILY_KEY_FIELDS = ('account_id', 'date')
+
+# Dados mínimos de uma transferência necessários para atualizar os saldos.
+TransferSnapshot = namedtuple('TransferSnapshot', ['account_origin_id', 'account_destination_id', 'value', 'date'])
+
+
+# ===============================================
+# CONSULTAS O(1)
+# ===============================================
+def account_balance(account_id):
+    """Saldo atual de uma conta (uma leitura pela chave primária)."""
+    return (AccountBalance.objects.filter(account_id=account_id)
+            .values_list('balance', flat=True).first()) or ZERO
+
+
+def net_worth():
+    """Patrimônio líquido: soma dos saldos de todas as contas (uma linha por conta), em centavos."""
+    return cents_to_decimal(AccountBalance.objects.aggregate(total=Sum('balance_cents'))['total'])
+
+
+def balance_history(account_id, date_from=None, date_to=None):
+    """
+    Lista de (data, saldo ao final do dia) para os dias com movimento. O histórico guarda só o
+    movimento de cada dia; o saldo é a soma acumulada, feita aqui na leitura (uma consulta).
+    """
+    history, closing = [], 0
+    days = DailyBalance.objects.filter(account_id=account_id)
+    if date_to:
+        days = days.filter(date__lte=date_to)
+    for day, cents in days.order_by('date').values_list('date', 'delta_cents'):
+        closing += cents
+        if date_from is None or day >= date_from:
+            history.append((day, cents_to_decimal(closing)))
+    return history
+
+
+# ===============================================
+# CÁLCULO DOS MOVIMENTOS (conta, dia) -> centavos
+# ===============================================
+def entry_deltas(added=(), removed=()):
+    """Receitas somam e despesas subtraem do saldo da conta na data de competência."""
+    entries = [(1, entry) for entry in added] + [(-1, entry) for entry in removed]
+    if not entries:
+        return {}
+    category_types = dict(Category.objects.filter(pk__in={entry.category_id for _, entry in entries})
+                          .values_list('id', 'type'))
+    deltas = defaultdict(int)
+    for sign, entry in entries:
+        direction = 1 if category_types.get(entry.category_id) == 'R' else -1
+        deltas[(entry.account_id, entry.competence_date)] += sign * direction * decimal_to_cents(entry.value)
+    return deltas
+
+
+def transfer_deltas(added=(), removed=()):
+    """Transferências saem da conta de origem e entram na conta de destino."""
+    deltas = defaultdict(int)
+    for sign, transfers in ((1, added), (-1, removed)):
+        for transfer in transfers:
+            cents = sign * decimal_to_cents(transfer.value)
+            deltas[(transfer.account_origin_id, transfer.date)] -= cents
+            deltas[(transfer.account_destination_id, transfer.date)] += cents
+    return deltas
+
+
+# ===============================================
+# ATUALIZAÇÃO INCREMENTAL
+# ===============================================
+def lock_accounts(account_ids):
+    """
+    Bloqueia (SELECT ... FOR UPDATE) as contas até o fim da transação. Atualizações incrementais
+    e reconstruções das mesmas contas passam por aqui primeiro e, assim, rodam uma de cada vez.
+    """
+    return list(Account.objects.select_for_update().filter(pk__in=account_ids).values_list('pk', flat=True))
+
+
+def apply_deltas(deltas):
+    """
+    Soma os movimentos ao histórico diário e ao saldo atual com custo fixo de consultas: só as
+    linhas dos dias e contas tocados são bloqueadas (ou criadas) por lock_rows e regravadas.
+    Um lançamento retroativo não reescreve os dias seguintes, porque cada dia guarda apenas o
+    seu movimento líquido. Os movimentos chegam em centavos e são somados às colunas *_cents das
+    linhas lidas; o Decimal só aparece na gravação.
+    """
+    deltas = {key: cents for key, cents in deltas.items() if cents}
+    if not deltas:
+        return
+    totals = defaultdict(int)
+    for (account_id, _), cents in deltas.items():
+        totals[account_id] += cents
+
+    # Sem savepoint: roda dentro da transação da escrita (save, delete, ledger_batch) e falha com ela.
+    with transaction.atomic(savepoint=False):
+        lock_accounts(totals)
+        days = lock_rows(DailyBalance, DAILY_KEY_FIELDS, deltas, defaults={'delta': ZERO})
+        for key, cents in deltas.items():
+            days[key].delta = cents_to_decimal(days[key].delta_cents + cents)
+        DailyBalance.objects.bulk_update(days.values(), ['delta'])
+
+        balances = lock_rows(AccountBalance, ('account_id',), [(account_id,) for account_id in totals],
+                             defaults={'balance': ZERO})
+        now = timezone.now()
+        for (account_id,), row in balances.items():
+            row.balance = cents_to_decimal(row.balance_cents + totals[account_id])
+            row.updated_at = now
+        AccountBalance.objects.bulk_update(balances.values(), ['balance', 'updated_at'])
+
+
+# ===============================================
+# RECONSTRUÇÃO EM LOTES
+# ===============================================
+def account_daily_movements(account_ids):
+    """Movimento líquido em centavos por (conta, dia), a partir dos lançamentos e transferências."""
+    deltas = defaultdict(int)
+    entries = (AccountEntry.objects.filter(account_id__in=account_ids)
+               .values('account_id', 'competence_date', 'category__type')
+               .annotate(total=Sum('value_cents')).order_by())
+    for row in entries:
+        direction = 1 if row['category__type'] == 'R' else -1
+        deltas[(row['account_id'], row['competence_date'])] += direction * row['total']
+    for field, direction in (('account_origin_id', -1), ('account_destination_id', 1)):
+        transfers = (Transfer.objects.filter(**{f'{field}__in': account_ids})
+                     .values(field, 'date').annotate(total=Sum('value_cents')).order_by())
+        for row in transfers:
+            deltas[(row[field], row['date'])] += direction * row['total']
+    return deltas
+
+
+def rebuild_accounts(account_ids, batch_size=1000):
+    """
+    Recalcula do zero o saldo atual e o histórico diário das contas informadas e muda a versão
+    dos dados no commit (ETag das páginas e cache da previsão). Os movimentos são lidos com as
+    contas bloqueadas: um lançamento gravado durante a reconstrução espera por ela e soma o seu
+    movimento às linhas novas, em vez de ser apagado junto com as antigas.
+    """
+    account_ids = list(account_ids)
+    with transaction.atomic():
+        lock_accounts(account_ids)
+        deltas = account_daily_movements(account_ids)
+        history, totals = [], defaultdict(int)
+        for (account_id, day), cents in sorted(deltas.items()):
+            totals[account_id] += cents
+            history.append(DailyBalance(account_id=account_id, date=day, delta=cents_to_decimal(cents)))
+        DailyBalance.objects.filter(account_id__in=account_ids).delete()
+        DailyBalance.objects.bulk_create(history, batch_size=batch_size)
+        AccountBalance.objects.filter(account_id__in=account_ids).delete()
+        AccountBalance.objects.bulk_create(
+            [AccountBalance(account_id=account_id, balance=cents_to_decimal(totals[account_id]))
+             for account_id in account_ids],
+            batch_size=batch_size,
+        )
+        bump_data_version()
+    return len(history)
@@ -0,0 +1,457 @@
+import json
+import os
+import random
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from dataclasses import replace
+from datetime import timedelta
+from decimal import ROUND_HALF_UP, Decimal
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import OperationalError, connection, transaction
+from django.db.models import Count, Sum
+from django.db.utils import ConnectionHandler
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from financial_management.database import CONNECTION_MODES, SQLITE_PROFILES, database_config
+
+from .models import AccountEntry
+from .money import Money, cents_to_decimal, split_cents
+from .recurrences import generate_due_entries
+from .synthetic import SyntheticSpec, seed_synthetic
+
+DEFAULT_SIZES = (1000, 10000, 100000)
+DEFAULT_REPEAT = 5
+DEFAULT_CONNECTION_REQUESTS = 200
+DEFAULT_CONCURRENCY_SECONDS = 5.0
+DEFAULT_WRITE_PAUSE_MS = 5.0  # intervalo entre escritas de cada escritor (o app não escreve sem parar)
+DEFAULT_MONEY_VALUES = 100000
+
+# Páginas medidas com o cliente de teste (pilha completa: middleware, view e template).
+VIEW_TARGETS = {
+    'dashboard': 'dashboard',
+    'transactions_list': 'transactions_list',
+    'goals_list_create': 'goals_list_create',
+    'recurring_transaction_list_create': 'recurring_transaction_list_create',
+    'account_list_create': 'account_list_create',
+    'category_list_create': 'category_list_create',
+    'forecast': 'forecast',
+}
+TARGETS = [*VIEW_TARGETS, 'generate_recurrences']
+
+
+class _Rollback(Exception):
+    """Desfaz os dados sintéticos de um tamanho ao final da medição."""
+
+
+def spec_for_size(entries, base=None):
+    """Escala as demais quantidades a partir do número de lançamentos."""
+    base = base or SyntheticSpec()
+    return replace(base, entries=entries, transfers=entries // 10, installment_plans=max(entries // 200, 1),
+                   recurrences=max(entries // 100, 10))
+
+
+# ===============================================
+# MEDIÇÃO
+# ===============================================
+def _summary(timings):
+    ordered = sorted(timings)
+    return {
+        'runs': len(ordered),
+        'min_ms': round(ordered[0], 3),
+        'median_ms': round(statistics.median(ordered), 3),
+        'p95_ms': round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))], 3),
+        'max_ms': round(ordered[-1], 3),
+    }
+
+
+def _measure(run, repeat):
+    """Uma execução de aquecimento e `repeat` medidas; as consultas são contadas na última."""
+    run()
+    timings = []
+    for _ in range(repeat):
+        with CaptureQueriesContext(connection) as queries:
+            started = time.perf_counter()
+            run()
+            timings.append((time.perf_counter() - started) * 1000)
+    return {
+        'runs': repeat,
+        'min_ms': round(min(timings), 2),
+        'median_ms': round(statistics.median(timings), 2),
+        'max_ms': round(max(timings), 2),
+        'queries': len(queries.captured_queries),
+    }
+
+
+def _client():
+    host = next((h for h in settings.ALLOWED_HOSTS if h != '*' and not h.startswith('.')), 'localhost')
+    client = Client(SERVER_NAME=host)
+    user, _ = get_user_model().objects.get_or_create(username='benchmark')
+    client.force_login(user)
+    return client
+
+
+def _view_runner(client, url):
+    def run():
+        response = client.get(url)
+        if response.status_code != 200:
+            raise RuntimeError(f"{url} respondeu {response.status_code}")
+    return run
+
+
+def _recurrences_runner():
+    today = timezone.now().date()
+
+    def run():
+        # Cada execução gera as mesmas ocorrências pendentes e é desfeita logo em seguida.
+        with transaction.atomic():
+            generate_due_entries(today)
+            transaction.set_rollback(True)
+    return run
+
+
+def benchmark_size(entries, targets=TARGETS, repeat=DEFAULT_REPEAT, seed=0, base_spec=None, log=None):
+    """
+    Gera os dados sintéticos de um tamanho, mede cada alvo e desfaz tudo (uma transação
+    revertida), então o banco termina como começou. O cache é limpo antes e depois, porque as
+    versões dos caches só mudam em on_commit, que nunca roda numa transação revertida.
+    """
+    log = log or (lambda message: None)
+    result = {'entries': entries}
+    cache.clear()
+    try:
+        with transaction.atomic():
+            result['seed'] = seed_synthetic(spec_for_size(entries, base_spec), seed=seed, log=log).as_report()
+            client, timings = _client(), {}
+            for name in targets:
+                if name == 'generate_recurrences':
+                    run = _recurrences_runner()
+                else:
+                    run = _view_runner(client, reverse(VIEW_TARGETS[name]))
+                timings[name] = _measure(run, repeat)
+                log(f"  {name}: mediana {timings[name]['median_ms']} ms, {timings[name]['queries']} consultas")
+            result['targets'] = timings
+            raise _Rollback
+    except _Rollback:
+        pass
+    finally:
+        cache.clear()
+    return result
+
+
+# ===============================================
+# CONEXÕES: custo de abrir/obter a conexão por requisição
+# ===============================================
+def _simulated_request(conn):
+    """O que o Django faz numa requisição: close_old_connections, uma consulta e close_old_connections."""
+    conn.close_if_unusable_or_obsolete()  # request_started
+    with conn.cursor() as cursor:
+        cursor.execute('SELECT 1')
+    conn.close_if_unusable_or_obsolete()  # request_finished
+
+
+def _close(handler, alias):
+    conn = handler[alias]
+    conn.close()
+    if getattr(conn, 'pool', None):
+        conn.close_pool()
+
+
+def benchmark_connection_mode(url, mode, requests=DEFAULT_CONNECTION_REQUESTS, cold=False, environ=None):
+    """
+    Mede `requests` requisições simuladas com a configuração de DB_CONNECTION_MODE=mode.
+    Com cold=True cada requisição usa um processo "novo" (sem pool nem conexão herdados),
+    como uma lambda fria; senão o processo é reaproveitado e a primeira requisição sai à parte.
+    """
+    environ = {**os.environ, **(environ or {}), 'DATABASE_URL': url, 'DB_CONNECTION_MODE': mode}
+    config = database_config(url, environ=environ)
+    timings, first_ms = [], None
+    for number in range(requests if cold else 1):
+        # Apelidos únicos: os pools do backend ficam num dicionário da classe, por apelido.
+        alias = f"benchmark_{mode}_{number}"
+        handler = ConnectionHandler({'default': {'ENGINE': 'django.db.backends.dummy'}, alias: dict(config)})
+        try:
+            runs = 1 if cold else requests + 1
+            for _ in range(runs):
+                started = time.perf_counter()
+                _simulated_request(handler[alias])
+                timings.append((time.perf_counter() - started) * 1000)
+        finally:
+            _close(handler, alias)
+    if not cold:
+        first_ms = round(timings.pop(0), 3)
+    return {'mode': mode, 'cold': cold, 'first_ms': first_ms, **_summary(timings)}
+
+
+def run_connection_benchmark(url, modes=CONNECTION_MODES, requests=DEFAULT_CONNECTION_REQUESTS, cold=False,
+                             environ=None, log=None):
+    log = log or (lambda message: None)
+    report = {'generated_at': timezone.now().isoformat(), 'commit': git_commit(), 'requests': requests,
+              'cold': cold, 'modes': []}
+    for mode in modes:
+        result = benchmark_connection_mode(url, mode, requests, cold, environ)
+        log(f"  {mode}: mediana {result['median_ms']} ms, p95 {result['p95_ms']} ms por requisição")
+        report['modes'].append(result)
+    return report
+
+
+# ===============================================
+# CONCORRÊNCIA NO SQLITE: leitores do dashboard x escritores de lançamentos
+# ===============================================
+# Roda num subprocesso cujo banco padrão é a cópia com o perfil medido: as escritas passam pelo
+# caminho do app (save() atômico + sinais que mantêm resumos e saldos).
+_CONCURRENCY_SCRIPT = """
+import json, sys
+import django
+django.setup()
+from finance.benchmark import run_concurrency_threads
+print(json.dumps(run_concurrency_threads(*json.loads(sys.argv[1]))))
+"""
+
+
+def _worker(operation, deadline, results, pause=0.0):
+    timings, locked, errors = [], 0, []
+    try:
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            try:
+                operation()
+            except OperationalError as exc:
+                if 'locked' in str(exc) or 'busy' in str(exc):
+                    locked += 1
+                    continue
+                errors.append(str(exc))
+                break
+            timings.append((time.perf_counter() - started) * 1000)
+            if pause:
+                time.sleep(pause)
+    finally:
+        connection.close()  # a conexão é da thread
+        results.append((operation.kind, timings, locked, errors))
+
+
+def run_concurrency_threads(seconds, readers, writers, write_pause_ms):
+    """
+    Leitores (agregado do último mês por conta e categoria, como o dashboard) e escritores
+    (AccountEntry.objects.create de uma cópia do primeiro lançamento) em threads, no banco padrão,
+    por `seconds` segundos. Devolve [(tipo, latências em ms, "database is locked", outros erros)].
+    """
+    fields = (AccountEntry.objects.order_by('pk')
+              .values('category_id', 'account_id', 'value', 'competence_date', 'describe').first())
+    if fields is None:
+        raise ValueError('O banco não tem lançamentos; gere dados com seed_synthetic antes.')
+    since = timezone.now().date() - timedelta(days=31)
+    connection.close()  # cada thread abre a sua
+
+    def read():
+        list(AccountEntry.objects.filter(competence_date__gte=since).values('account_id', 'category_id')
+             .annotate(total=Sum('value'), count=Count('id')))
+    read.kind = 'read'
+
+    def write():
+        AccountEntry.objects.create(**fields)
+    write.kind = 'write'
+
+    results, deadline = [], time.perf_counter() + seconds
+    threads = [threading.Thread(target=_worker, args=(read, deadline, results)) for _ in range(readers)]
+    threads += [threading.Thread(target=_worker, args=(write, deadline, results, write_pause_ms / 1000))
+                for _ in range(writers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def benchmark_sqlite_concurrency(source, profile, seconds=DEFAULT_CONCURRENCY_SECONDS, readers=4, writers=2,
+                                 write_pause_ms=DEFAULT_WRITE_PAUSE_MS, environ=None):
+    """
+    Copia o banco SQLite `source` para um diretório temporário e roda run_concurrency_threads num
+    subprocesso que usa a cópia, com as OPTIONS do perfil, como banco padrão. Conta operações,
+    latências e os "database is locked".
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        path = Path(directory) / 'concurrency.sqlite3'
+        origin, target = sqlite3.connect(source), sqlite3.connect(path)
+        try:
+            origin.backup(target)
+        finally:
+            origin.close()
+            target.close()
+
+        process_env = {**os.environ, **(environ or {}), 'DATABASE_URL': f'sqlite:///{path}', 'SQLITE_PROFILE': profile,
+                       'DJANGO_SETTINGS_MODULE': os.environ.get('DJANGO_SETTINGS_MODULE',
+                                                                'financial_management.settings')}
+        completed = subprocess.run([sys.executable, '-c', _CONCURRENCY_SCRIPT,
+                                    json.dumps([seconds, readers, writers, write_pause_ms])],
+                                   capture_output=True, text=True, cwd=settings.BASE_DIR, env=process_env)
+        if completed.returncode:
+            raise ValueError(completed.stderr.strip().splitlines()[-1] if completed.stderr.strip()
+                             else f"o subprocesso terminou com código {completed.returncode}")
+        results = json.loads(completed.stdout.strip().splitlines()[-1])
+
+    report = {'profile': profile, 'seconds': seconds, 'readers': readers, 'writers': writers,
+              'write_pause_ms': write_pause_ms}
+    for kind in ('read', 'write'):
+        timings = [ms for name, values, _, _ in results if name == kind for ms in values]
+        report[kind] = {
+            'operations': len(timings),
+            'per_second': round(len(timings) / seconds, 1),
+            'locked_errors': sum(locked for name, _, locked, _ in results if name == kind),
+            'other_errors': [error for name, _, _, errors in results if name == kind for error in errors][:5],
+            **(_summary(timings) if timings else {}),
+        }
+    return report
+
+
+def run_sqlite_concurrency_benchmark(source, profiles=SQLITE_PROFILES, seconds=DEFAULT_CONCURRENCY_SECONDS,
+                                     readers=4, writers=2, write_pause_ms=DEFAULT_WRITE_PAUSE_MS, log=None):
+    log = log or (lambda message: None)
+    report = {'generated_at': timezone.now().isoformat(), 'commit': git_commit(), 'profiles': []}
+    for profile in profiles:
+        result = benchmark_sqlite_concurrency(source, profile, seconds, readers, writers, write_pause_ms)
+        log(f"  {profile}: {result['read']['per_second']} leituras/s, {result['write']['per_second']} escritas/s, "
+            f"{result['read']['locked_errors'] + result['write']['locked_errors']} 'database is locked'")
+        report['profiles'].append(result)
+    return report
+
+
+# ===============================================
+# DINHEIRO: Decimal x centavos inteiros
+# ===============================================
+def _decimal_split(total_value, number_of_installments):
+    """Divisão em parcelas com Decimal (implementação anterior de split_total), a referência."""
+    installment_value = (total_value / Decimal(number_of_installments)).quantize(Decimal('0.01'),
+                                                                                rounding=ROUND_HALF_UP)
+    last_installment_value = total_value - (installment_value * (number_of_installments - 1))
+    return [installment_value] * (number_of_installments - 1) + [last_installment_value]
+
+
+def _python_money_timings(values, repeat):
+    """Soma e divisão em parcelas dos mesmos valores como Decimal e como Money (sem banco)."""
+    decimals = [Decimal(cents).scaleb(-2) for cents in values]
+    moneys = [Money(cents) for cents in values]
+    parts = [2 + cents % 23 for cents in values]  # 2 a 24 parcelas
+    decimal_split = [_decimal_split(value, n) for value, n in zip(decimals, parts)]
+    cents_split = [split_cents(cents, n) for cents, n in zip(values, parts)]
+    return {
+        'sum_decimal': _measure(lambda: sum(decimals, Decimal('0.00')), repeat),
+        'sum_cents': _measure(lambda: sum(values), repeat),
+        'split_decimal': _measure(lambda: [_decimal_split(value, n) for value, n in zip(decimals, parts)], repeat),
+        'split_cents': _measure(lambda: [split_cents(cents, n) for cents, n in zip(values, parts)], repeat),
+        # Com um objeto Money por parcela: o custo de alocação sobre a aritmética de int.
+        'split_money': _measure(lambda: [money.split(n) for money, n in zip(moneys, parts)], repeat),
+        'sum_matches': sum(decimals, Decimal('0.00')) == cents_to_decimal(sum(values)),
+        'split_matches': decimal_split == [[cents_to_decimal(cents) for cents in split] for split in cents_split],
+    }
+
+
+def _database_money_timings(repeat):
+    """Sum do DecimalField x Sum da coluna em centavos, no total e agrupado por categoria."""
+    def total(field):
+        return lambda: AccountEntry.objects.aggregate(total=Sum(field))['total']
+
+    def by_category(field):
+        return lambda: list(AccountEntry.objects.values('category_id').annotate(total=Sum(field)).order_by())
+
+    decimal_total, cents_total = total('value')(), total('value_cents')()
+    return {
+        'sum_value': _measure(total('value'), repeat),
+        'sum_value_cents': _measure(total('value_cents'), repeat),
+        'sum_by_category_value': _measure(by_category('value'), repeat),
+        'sum_by_category_value_cents': _measure(by_category('value_cents'), repeat),
+        # O SQLite soma DECIMAL como REAL: a diferença mostra o erro de ponto flutuante acumulado.
+        'sum_value_result': str(decimal_total),
+        'sum_value_cents_result': str(cents_to_decimal(cents_total)),
+    }
+
+
+def benchmark_money(values=DEFAULT_MONEY_VALUES, entries=None, repeat=DEFAULT_REPEAT, seed=0, log=None):
+    """
+    Compara o caminho Decimal com o de centavos inteiros: em Python (soma e parcelas de `values`
+    valores aleatórios, conferindo que os resultados são idênticos) e, com `entries`, no banco,
+    sobre lançamentos sintéticos numa transação revertida ao final.
+    """
+    log = log or (lambda message: None)
+    rng = random.Random(seed)
+    amounts = [rng.randint(-500000, 5000000) for _ in range(values)]  # de -R$ 5 mil a R$ 50 mil
+    report = {
+        'generated_at': timezone.now().isoformat(), 'commit': git_commit(), 'database': connection.vendor,
+        'repeat': repeat, 'seed': seed, 'values': values, 'python': _python_money_timings(amounts, repeat),
+    }
+    python = report['python']
+    log(f"  Python: soma {python['sum_decimal']['median_ms']} -> {python['sum_cents']['median_ms']} ms, "
+        f"parcelas {python['split_decimal']['median_ms']} -> {python['split_cents']['median_ms']} ms "
+        f"({python['split_money']['median_ms']} ms com Money)")
+    if entries:
+        cache.clear()
+        try:
+            with transaction.atomic():
+                report['seed_data'] = seed_synthetic(spec_for_size(entries), seed=seed, log=log).as_report()
+                report['database_sum'] = _database_money_timings(repeat)
+                raise _Rollback
+        except _Rollback:
+            pass
+        finally:
+            cache.clear()
+        database = report['database_sum']
+        log(f"  Banco: soma {database['sum_value']['median_ms']} -> {database['sum_value_cents']['median_ms']} ms, "
+            f"por categoria {database['sum_by_category_value']['median_ms']} -> "
+            f"{database['sum_by_category_value_cents']['median_ms']} ms")
+    return report
+
+
+# ===============================================
+# RELATÓRIO
+# ===============================================
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              cwd=settings.BASE_DIR, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_benchmark(sizes=DEFAULT_SIZES, targets=TARGETS, repeat=DEFAULT_REPEAT, seed=0, base_spec=None, log=None):
+    log = log or (lambda message: None)
+    report = {
+        'generated_at': timezone.now().isoformat(),
+        'commit': git_commit(),
+        'database': connection.vendor,
+        'repeat': repeat,
+        'seed': seed,
+        'sizes': [],
+    }
+    for entries in sizes:
+        log(f"Tamanho: {entries} lançamentos")
+        report['sizes'].append(benchmark_size(entries, targets, repeat, seed, base_spec, log))
+    return report
+
+
+def compare_reports(previous, current):
+    """Linhas (tamanho, alvo, mediana anterior, mediana atual, variação %) para alvos presentes nos dois."""
+    before = {(size['entries'], name): timing['median_ms']
+              for size in previous.get('sizes', []) for name, timing in size.get('targets', {}).items()}
+    rows = []
+    for size in current['sizes']:
+        for name, timing in size['targets'].items():
+            old = before.get((size['entries'], name))
+            if old:
+                rows.append((size['entries'], name, old, timing['median_ms'],
+                             round((timing['median_ms'] - old) / old * 100, 1)))
+    return rows
+
+
+def load_report(path):
+    return json.loads(Path(path).read_text(encoding='utf-8'))
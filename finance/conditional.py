@@ -0,0 +1,106 @@
+import hashlib
+from datetime import datetime, time
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.conf import settings
+from django.contrib.messages import get_messages
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
+
+from .models import DataVersion
+
+DATA_VERSION_PK = 1
+
+
+# ===============================================
+# CARIMBO GLOBAL DOS DADOS
+# ===============================================
+def current_data_version():
+    """(versão, data da última escrita) numa consulta; (0, None) antes da primeira escrita."""
+    return DataVersion.objects.filter(pk=DATA_VERSION_PK).values_list('version', 'updated_at').first() or (0, None)
+
+
+def _bump():
+    if not DataVersion.objects.filter(pk=DATA_VERSION_PK).update(version=F('version') + 1, updated_at=timezone.now()):
+        DataVersion.objects.get_or_create(pk=DATA_VERSION_PK, defaults={'version': 1})
+
+
+def bump_data_version():
+    """
+    Incrementa o carimbo após o commit, uma vez por transação (por mais linhas que ela grave):
+    a linha única só fica bloqueada pelo instante do UPDATE, não pela transação inteira.
+    """
+    if any(func is _bump for _, func, _ in transaction.get_connection().run_on_commit):
+        return
+    transaction.on_commit(_bump)
+
+
+# ===============================================
+# GET CONDICIONAL (ETag / Last-Modified) NAS VIEWS DE LEITURA
+# ===============================================
+def _validators(request, user_id, view_name):
+    """
+    (ETag, Last-Modified) da página, ou (None, None) quando a resposta não pode ser reaproveitada:
+    métodos que escrevem e páginas com mensagens pendentes (que só aparecem renderizando).
+    O ETag muda com a versão dos dados, o dia (prazos e períodos padrão), o usuário, a URL com
+    os parâmetros e o cookie CSRF (o token embutido nos formulários).
+    """
+    if request.method not in ('GET', 'HEAD'):
+        return None, None
+    version, updated_at = current_data_version()  # antes das mensagens: GET custa sempre uma consulta
+    if len(get_messages(request)):
+        return None, None
+    today = timezone.localdate()
+    parts = [view_name, version, today.isoformat(), user_id, request.get_full_path(),
+             request.COOKIES.get(settings.CSRF_COOKIE_NAME, '')]
+    etag = 'W/"%s"' % hashlib.sha1('|'.join(map(str, parts)).encode('utf-8')).hexdigest()[:32]
+    start_of_day = timezone.make_aware(datetime.combine(today, time.min))
+    last_modified = max(updated_at, start_of_day) if updated_at else start_of_day
+    return etag, int(last_modified.timestamp())
+
+
+def _finish(response, etag, last_modified):
+    if etag is None:
+        return response
+    if response.status_code in (200, 304):
+        response.headers.setdefault('ETag', etag)
+        response.headers.setdefault('Last-Modified', http_date(last_modified))
+    # O navegador guarda a página, mas sempre revalida com If-None-Match.
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
+
+
+def conditional_on_data_version(view):
+    """
+    Responde 304 Not Modified, sem executar a view, quando o ETag enviado pelo navegador
+    ainda corresponde à versão atual dos dados (uma consulta).
+    Use abaixo do @login_required; funciona com views síncronas e assíncronas.
+    """
+    view_name = view.__name__
+
+    def conditional_response(request, etag, last_modified):
+        return get_conditional_response(request, etag=etag, last_modified=last_modified) if etag else None
+
+    if iscoroutinefunction(view):
+        @wraps(view)
+        async def wrapper(request, *args, **kwargs):
+            user = await request.auser()
+            etag, last_modified = await sync_to_async(_validators)(request, user.pk, view_name)
+            response = conditional_response(request, etag, last_modified)
+            if response is None:
+                response = await view(request, *args, **kwargs)
+            return _finish(response, etag, last_modified)
+        return wrapper
+
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        etag, last_modified = _validators(request, request.user.pk, view_name)
+        response = conditional_response(request, etag, last_modified)
+        if response is None:
+            response = view(request, *args, **kwargs)
+        return _finish(response, etag, last_modified)
+    return wrapper
@@ -0,0 +1,71 @@
+from dataclasses import dataclass, field
+from decimal import Decimal
+
+from django.db.models import Count
+
+from .models import AccountEntry
+from .rollups import iter_month_chunks, ledger_month_range
+
+
+# ===============================================
+# CONSULTA POR FINGERPRINT (um IN indexado por lote)
+# ===============================================
+def existing_fingerprints(fingerprints, created_before=None):
+    """
+    Subconjunto dos fingerprints que já existem no razão, numa consulta.
+    created_before ignora as linhas gravadas a partir desse instante (ex.: pela própria importação).
+    """
+    fingerprints = set(fingerprints)
+    if not fingerprints:
+        return set()
+    qs = AccountEntry.objects.filter(fingerprint__in=fingerprints)
+    if created_before is not None:
+        qs = qs.filter(date_added__lt=created_before)
+    return set(qs.values_list('fingerprint', flat=True).distinct())
+
+
+# ===============================================
+# VARREDURA DE DUPLICATAS EM BLOCOS DE MESES
+# ===============================================
+@dataclass
+class DuplicateCluster:
+    fingerprint: str
+    entry_ids: list = field(default_factory=list)
+    competence_date: object = None
+    account: str = ''
+    category: str = ''
+    value: Decimal = Decimal('0.00')
+    describe: str = ''
+
+    @property
+    def extra_entries(self):
+        return len(self.entry_ids) - 1
+
+
+def duplicate_clusters(start, end):
+    """
+    Grupos de lançamentos com o mesmo fingerprint em [start, end). Como a data faz parte do
+    fingerprint, duplicatas nunca atravessam blocos: duas consultas por bloco, nenhuma por grupo.
+    """
+    chunk = AccountEntry.objects.filter(competence_date__gte=start, competence_date__lt=end)
+    repeated = (chunk.values('fingerprint').annotate(n=Count('id')).filter(n__gt=1)
+                .values_list('fingerprint', flat=True))
+    clusters = {}
+    rows = (chunk.filter(fingerprint__in=list(repeated)).order_by('competence_date', 'fingerprint', 'id')
+            .values_list('fingerprint', 'id', 'competence_date', 'account__name', 'category__name', 'value', 'describe'))
+    for fingerprint, pk, day, account, category, value, describe in rows:
+        cluster = clusters.get(fingerprint)
+        if cluster is None:
+            cluster = clusters[fingerprint] = DuplicateCluster(fingerprint, [], day, account, category, value,
+                                                               describe or '')
+        cluster.entry_ids.append(pk)
+    return list(clusters.values())
+
+
+def scan_duplicates(months_per_chunk=3):
+    """Percorre o razão em blocos de meses e gera (início, fim, grupos duplicados do bloco)."""
+    ledger_range = ledger_month_range()
+    if ledger_range is None:
+        return
+    for start, end in iter_month_chunks(*ledger_range, months_per_chunk):
+        yield start, end, duplicate_clusters(start, end)
@@ -0,0 +1,108 @@
+import csv
+import heapq
+import json
+
+from django.db import connections
+from django.db.models import Q
+
+EXPORT_CHUNK_SIZE = 2000
+EXPORT_COLUMNS = ['kind', 'id', 'date', 'type', 'category', 'account', 'account_destination', 'value',
+                  'describe', 'date_payment', 'installment']
+
+
+# ===============================================
+# LEITURA EM STREAMING (cursor do banco ou páginas por chave)
+# ===============================================
+def _chunked(qs, date_field, chunk_size):
+    """
+    Linhas de qs (ordenado por date_field e id, as duas primeiras colunas) em blocos de chunk_size.
+    Com cursor do lado do servidor basta o iterator(). Com DISABLE_SERVER_SIDE_CURSORS (modo
+    transaction, o padrão na Vercel) o driver traria o resultado inteiro para a memória, então cada
+    bloco é uma consulta que continua depois da última chave (data, id) lida.
+    """
+    if not connections[qs.db].settings_dict.get('DISABLE_SERVER_SIDE_CURSORS'):
+        yield from qs.iterator(chunk_size=chunk_size)
+        return
+    page = qs
+    while True:
+        rows = list(page[:chunk_size])
+        yield from rows
+        if len(rows) < chunk_size:
+            return
+        day, pk = rows[-1][:2]
+        page = qs.filter(Q(**{f'{date_field}__gt': day}) | Q(**{date_field: day, 'id__gt': pk}))
+
+
+def _entry_rows(filters, chunk_size):
+    qs = (filters.entries().order_by('competence_date', 'id')
+          .values_list('competence_date', 'id', 'category__type', 'category__name', 'account__name', 'value',
+                       'describe', 'date_payment', 'installment_number', 'installment_plan__number_of_installments'))
+    rows = _chunked(qs, 'competence_date', chunk_size)
+    for day, pk, tipo, category, account, value, describe, payment, number, total in rows:
+        yield (day, 1, pk), {
+            'kind': 'entry', 'id': pk, 'date': day, 'type': tipo, 'category': category, 'account': account,
+            'account_destination': None, 'value': value, 'describe': describe, 'date_payment': payment,
+            'installment': f'{number}/{total}' if number else None,
+        }
+
+
+def _transfer_rows(filters, chunk_size):
+    qs = (filters.transfers().order_by('date', 'id')
+          .values_list('date', 'id', 'account_origin__name', 'account_destination__name', 'value', 'describe'))
+    for day, pk, origin, destination, value, describe in _chunked(qs, 'date', chunk_size):
+        yield (day, 0, pk), {
+            'kind': 'transfer', 'id': pk, 'date': day, 'type': 'T', 'category': None, 'account': origin,
+            'account_destination': destination, 'value': value, 'describe': describe, 'date_payment': None,
+            'installment': None,
+        }
+
+
+def iter_ledger_rows(filters, chunk_size=EXPORT_CHUNK_SIZE):
+    """
+    Lançamentos e transferências em ordem cronológica (data, transferências antes dos lançamentos
+    no mesmo dia, id). Cada lado é lido em blocos de chunk_size e os dois são intercalados com
+    heapq.merge, então a memória não cresce com o tamanho da exportação.
+    """
+    for _, row in heapq.merge(_entry_rows(filters, chunk_size), _transfer_rows(filters, chunk_size),
+                              key=lambda item: item[0]):
+        yield row
+
+
+# ===============================================
+# FORMATOS
+# ===============================================
+def _plain(value):
+    if value is None:
+        return ''
+    return value.isoformat() if hasattr(value, 'isoformat') else str(value)
+
+
+class _LineBuffer:
+    """Destino do csv.writer que apenas devolve a linha escrita."""
+
+    def write(self, value):
+        return value
+
+
+def csv_lines(rows):
+    writer = csv.writer(_LineBuffer())
+    yield writer.writerow(EXPORT_COLUMNS)
+    for row in rows:
+        yield writer.writerow([_plain(row[column]) for column in EXPORT_COLUMNS])
+
+
+def _json_value(value):
+    if value is None or isinstance(value, (int, str)):
+        return value
+    return _plain(value)  # datas em ISO e Decimal como texto (sem perda de precisão)
+
+
+def jsonl_lines(rows):
+    for row in rows:
+        yield json.dumps({column: _json_value(row[column]) for column in EXPORT_COLUMNS}, ensure_ascii=False) + '\n'
+
+
+EXPORT_FORMATS = {
+    'csv': (csv_lines, 'text/csv; charset=utf-8'),
+    'jsonl': (jsonl_lines, 'application/x-ndjson; charset=utf-8'),
+}
@@ -0,0 +1,156 @@
+from dataclasses import dataclass, field
+from datetime import datetime
+
+from django.db import connection
+from django.db.models import F, IntegerField, Q, Value
+
+from .models import AccountEntry, Transfer
+
+# Ordem do histórico: data desc, lançamentos antes de transferências no mesmo dia, id desc.
+ENTRY, TRANSFER = 1, 0
+KIND_NAMES = {ENTRY: 'entry', TRANSFER: 'transfer'}
+FEED_PAGE_SIZE = 12
+
+
+# ===============================================
+# FILTROS E CURSOR
+# ===============================================
+@dataclass(frozen=True)
+class FeedFilters:
+    tipo: str = None
+    date_from: object = None
+    date_to: object = None
+
+    @classmethod
+    def from_query(cls, params):
+        """Lê os filtros (type, date_from, date_to) da querystring, ignorando datas inválidas."""
+        tipo = params.get('type')
+        dt_from, dt_to = None, None
+        try:
+            if params.get('date_from'): dt_from = datetime.strptime(params['date_from'], '%Y-%m-%d').date()
+            if params.get('date_to'): dt_to = datetime.strptime(params['date_to'], '%Y-%m-%d').date()
+        except ValueError:
+            pass
+        return cls(tipo=tipo if tipo in ('R', 'D') else None, date_from=dt_from, date_to=dt_to)
+
+    def entries(self):
+        qs = AccountEntry.objects.all()
+        if self.tipo: qs = qs.filter(category__type=self.tipo)
+        if self.date_from: qs = qs.filter(competence_date__gte=self.date_from)
+        if self.date_to: qs = qs.filter(competence_date__lte=self.date_to)
+        return qs
+
+    def transfers(self):
+        if self.tipo:
+            return Transfer.objects.none()
+        qs = Transfer.objects.all()
+        if self.date_from: qs = qs.filter(date__gte=self.date_from)
+        if self.date_to: qs = qs.filter(date__lte=self.date_to)
+        return qs
+
+
+@dataclass(frozen=True, order=True)
+class Cursor:
+    date: object
+    kind: int
+    id: int
+
+    def encode(self):
+        return f"{self.date:%Y-%m-%d}.{self.kind}.{self.id}"
+
+    @classmethod
+    def decode(cls, value):
+        """Converte 'AAAA-MM-DD.tipo.id' em Cursor; retorna None se o valor for inválido."""
+        try:
+            day, kind, pk = value.split('.')
+            cursor = cls(datetime.strptime(day, '%Y-%m-%d').date(), int(kind), int(pk))
+        except (AttributeError, ValueError):
+            return None
+        return cursor if cursor.kind in KIND_NAMES else None
+
+
+def _keyset_filter(date_field, kind, cursor, forward):
+    """
+    Condição (data, tipo, id) < cursor (forward) ou > cursor (backward) para um dos lados
+    da UNION, onde o tipo é constante.
+    """
+    if cursor is None:
+        return Q()
+    before, after = (f'{date_field}__lt', 'id__lt') if forward else (f'{date_field}__gt', 'id__gt')
+    same_day = Q(**{date_field: cursor.date})
+    if kind == cursor.kind:
+        return Q(**{before: cursor.date}) | (same_day & Q(**{after: cursor.id}))
+    if (kind < cursor.kind) == forward:
+        return Q(**{before: cursor.date}) | same_day
+    return Q(**{before: cursor.date})
+
+
+# ===============================================
+# PÁGINA DO HISTÓRICO
+# ===============================================
+@dataclass
+class FeedPage:
+    items: list = field(default_factory=list)
+    next_cursor: str = None
+    previous_cursor: str = None
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+    @property
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    @property
+    def has_other_pages(self):
+        return self.has_next or self.has_previous
+
+
+def fetch_feed_page(filters, after=None, before=None, page_size=FEED_PAGE_SIZE):
+    """
+    Busca uma página do histórico combinado (lançamentos + transferências) com paginação
+    por cursor sobre (data, tipo, id). Uma UNION ALL retorna só as chaves da página
+    (page_size + 1 linhas) e depois cada lado é carregado por id.
+    """
+    forward = before is None
+    cursor = after if forward else before
+    direction = '-' if forward else ''
+    ordering = [f'{direction}sort_date', f'{direction}kind', f'{direction}row_id']
+
+    branches = []
+    for kind, qs, date_field in ((ENTRY, filters.entries(), 'competence_date'),
+                                 (TRANSFER, filters.transfers(), 'date')):
+        qs = (qs.filter(_keyset_filter(date_field, kind, cursor, forward))
+              .annotate(sort_date=F(date_field), kind=Value(kind, output_field=IntegerField()), row_id=F('id'))
+              .values_list('sort_date', 'kind', 'row_id'))
+        if connection.features.supports_slicing_ordering_in_compound:
+            # Cada lado já limita suas linhas pelo índice (data, id) antes da UNION.
+            qs = qs.order_by(*ordering)[:page_size + 1]
+        else:
+            qs = qs.order_by()
+        branches.append(qs)
+    keys = [Cursor(*row) for row in branches[0].union(branches[1], all=True).order_by(*ordering)[:page_size + 1]]
+
+    has_more = len(keys) > page_size
+    keys = keys[:page_size]
+    if not forward:
+        keys.reverse()
+
+    entries = AccountEntry.objects.select_related('category', 'account', 'installment_plan').in_bulk(
+        [key.id for key in keys if key.kind == ENTRY])
+    transfers = Transfer.objects.select_related('account_origin', 'account_destination').in_bulk(
+        [key.id for key in keys if key.kind == TRANSFER])
+    objects = {ENTRY: entries, TRANSFER: transfers}
+    items = [{'type': KIND_NAMES[key.kind], 'sort_date': key.date, 'obj': objects[key.kind][key.id]}
+             for key in keys if key.id in objects[key.kind]]
+
+    page = FeedPage(items=items)
+    if keys:
+        if forward:
+            page.next_cursor = keys[-1].encode() if has_more else None
+            page.previous_cursor = keys[0].encode() if cursor else None
+        else:
+            page.previous_cursor = keys[0].encode() if has_more else None
+            page.next_cursor = keys[-1].encode()
+    return page
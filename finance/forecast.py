@@ -0,0 +1,171 @@
+import calendar
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from decimal import Decimal
+from itertools import accumulate
+
+from django.core.cache import cache
+
+from .conditional import current_data_version
+from .models import Account, DailyBalance, RecurringTransaction
+from .money import cents_to_decimal
+from .money import cents_to_decimal
+
+ZERO = Decimal('0.00')
+FORECAST_DEFAULT_MONTHS = 6
+FORECAST_MAX_MONTHS = 24
+FORECAST_CACHE_SECONDS = 600
+
+# Passo de cada frequência: semanas (dias fixos) ou meses (com o ajuste de fim de mês do relativedelta).
+WEEK_STEP_DAYS = {'WEEKLY': 7}
+MONTH_STEP = {'MONTHLY': 1, 'YEARLY': 12}
+
+
+# ===============================================
+# EXPANSÃO VETORIZADA DAS OCORRÊNCIAS
+# ===============================================
+def occurrence_dates(first, frequency, until):
+    """
+    Datas de first até until (inclusive) na mesma sequência encadeada de
+    calculate_next_due_date, calculadas de uma vez em vez de passo a passo:
+    - semanal: progressão aritmética de 7 dias;
+    - mensal/anual: o dia de cada ocorrência é o mínimo acumulado entre o dia inicial e o
+      tamanho dos meses percorridos (31/01 -> 28/02 -> 28/03...), como no relativedelta encadeado.
+    """
+    if first is None or first > until:
+        return []
+    if frequency in WEEK_STEP_DAYS:
+        step = WEEK_STEP_DAYS[frequency]
+        return [first + timedelta(days=offset) for offset in range(0, (until - first).days + 1, step)]
+    step = MONTH_STEP.get(frequency)
+    if step is None:
+        return []
+    # Índice absoluto do mês: ano * 12 + mês - 1.
+    start_index = first.year * 12 + first.month - 1
+    count = ((until.year * 12 + until.month - 1) - start_index) // step + 1
+    indexes = [start_index + step * k for k in range(count)]
+    lengths = [calendar.monthrange(index // 12, index % 12 + 1)[1] for index in indexes]
+    days = accumulate([first.day] + lengths[1:], min)
+    dates = [date(index // 12, index % 12 + 1, day) for index, day in zip(indexes, days)]
+    return [day for day in dates if day <= until]
+
+
+# ===============================================
+# RESULTADO
+# ===============================================
+@dataclass(frozen=True)
+class AccountForecast:
+    account_id: int
+    name: str
+    opening: Decimal
+    balances: list = field(default_factory=list)  # saldo ao fim de cada dia de Forecast.days
+
+
+@dataclass(frozen=True)
+class Forecast:
+    today: date
+    horizon: date
+    days: list = field(default_factory=list)
+    accounts: list = field(default_factory=list)
+
+    @property
+    def opening_total(self):
+        return sum((account.opening for account in self.accounts), ZERO)
+
+    @property
+    def totals(self):
+        """Patrimônio projetado ao fim de cada dia (soma das contas)."""
+        if not self.accounts:
+            return [ZERO] * len(self.days)
+        return [sum(values, ZERO) for values in zip(*(account.balances for account in self.accounts))]
+
+    def month_ends(self):
+        """Índices do último dia de cada mês do horizonte, para tabelas resumidas."""
+        return [i for i, day in enumerate(self.days) if i + 1 == len(self.days) or self.days[i + 1].day == 1]
+
+    def as_dict(self):
+        return {
+            'today': self.today.isoformat(),
+            'horizon': self.horizon.isoformat(),
+            'days': [day.isoformat() for day in self.days],
+            'total': [str(value) for value in self.totals],
+            'accounts': [{'id': account.account_id, 'name': account.name, 'opening': str(account.opening),
+                          'balances': [str(value) for value in account.balances]} for account in self.accounts],
+        }
+
+
+# ===============================================
+# MOTOR DE PREVISÃO
+# ===============================================
+def add_months(day, months):
+    index = day.year * 12 + day.month - 1 + months
+    year, month = index // 12, index % 12 + 1
+    return date(year, month, min(day.day, calendar.monthrange(year, month)[1]))
+
+
+def build_forecast(today, months=FORECAST_DEFAULT_MONTHS):
+    """
+    Projeta o saldo diário de cada conta ativa de amanhã até today + months, em três consultas:
+    - saldo atual de cada conta (AccountBalance);
+    - movimentos já lançados para depois de hoje (parcelas, lançamentos e transferências
+      agendados), lidos do DailyBalance e descontados do saldo atual para obter o de hoje;
+    - recorrências ativas, expandidas em memória a partir de next_due_date.
+    Ocorrências vencidas e ainda não geradas entram no saldo inicial. As séries são somadas em
+    centavos (colunas *_cents) e viram Decimal só no resultado.
+    """
+    horizon = add_months(today, months)
+    n_days = (horizon - today).days
+    days = [today + timedelta(days=offset) for offset in range(1, n_days + 1)]
+
+    accounts = list(Account.objects.filter(is_active=True).order_by('name')
+                    .values_list('pk', 'name', 'balance_snapshot__balance_cents'))
+    opening = {pk: cents or 0 for pk, _, cents in accounts}
+    deltas = {pk: [0] * n_days for pk in opening}
+
+    # O saldo atual já inclui os movimentos agendados: saem do saldo de hoje e entram no seu dia.
+    for account_id, day, delta in (DailyBalance.objects.filter(account_id__in=list(opening), date__gt=today)
+                                   .values_list('account_id', 'date', 'delta_cents')):
+        opening[account_id] -= delta
+        if day <= horizon:
+            deltas[account_id][(day - today).days - 1] += delta
+
+    recurrences = (RecurringTransaction.objects
+                   .filter(is_active=True, next_due_date__isnull=False, next_due_date__lte=horizon,
+                           account_id__in=list(opening))
+                   .values_list('account_id', 'category__type', 'value_cents', 'frequency', 'next_due_date',
+                                'end_date'))
+    for account_id, category_type, cents, frequency, next_due, end_date in recurrences:
+        signed = cents if category_type == 'R' else -cents
+        until = min(horizon, end_date) if end_date else horizon
+        series = deltas[account_id]
+        for day in occurrence_dates(next_due, frequency, until):
+            if day <= today:
+                opening[account_id] += signed
+            else:
+                series[(day - today).days - 1] += signed
+
+    return Forecast(today=today, horizon=horizon, days=days, accounts=[
+        AccountForecast(account_id=pk, name=name, opening=cents_to_decimal(opening[pk]),
+                        balances=[cents_to_decimal(cents)
+                                  for cents in accumulate(deltas[pk], initial=opening[pk])][1:])
+        for pk, name, _ in accounts
+    ])
+
+
+# ===============================================
+# CACHE (pela versão global dos dados)
+# ===============================================
+def get_forecast(today, months=FORECAST_DEFAULT_MONTHS):
+    """
+    Previsão em cache por (versão dos dados, dia, meses). A versão fica no banco (DataVersion) e
+    muda após qualquer escrita, em qualquer processo: o cache local guarda só o resultado, e
+    nenhum processo serve uma previsão anterior à última escrita confirmada.
+    """
+    months = max(1, min(int(months), FORECAST_MAX_MONTHS))
+    version, _ = current_data_version()
+    key = f'forecast:v{version}:{today.isoformat()}:{months}'
+    result = cache.get(key)
+    if result is None:
+        result = build_forecast(today, months)
+        cache.set(key, result, FORECAST_CACHE_SECONDS)
+    return result
@@ -1,5 +1,7 @@
 from django import forms
+from django.core.exceptions import ValidationError
 from django.forms import ModelForm
+from django.forms.models import ModelChoiceIterator
 from datetime import date
 
 # ===============================================
@@ -9,20 +11,64 @@ from .models import (
     AccountEntry, Category, Goal, Account, Transfer,
     InstallmentPlan, RecurringTransaction # <--- ADICIONADO
 )
+from .refdata import reference_data
 
 TAILWIND_INPUT_CLASSES = 'mt-1 w-full p-2 bg-gray-700 text-white rounded-md'
 
+
+# ===============================================
+# CAMPO DE ESCOLHA COM DADOS DE REFERÊNCIA EM CACHE
+# ===============================================
+class ReferenceChoiceIterator(ModelChoiceIterator):
+    """Opções a partir das contas/categorias em cache, sem consultar o banco."""
+
+    def __iter__(self):
+        if self.field.empty_label is not None:
+            yield ("", self.field.empty_label)
+        for obj in self.field.reference_objects():
+            yield self.choice(obj)
+
+    def __len__(self):
+        return len(self.field.reference_objects()) + (self.field.empty_label is not None)
+
+    def __bool__(self):
+        return self.field.empty_label is not None or bool(self.field.reference_objects())
+
+
+class ReferenceChoiceField(forms.ModelChoiceField):
+    """
+    ModelChoiceField de contas/categorias ativas (com filtros simples de igualdade) que usa
+    finance.refdata: todos os formulários da página compartilham a mesma carga.
+    """
+    iterator = ReferenceChoiceIterator
+
+    def __init__(self, model, filters=None, **kwargs):
+        self.model, self.filters = model, dict(filters or {})
+        super().__init__(queryset=model.objects.filter(is_active=True, **self.filters), **kwargs)
+
+    def reference_objects(self):
+        return [obj for obj in reference_data().objects(self.model)
+                if all(getattr(obj, name) == value for name, value in self.filters.items())]
+
+    def to_python(self, value):
+        if value in self.empty_values:
+            return None
+        for obj in self.reference_objects():
+            if str(obj.pk) == str(getattr(value, 'pk', value)):
+                return obj
+        raise ValidationError(self.error_messages['invalid_choice'], code='invalid_choice', params={'value': value})
+
 # ===============================================
 # FORMULÁRIO: AccountEntryForm (Sem alterações)
 # ===============================================
 class AccountEntryForm(ModelForm):
-    category = forms.ModelChoiceField(
-        queryset=Category.objects.filter(is_active=True),
+    category = ReferenceChoiceField(
+        Category,
         widget=forms.Select(attrs={'class': TAILWIND_INPUT_CLASSES}),
         label="Categoria"
     )
-    account = forms.ModelChoiceField(
-        queryset=Account.objects.filter(is_active=True),
+    account = ReferenceChoiceField(
+        Account,
         widget=forms.Select(attrs={'class': TAILWIND_INPUT_CLASSES}),
         label="Conta"
     )
@@ -84,13 +130,13 @@ class AccountForm(ModelForm):
 # FORMULÁRIO: TransferForm (Sem alterações)
 # ===============================================
 class TransferForm(ModelForm):
-    account_origin = forms.ModelChoiceField(
-        queryset=Account.objects.filter(is_active=True),
+    account_origin = ReferenceChoiceField(
+        Account,
         widget=forms.Select(attrs={'class': TAILWIND_INPUT_CLASSES}),
         label="Conta de Origem"
     )
-    account_destination = forms.ModelChoiceField(
-        queryset=Account.objects.filter(is_active=True),
+    account_destination = ReferenceChoiceField(
+        Account,
         widget=forms.Select(attrs={'class': TAILWIND_INPUT_CLASSES}),
         label="Conta de Destino"
     )
@@ -110,8 +156,8 @@ class TransferForm(ModelForm):
 class InstallmentEntryForm(forms.Form):
     describe = forms.CharField(label="Descrição da Compra", widget=forms.TextInput(attrs={'class': TAILWIND_INPUT_CLASSES, 'placeholder': 'Ex: Monitor Novo'}))
     total_value = forms.DecimalField(label="Valor Total da Compra (R$)", max_digits=10, decimal_places=2, widget=forms.NumberInput(attrs={'step': '0.01', 'class': TAILWIND_INPUT_CLASSES}))
-    category = forms.ModelChoiceField(queryset=Category.objects.filter(is_active=True, type='D'), widget=forms.Select(attrs={'class': TAILWIND_INPUT_CLASSES}), label="Categoria")
-    account = forms.ModelChoiceField(queryset=Account.objects.filter(is_active=True, type='CREDIT_CARD'), widget=forms.Select(attrs={'class': TAILWIND_INPUT_CLASSES}), label="Conta (Cartão de Crédito)")
+    category = ReferenceChoiceField(Category, {'type': 'D'}, widget=forms.Select(attrs={'class': TAILWIND_INPUT_CLASSES}), label="Categoria")
+    account = ReferenceChoiceField(Account, {'type': 'CREDIT_CARD'}, widget=forms.Select(attrs={'class': TAILWIND_INPUT_CLASSES}), label="Conta (Cartão de Crédito)")
     first_installment_date = forms.DateField(label="Data da Primeira Parcela", widget=forms.DateInput(attrs={'type': 'date', 'class': TAILWIND_INPUT_CLASSES}), initial=date.today)
     number_of_installments = forms.IntegerField(label="Número de Parcelas", min_value=2, max_value=48, initial=2, widget=forms.NumberInput(attrs={'type': 'number', 'class': TAILWIND_INPUT_CLASSES}))
 
@@ -119,7 +165,7 @@ class InstallmentEntryForm(forms.Form):
 # FORMULÁRIO: GoalForm (Sem alterações)
 # ===============================================
 class GoalForm(ModelForm):
-    linked_category = forms.ModelChoiceField(queryset=Category.objects.filter(financial_bucket='INV', type='D', is_active=True), widget=forms.Select(attrs={'class': TAILWIND_INPUT_CLASSES}), label="Categoria Vinculada (Poupança/Investimento)", help_text="Selecione a categoria ativa onde os aportes serão registrados.")
+    linked_category = ReferenceChoiceField(Category, {'financial_bucket': 'INV', 'type': 'D'}, widget=forms.Select(attrs={'class': TAILWIND_INPUT_CLASSES}), label="Categoria Vinculada (Poupança/Investimento)", help_text="Selecione a categoria ativa onde os aportes serão registrados.")
 
     class Meta:
         model = Goal
@@ -135,13 +181,13 @@ class GoalForm(ModelForm):
 # NOVO FORMULÁRIO: RecurringTransactionForm
 # ===============================================
 class RecurringTransactionForm(ModelForm):
-    category = forms.ModelChoiceField(
-        queryset=Category.objects.filter(is_active=True),
+    category = ReferenceChoiceField(
+        Category,
         widget=forms.Select(attrs={'class': TAILWIND_INPUT_CLASSES}),
         label="Categoria"
     )
-    account = forms.ModelChoiceField(
-        queryset=Account.objects.filter(is_active=True),
+    account = ReferenceChoiceField(
+        Account,
         widget=forms.Select(attrs={'class': TAILWIND_INPUT_CLASSES}),
         label="Conta"
     )
@@ -165,4 +211,28 @@ class RecurringTransactionForm(ModelForm):
             'frequency': 'Frequência',
             'start_date': 'Data de Início',
             'end_date': 'Data Final (Opcional)',
-        }
\ No newline at end of file
+        }
+
+# ===============================================
+# NOVO FORMULÁRIO: ImportStatementForm (extrato CSV/OFX)
+# ===============================================
+class ImportStatementForm(forms.Form):
+    file = forms.FileField(
+        widget=forms.ClearableFileInput(attrs={'class': TAILWIND_INPUT_CLASSES, 'accept': '.csv,.ofx,.qfx'}),
+        label="Arquivo do Extrato (CSV ou OFX)"
+    )
+    account = ReferenceChoiceField(
+        Account,
+        widget=forms.Select(attrs={'class': TAILWIND_INPUT_CLASSES}),
+        label="Conta"
+    )
+    income_category = ReferenceChoiceField(
+        Category, {'type': 'R'}, required=False,
+        widget=forms.Select(attrs={'class': TAILWIND_INPUT_CLASSES}),
+        label="Categoria para Entradas"
+    )
+    expense_category = ReferenceChoiceField(
+        Category, {'type': 'D'}, required=False,
+        widget=forms.Select(attrs={'class': TAILWIND_INPUT_CLASSES}),
+        label="Categoria para Saídas"
+    )
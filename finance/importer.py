@@ -0,0 +1,272 @@
+import csv
+import io
+import re
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from decimal import Decimal
+
+from django.utils import timezone
+
+from .dedup import existing_fingerprints
+from .models import Account, AccountEntry, Category
+from .signals import ledger_batch, ledger_bulk_changed
+
+IMPORT_BATCH_SIZE = 1000
+MAX_REPORTED_ERRORS = 20
+
+# Cabeçalhos aceitos no CSV (minúsculos, sem acento); a primeira coluna encontrada vence.
+CSV_COLUMNS = {
+    'date': ('data', 'date', 'competencia', 'data da competencia'),
+    'value': ('valor', 'value', 'amount', 'quantia'),
+    'describe': ('descricao', 'description', 'historico', 'memo'),
+    'category': ('categoria', 'category'),
+    'account': ('conta', 'account'),
+}
+DATE_FORMATS = ('%Y-%m-%d', '%d/%m/%Y', '%d/%m/%y', '%Y%m%d')
+
+
+class StatementError(ValueError):
+    """Linha do extrato que não pode ser importada."""
+
+
+@dataclass(frozen=True)
+class StatementLine:
+    line: int
+    date: object = None
+    value: Decimal = None  # positivo = entrada, negativo = saída
+    describe: str = ''
+    category: str = None
+    account: str = None
+    error: str = None  # preenchido quando a linha não pôde ser lida
+
+
+@dataclass
+class ImportResult:
+    read: int = 0
+    imported: int = 0
+    skipped: int = 0
+    duplicates: int = 0
+    batches: int = 0
+    elapsed_seconds: float = 0.0
+    errors: list = field(default_factory=list)
+
+    @property
+    def rows_per_second(self):
+        return round(self.read / self.elapsed_seconds, 1) if self.elapsed_seconds else None
+
+    def add_error(self, line, message):
+        self.skipped += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append(f"Linha {line}: {message}")
+
+
+# ===============================================
+# CONVERSÃO DE VALORES
+# ===============================================
+def parse_date(value):
+    value = (value or '').strip()
+    if value[:8].isdigit():
+        value = value[:8]  # OFX: AAAAMMDDHHMMSS[-3:BRT]
+    for fmt in DATE_FORMATS:
+        try:
+            return datetime.strptime(value, fmt).date()
+        except ValueError:
+            continue
+    raise StatementError(f"data inválida '{value}'")
+
+
+def _grouped(integer, sep):
+    """True quando `sep` separa milhares corretamente em `integer` ('1.234.567')."""
+    groups = integer.split(sep)
+    return len(groups) > 1 and 1 <= len(groups[0]) <= 3 and all(len(group) == 3 for group in groups[1:])
+
+
+def parse_amount(value):
+    """
+    Aceita '1.234,56', '1,234.56', '1234.56', '-80,00', '(10,00)' (negativo) e 'R$ 10,00'.
+    O último separador que aparece é o decimal, e o outro só pode separar milhares. Um separador
+    único seguido de três dígitos ('1,234', '1.234') é ambíguo e a linha é recusada.
+    """
+    text = re.sub(r'[^\d,.()\-]', '', value or '')
+    negative = text.startswith('(') and text.endswith(')')
+    if negative:
+        text = text[1:-1]
+    elif text.startswith('-'):
+        negative, text = True, text[1:]
+    if not re.fullmatch(r'[\d,.]*\d[\d,.]*', text):
+        raise StatementError(f"valor inválido '{value}'")
+
+    last = max(text.rfind(','), text.rfind('.'))
+    integer, fraction, thousands = text, '', None
+    if last >= 0:
+        sep = text[last]
+        other = '.' if sep == ',' else ','
+        if sep in text[:last]:  # separador repetido: milhares, sem parte decimal
+            thousands = sep
+        else:
+            integer, fraction = text[:last], text[last + 1:]
+            if other in integer:
+                thousands = other
+            elif len(fraction) == 3 and integer[:1] != '0' and 1 <= len(integer) <= 3:
+                raise StatementError(f"valor ambíguo '{value}': use 1.234,00 ou 1,234.00")
+            if not fraction:
+                raise StatementError(f"valor inválido '{value}'")
+    if thousands:
+        if not _grouped(integer, thousands):
+            raise StatementError(f"valor inválido '{value}'")
+        integer = integer.replace(thousands, '')
+    amount = Decimal(f"{integer or '0'}.{fraction or '0'}").quantize(Decimal('0.01'))
+    return -amount if negative else amount
+
+
+def _normalize(name):
+    table = str.maketrans('áàâãéêíóôõúç', 'aaaaeeiooouc')
+    return (name or '').strip().lower().translate(table)
+
+
+# ===============================================
+# LEITORES EM STREAMING (memória limitada: uma linha por vez)
+# ===============================================
+def _text_stream(stream, encoding):
+    return stream if isinstance(stream, io.TextIOBase) else io.TextIOWrapper(stream, encoding=encoding, newline='')
+
+
+def iter_csv(stream, encoding='utf-8-sig', delimiter=None):
+    """Linhas de um CSV com cabeçalho; o delimitador (',' ou ';') é detectado pela primeira linha."""
+    text = _text_stream(stream, encoding)
+    header_line = text.readline()
+    delimiter = delimiter or (';' if header_line.count(';') > header_line.count(',') else ',')
+    header = [_normalize(name) for name in next(csv.reader([header_line], delimiter=delimiter))]
+    columns = {key: next((header.index(name) for name in names if name in header), None)
+               for key, names in CSV_COLUMNS.items()}
+    if columns['date'] is None or columns['value'] is None:
+        raise StatementError("o CSV precisa das colunas de data e valor")
+
+    def cell(row, key):
+        index = columns[key]
+        return row[index].strip() if index is not None and index < len(row) else None
+
+    for number, row in enumerate(csv.reader(text, delimiter=delimiter), start=2):
+        if not any(row):
+            continue
+        try:
+            yield StatementLine(number, parse_date(cell(row, 'date')), parse_amount(cell(row, 'value')),
+                                cell(row, 'describe') or '', cell(row, 'category'), cell(row, 'account'))
+        except StatementError as e:
+            yield StatementLine(number, error=str(e))
+
+
+OFX_TAG = re.compile(r'<(/?)([A-Z0-9.]+)>([^<\r\n]*)')
+
+
+def iter_ofx(stream, encoding='latin-1'):
+    """Transações (<STMTTRN>) de um OFX 1.x (SGML) ou 2.x (XML), lendo linha a linha."""
+    text = _text_stream(stream, encoding)
+    current, start_line = None, 0
+    for number, raw in enumerate(text, start=1):
+        for closing, tag, value in OFX_TAG.findall(raw):
+            if tag == 'STMTTRN':
+                if not closing:
+                    current, start_line = {}, number
+                elif current is not None:
+                    try:
+                        yield StatementLine(start_line, parse_date(current.get('DTPOSTED')),
+                                            parse_amount(current.get('TRNAMT')),
+                                            current.get('MEMO') or current.get('NAME') or '')
+                    except StatementError as e:
+                        yield StatementLine(start_line, error=str(e))
+                    current = None
+            elif current is not None and not closing and value.strip():
+                current[tag] = value.strip()
+
+
+def detect_format(filename):
+    return 'ofx' if filename.lower().endswith(('.ofx', '.qfx')) else 'csv'
+
+
+# ===============================================
+# IMPORTAÇÃO EM LOTES
+# ===============================================
+class ReferenceCache:
+    """Contas e categorias carregadas uma vez por importação (nome normalizado -> objeto)."""
+
+    def __init__(self):
+        self.accounts = {_normalize(a.name): a for a in Account.objects.filter(is_active=True)}
+        self.categories = {_normalize(c.name): c for c in Category.objects.filter(is_active=True)}
+
+    def account(self, name, default):
+        if not name:
+            return default
+        try:
+            return self.accounts[_normalize(name)]
+        except KeyError:
+            raise StatementError(f"conta '{name}' não encontrada")
+
+    def category(self, name, amount, income_default, expense_default):
+        if name:
+            try:
+                return self.categories[_normalize(name)]
+            except KeyError:
+                raise StatementError(f"categoria '{name}' não encontrada")
+        category = income_default if amount > 0 else expense_default
+        if category is None:
+            raise StatementError("linha sem categoria e nenhuma categoria padrão informada")
+        return category
+
+
+def import_statement(lines, account=None, income_category=None, expense_category=None,
+                     batch_size=IMPORT_BATCH_SIZE, skip_duplicates=True, log=None):
+    """
+    Grava as linhas do extrato como lançamentos, em lotes de bulk_create, numa única transação
+    (ledger_batch): os resumos e saldos são atualizados uma vez no fim, com os totais somados
+    por dia/categoria/conta. Valores negativos viram despesas; o lançamento guarda sempre o
+    valor absoluto. Linhas inválidas são puladas e listadas no resultado.
+    Com skip_duplicates, linhas cujo fingerprint já existia antes da importação são puladas
+    (uma consulta por lote), então reimportar o mesmo extrato não duplica lançamentos.
+    """
+    log = log or (lambda message: None)
+    started, started_at = time.monotonic(), timezone.now()
+    refs, result, batch = ReferenceCache(), ImportResult(), []
+
+    def flush():
+        if skip_duplicates:
+            existing = existing_fingerprints((entry.fingerprint for entry in batch), created_before=started_at)
+            if existing:
+                kept = [entry for entry in batch if entry.fingerprint not in existing]
+                result.duplicates += len(batch) - len(kept)
+                batch[:] = kept
+        AccountEntry.objects.bulk_create(batch)
+        ledger_bulk_changed.send(sender=AccountEntry, added=batch)
+        result.imported += len(batch)
+        result.batches += 1
+        log(f"  {result.imported} lançamentos importados...")
+        batch.clear()
+
+    with ledger_batch():
+        for line in lines:
+            result.read += 1
+            if line.error:
+                result.add_error(line.line, line.error)
+                continue
+            try:
+                if not line.value:
+                    raise StatementError("valor zerado")
+                target = refs.account(line.account, account)
+                if target is None:
+                    raise StatementError("linha sem conta e nenhuma conta padrão informada")
+                category = refs.category(line.category, line.value, income_category, expense_category)
+            except StatementError as e:
+                result.add_error(line.line, e)
+                continue
+            entry = AccountEntry(category_id=category.pk, account_id=target.pk, value=abs(line.value),
+                                 competence_date=line.date, describe=line.describe[:1000] or None)
+            entry.refresh_fingerprint()
+            batch.append(entry)
+            if len(batch) >= batch_size:
+                flush()
+        if batch:
+            flush()
+
+    result.elapsed_seconds = time.monotonic() - started
+    return result
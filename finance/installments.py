@@ -0,0 +1,86 @@
+from django.db import transaction
+
+from .models import AccountEntry, InstallmentPlan
+from .money import Money
+from .rollups import EntrySnapshot
+from .signals import ledger_batch, ledger_bulk_changed
+
+# Campos de uma parcela que dependem do plano (date_payment é do usuário e nunca é sobrescrito).
+SCHEDULE_FIELDS = ['category_id', 'account_id', 'value', 'describe', 'competence_date']
+
+
+# ===============================================
+# CÁLCULO DO CRONOGRAMA
+# ===============================================
+def split_total(total_value, number_of_installments):
+    """Divide o total em parcelas arredondadas; a última absorve a diferença de centavos (contas em int)."""
+    return [part.to_decimal() for part in Money.from_decimal(total_value).split(number_of_installments)]
+
+
+def build_schedule(plan):
+    """Lançamentos (não salvos, com fingerprint) de todas as parcelas do plano."""
+    from dateutil.relativedelta import relativedelta  # importação tardia: fora do cold start
+    total = plan.number_of_installments
+    entries = [
+        AccountEntry(category_id=plan.category_id, account_id=plan.account_id, value=value,
+                     describe=f"{plan.name} ({number}/{total})",
+                     competence_date=plan.first_installment_date + relativedelta(months=number - 1),
+                     installment_plan=plan, installment_number=number)
+        for number, value in enumerate(split_total(plan.total_value, total), start=1)
+    ]
+    for entry in entries:
+        entry.refresh_fingerprint()
+    return entries
+
+
+# ===============================================
+# CRIAÇÃO E EDIÇÃO (número fixo de consultas)
+# ===============================================
+def create_installment_plan(**fields):
+    """Cria o plano e todas as parcelas com um único bulk_create, numa transação."""
+    with transaction.atomic():
+        plan = InstallmentPlan.objects.create(**fields)
+        entries = AccountEntry.objects.bulk_create(build_schedule(plan))
+        ledger_bulk_changed.send(sender=AccountEntry, added=entries)
+    return plan
+
+
+def update_installment_plan(plan, **fields):
+    """
+    Atualiza o plano e sincroniza as parcelas pelo número da parcela: altera só as que
+    mudaram (bulk_update), cria as novas (bulk_create) e exclui as que sobraram.
+    Parcelas mantidas preservam id, date_added e date_payment.
+    """
+    with ledger_batch():
+        for name, value in fields.items():
+            setattr(plan, name, value)
+        plan.save()
+
+        current = {entry.installment_number: entry for entry in plan.accountentry_set.all()}
+        to_update, to_create, removed = [], [], []
+        for new in build_schedule(plan):
+            old = current.pop(new.installment_number, None)
+            if old is None:
+                to_create.append(new)
+                continue
+            if all(getattr(old, name) == getattr(new, name) for name in SCHEDULE_FIELDS):
+                continue
+            removed.append(EntrySnapshot(old.competence_date, old.category_id, old.account_id, old.value))
+            for name in SCHEDULE_FIELDS + ['fingerprint']:
+                setattr(old, name, getattr(new, name))
+            to_update.append(old)
+
+        if to_update:
+            AccountEntry.objects.bulk_update(to_update, SCHEDULE_FIELDS + ['fingerprint'])
+        if to_create:
+            AccountEntry.objects.bulk_create(to_create)
+        ledger_bulk_changed.send(sender=AccountEntry, added=to_update + to_create, removed=removed)
+        if current:
+            AccountEntry.objects.filter(pk__in=[entry.pk for entry in current.values()]).delete()
+    return plan
+
+
+def delete_installment_plan(plan):
+    """Exclui o plano e as parcelas (em cascata), atualizando os resumos uma única vez."""
+    with ledger_batch():
+        plan.delete()
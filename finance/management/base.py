@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+
+from finance.profiling import profile_call, save_profile
+
+
+class ProfiledCommand(BaseCommand):
+    """
+    BaseCommand com a opção --profile: executa o comando sob o cProfile, grava o perfil em
+    PROFILING_DIR e imprime o resumo (funções mais custosas e SQL) na saída de erro.
+    """
+
+    def create_parser(self, prog_name, subcommand, **kwargs):
+        parser = super().create_parser(prog_name, subcommand, **kwargs)
+        parser.add_argument('--profile', action='store_true',
+                            help='Executa sob o cProfile e grava o perfil (funções e SQL) em PROFILING_DIR.')
+        return parser
+
+    def execute(self, *args, **options):
+        if not options.get('profile'):
+            return super().execute(*args, **options)
+        name = self.__module__.rsplit('.', 1)[-1]
+        output, report, profiler = profile_call(f"command {name}", super().execute, *args, **options)
+        save_profile(report, profiler)
+        self.stderr.write(report.as_text())
+        return output
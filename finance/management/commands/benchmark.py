@@ -0,0 +1,50 @@
+# finance/management/commands/benchmark.py
+
+import json
+from pathlib import Path
+
+from django.core.management.base import CommandError
+
+from finance.benchmark import DEFAULT_REPEAT, DEFAULT_SIZES, TARGETS, compare_reports, load_report, run_benchmark
+from finance.management.base import ProfiledCommand
+
+
+class Command(ProfiledCommand):
+    help = ('Mede as principais páginas e a geração de recorrências com dados sintéticos de vários tamanhos. '
+            'Os dados de cada tamanho são desfeitos ao final; use um banco de testes.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', default=','.join(map(str, DEFAULT_SIZES)),
+                            help='Quantidades de lançamentos separadas por vírgula (padrão: %(default)s).')
+        parser.add_argument('--targets', default=','.join(TARGETS),
+                            help='Alvos medidos, separados por vírgula (padrão: todos).')
+        parser.add_argument('--repeat', type=int, default=DEFAULT_REPEAT,
+                            help='Medições por alvo, após uma de aquecimento (padrão: %(default)s).')
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--output', '-o', help='Grava o relatório JSON neste arquivo.')
+        parser.add_argument('--compare', help='Relatório JSON anterior para comparar as medianas.')
+
+    def handle(self, *args, **options):
+        try:
+            sizes = [int(size) for size in options['sizes'].split(',') if size.strip()]
+        except ValueError:
+            raise CommandError('--sizes deve ser uma lista de inteiros, ex.: 1000,10000.')
+        targets = [name.strip() for name in options['targets'].split(',') if name.strip()]
+        unknown = set(targets) - set(TARGETS)
+        if unknown:
+            raise CommandError(f"Alvos desconhecidos: {', '.join(sorted(unknown))}. Opções: {', '.join(TARGETS)}.")
+        if options['repeat'] < 1:
+            raise CommandError('--repeat deve ser positivo.')
+
+        report = run_benchmark(sizes, targets, options['repeat'], options['seed'], log=self.stdout.write)
+
+        if options['output']:
+            Path(options['output']).write_text(json.dumps(report, indent=2), encoding='utf-8')
+            self.stdout.write(self.style.SUCCESS(f"Relatório gravado em {options['output']}."))
+        else:
+            self.stdout.write(json.dumps(report, indent=2))
+
+        if options['compare']:
+            for entries, name, before, after, change in compare_reports(load_report(options['compare']), report):
+                style = self.style.ERROR if change > 10 else self.style.SUCCESS
+                self.stdout.write(style(f"{entries:>9} {name:<36} {before:>9.2f} ms -> {after:>9.2f} ms ({change:+.1f}%)"))
@@ -0,0 +1,48 @@
+# finance/management/commands/benchmark_connections.py
+
+import json
+import os
+from pathlib import Path
+
+from django.core.management.base import CommandError
+
+from finance.benchmark import DEFAULT_CONNECTION_REQUESTS, run_connection_benchmark
+from finance.management.base import ProfiledCommand
+from financial_management.database import CONNECTION_MODES
+
+
+class Command(ProfiledCommand):
+    help = ('Mede o custo de conexão por requisição no PostgreSQL em cada DB_CONNECTION_MODE '
+            '(pool, transaction, persistent). Só executa SELECT 1; use um banco local.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database-url', default=os.getenv('DATABASE_URL'),
+                            help='URL do PostgreSQL (padrão: DATABASE_URL).')
+        parser.add_argument('--modes', default=','.join(CONNECTION_MODES),
+                            help='Modos medidos, separados por vírgula (padrão: %(default)s).')
+        parser.add_argument('--requests', type=int, default=DEFAULT_CONNECTION_REQUESTS,
+                            help='Requisições simuladas por modo (padrão: %(default)s).')
+        parser.add_argument('--cold', action='store_true',
+                            help='Cada requisição num processo "novo", como uma lambda fria da Vercel.')
+        parser.add_argument('--sslmode', default='prefer', help='sslmode da conexão (padrão: %(default)s).')
+        parser.add_argument('--output', '-o', help='Grava o relatório JSON neste arquivo.')
+
+    def handle(self, *args, **options):
+        url = options['database_url']
+        if not url or not url.startswith(('postgres://', 'postgresql://')):
+            raise CommandError('Informe um PostgreSQL em --database-url ou DATABASE_URL.')
+        modes = [mode.strip() for mode in options['modes'].split(',') if mode.strip()]
+        unknown = set(modes) - set(CONNECTION_MODES)
+        if unknown:
+            raise CommandError(f"Modos desconhecidos: {', '.join(sorted(unknown))}. Opções: {', '.join(CONNECTION_MODES)}.")
+        if options['requests'] < 1:
+            raise CommandError('--requests deve ser positivo.')
+
+        report = run_connection_benchmark(url, modes, options['requests'], options['cold'],
+                                          environ={'DB_SSLMODE': options['sslmode']}, log=self.stdout.write)
+
+        if options['output']:
+            Path(options['output']).write_text(json.dumps(report, indent=2), encoding='utf-8')
+            self.stdout.write(self.style.SUCCESS(f"Relatório gravado em {options['output']}."))
+        else:
+            self.stdout.write(json.dumps(report, indent=2))
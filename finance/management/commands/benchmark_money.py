@@ -0,0 +1,40 @@
+# finance/management/commands/benchmark_money.py
+
+import json
+from pathlib import Path
+
+from django.core.management.base import CommandError
+
+from finance.benchmark import DEFAULT_MONEY_VALUES, DEFAULT_REPEAT, benchmark_money
+from finance.management.base import ProfiledCommand
+
+
+class Command(ProfiledCommand):
+    help = ('Compara somas e divisão em parcelas com Decimal e com centavos inteiros (Money), em Python '
+            'e, com --entries, no banco (Sum do DecimalField x Sum da coluna *_cents).')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--values', type=int, default=DEFAULT_MONEY_VALUES,
+                            help='Valores aleatórios somados e divididos em Python (padrão: %(default)s).')
+        parser.add_argument('--entries', type=int, default=0,
+                            help='Lançamentos sintéticos para medir as somas no banco; 0 pula essa parte '
+                                 '(os dados são desfeitos ao final).')
+        parser.add_argument('--repeat', type=int, default=DEFAULT_REPEAT,
+                            help='Medições por caminho (padrão: %(default)s).')
+        parser.add_argument('--seed', type=int, default=0, help='Semente dos dados aleatórios.')
+        parser.add_argument('--output', '-o', help='Grava o relatório JSON neste arquivo.')
+
+    def handle(self, *args, **options):
+        if options['values'] < 1 or options['entries'] < 0 or options['repeat'] < 1:
+            raise CommandError('--values e --repeat devem ser positivos e --entries não pode ser negativo.')
+
+        report = benchmark_money(options['values'], options['entries'], options['repeat'], options['seed'],
+                                 log=self.stdout.write)
+        if not (report['python']['sum_matches'] and report['python']['split_matches']):
+            self.stderr.write(self.style.ERROR('Decimal e centavos divergiram: confira o relatório.'))
+
+        if options['output']:
+            Path(options['output']).write_text(json.dumps(report, indent=2), encoding='utf-8')
+            self.stdout.write(self.style.SUCCESS(f"Relatório gravado em {options['output']}."))
+        else:
+            self.stdout.write(json.dumps(report, indent=2))
@@ -0,0 +1,51 @@
+# finance/management/commands/benchmark_sqlite.py
+
+import json
+from pathlib import Path
+
+from django.core.management.base import CommandError
+from django.db import connection
+
+from finance.benchmark import DEFAULT_CONCURRENCY_SECONDS, DEFAULT_WRITE_PAUSE_MS, run_sqlite_concurrency_benchmark
+from finance.management.base import ProfiledCommand
+from financial_management.database import SQLITE_PROFILES
+
+
+class Command(ProfiledCommand):
+    help = ('Compara os perfis do SQLite (SQLITE_PROFILE) com leituras e escritas simultâneas numa cópia '
+            'do banco atual (escritas por AccountEntry.objects.create, com resumos e saldos): operações '
+            'por segundo, latências e erros "database is locked".')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--profiles', default=','.join(SQLITE_PROFILES),
+                            help='Perfis medidos, separados por vírgula (padrão: %(default)s).')
+        parser.add_argument('--seconds', type=float, default=DEFAULT_CONCURRENCY_SECONDS,
+                            help='Duração de cada perfil (padrão: %(default)s).')
+        parser.add_argument('--readers', type=int, default=4, help='Threads de leitura (padrão: %(default)s).')
+        parser.add_argument('--writers', type=int, default=2, help='Threads de escrita (padrão: %(default)s).')
+        parser.add_argument('--write-pause-ms', type=float, default=DEFAULT_WRITE_PAUSE_MS,
+                            help='Pausa de cada escritor entre transações (padrão: %(default)s).')
+        parser.add_argument('--output', '-o', help='Grava o relatório JSON neste arquivo.')
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'sqlite' or connection.creation.is_in_memory_db(connection.settings_dict['NAME']):
+            raise CommandError('O banco configurado precisa ser um arquivo SQLite.')
+        profiles = [profile.strip() for profile in options['profiles'].split(',') if profile.strip()]
+        unknown = set(profiles) - set(SQLITE_PROFILES)
+        if unknown:
+            raise CommandError(f"Perfis desconhecidos: {', '.join(sorted(unknown))}. Opções: {', '.join(SQLITE_PROFILES)}.")
+        if options['seconds'] <= 0 or options['readers'] < 0 or options['writers'] < 0:
+            raise CommandError('--seconds deve ser positivo e --readers/--writers não podem ser negativos.')
+
+        try:
+            report = run_sqlite_concurrency_benchmark(str(connection.settings_dict['NAME']), profiles,
+                                                      options['seconds'], options['readers'], options['writers'],
+                                                      options['write_pause_ms'], log=self.stdout.write)
+        except ValueError as exc:
+            raise CommandError(str(exc))
+
+        if options['output']:
+            Path(options['output']).write_text(json.dumps(report, indent=2), encoding='utf-8')
+            self.stdout.write(self.style.SUCCESS(f"Relatório gravado em {options['output']}."))
+        else:
+            self.stdout.write(json.dumps(report, indent=2))
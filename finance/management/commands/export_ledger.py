@@ -0,0 +1,47 @@
+# finance/management/commands/export_ledger.py
+
+from datetime import datetime
+
+from django.core.management.base import CommandError
+
+from finance.exporter import EXPORT_CHUNK_SIZE, EXPORT_FORMATS, iter_ledger_rows
+from finance.feed import FeedFilters
+from finance.management.base import ProfiledCommand
+
+
+class Command(ProfiledCommand):
+    help = 'Exporta lançamentos e transferências (CSV ou JSON lines) em streaming, com os filtros da listagem.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--format', choices=sorted(EXPORT_FORMATS), default='csv')
+        parser.add_argument('--output', '-o', help='Arquivo de saída (padrão: saída padrão).')
+        parser.add_argument('--type', choices=['R', 'D'], help='Apenas receitas (R) ou despesas (D); exclui transferências.')
+        parser.add_argument('--date-from', help='Data inicial (AAAA-MM-DD).')
+        parser.add_argument('--date-to', help='Data final (AAAA-MM-DD).')
+        parser.add_argument('--chunk-size', type=int, default=EXPORT_CHUNK_SIZE,
+                            help='Linhas lidas do banco por vez (padrão: %(default)s).')
+
+    def handle(self, *args, **options):
+        for key in ('date_from', 'date_to'):
+            if options[key]:
+                try:
+                    datetime.strptime(options[key], '%Y-%m-%d')
+                except ValueError:
+                    raise CommandError(f"--{key.replace('_', '-')} deve estar no formato AAAA-MM-DD.")
+        filters = FeedFilters.from_query({'type': options['type'], 'date_from': options['date_from'],
+                                          'date_to': options['date_to']})
+        writer, _ = EXPORT_FORMATS[options['format']]
+        lines = writer(iter_ledger_rows(filters, chunk_size=options['chunk_size']))
+
+        output = open(options['output'], 'w', encoding='utf-8', newline='') if options['output'] else self.stdout
+        try:
+            count = 0
+            for line in lines:
+                output.write(line)
+                count += 1
+        finally:
+            if options['output']:
+                output.close()
+        if options['output']:
+            rows = count - 1 if options['format'] == 'csv' else count
+            self.stdout.write(self.style.SUCCESS(f"{rows} linhas exportadas para {options['output']}."))
@@ -0,0 +1,39 @@
+# finance/management/commands/find_duplicate_entries.py
+
+from django.core.management.base import CommandError
+from django.utils import timezone
+
+from finance.dedup import scan_duplicates
+from finance.management.base import ProfiledCommand
+
+
+class Command(ProfiledCommand):
+    help = 'Procura lançamentos duplicados (mesmo fingerprint) percorrendo o razão em blocos de meses.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--months-per-chunk', type=int, default=3,
+                            help='Quantidade de meses analisados por consulta (padrão: 3).')
+        parser.add_argument('--show', type=int, default=50,
+                            help='Máximo de grupos listados em detalhe (padrão: 50).')
+
+    def handle(self, *args, **options):
+        if options['months_per_chunk'] < 1:
+            raise CommandError('--months-per-chunk deve ser maior que zero.')
+
+        self.stdout.write(f"[{timezone.now()}] Procurando lançamentos duplicados...")
+        clusters = extra = shown = 0
+        for start, end, chunk_clusters in scan_duplicates(options['months_per_chunk']):
+            clusters += len(chunk_clusters)
+            extra += sum(cluster.extra_entries for cluster in chunk_clusters)
+            for cluster in chunk_clusters:
+                if shown >= options['show']:
+                    break
+                shown += 1
+                self.stdout.write(
+                    f"  {cluster.competence_date:%d/%m/%Y} {cluster.account} / {cluster.category} "
+                    f"R$ {cluster.value} '{cluster.describe}': {len(cluster.entry_ids)} lançamentos "
+                    f"(ids {', '.join(str(pk) for pk in cluster.entry_ids)})")
+
+        style = self.style.WARNING if clusters else self.style.SUCCESS
+        self.stdout.write(style(
+            f"[{timezone.now()}] Varredura concluída. {clusters} grupos duplicados, {extra} lançamentos excedentes."))
@@ -0,0 +1,62 @@
+# finance/management/commands/import_statement.py
+
+from django.core.management.base import CommandError
+from django.utils import timezone
+
+from finance.importer import (
+    IMPORT_BATCH_SIZE, StatementError, detect_format, import_statement, iter_csv, iter_ofx,
+)
+from finance.management.base import ProfiledCommand
+from finance.models import Account, Category
+
+
+class Command(ProfiledCommand):
+    help = 'Importa um extrato bancário (CSV ou OFX) como lançamentos, lendo o arquivo em streaming e gravando em lotes.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Caminho do arquivo .csv ou .ofx.')
+        parser.add_argument('--format', choices=['csv', 'ofx'], help='Formato do arquivo (padrão: pela extensão).')
+        parser.add_argument('--account', help='Nome da conta usada quando a linha não informa a conta.')
+        parser.add_argument('--income-category', help='Categoria padrão para valores positivos.')
+        parser.add_argument('--expense-category', help='Categoria padrão para valores negativos.')
+        parser.add_argument('--encoding', help='Codificação do arquivo (padrão: utf-8 para CSV, latin-1 para OFX).')
+        parser.add_argument('--delimiter', help="Separador do CSV (padrão: detecta ',' ou ';').")
+        parser.add_argument('--batch-size', type=int, default=IMPORT_BATCH_SIZE,
+                            help='Lançamentos gravados por lote (padrão: %(default)s).')
+        parser.add_argument('--keep-duplicates', action='store_true',
+                            help='Importa também linhas idênticas a lançamentos já existentes.')
+
+    def _lookup(self, model, name, label):
+        if not name:
+            return None
+        obj = model.objects.filter(name__iexact=name).first()
+        if obj is None:
+            raise CommandError(f"{label} '{name}' não encontrada.")
+        return obj
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size deve ser maior que zero.')
+        fmt = options['format'] or detect_format(options['path'])
+        account = self._lookup(Account, options['account'], 'Conta')
+        income = self._lookup(Category, options['income_category'], 'Categoria')
+        expense = self._lookup(Category, options['expense_category'], 'Categoria')
+
+        self.stdout.write(f"[{timezone.now()}] Importando {options['path']} ({fmt.upper()})...")
+        try:
+            with open(options['path'], 'rb') as stream:
+                if fmt == 'ofx':
+                    lines = iter_ofx(stream, encoding=options['encoding'] or 'latin-1')
+                else:
+                    lines = iter_csv(stream, encoding=options['encoding'] or 'utf-8-sig', delimiter=options['delimiter'])
+                result = import_statement(lines, account=account, income_category=income, expense_category=expense,
+                                          batch_size=options['batch_size'],
+                                          skip_duplicates=not options['keep_duplicates'], log=self.stdout.write)
+        except (OSError, StatementError) as e:
+            raise CommandError(str(e))
+
+        for error in result.errors:
+            self.stdout.write(self.style.WARNING(f"  {error}"))
+        self.stdout.write(self.style.SUCCESS(
+            f"[{timezone.now()}] Importação concluída. {result.imported} lançamentos importados, "
+            f"{result.duplicates} duplicados, {result.skipped} linhas ignoradas, {result.rows_per_second or 0} linhas/s."))
@@ -0,0 +1,36 @@
+# finance/management/commands/optimize_database.py
+
+from django.db import connection
+from django.utils import timezone
+
+from finance.management.base import ProfiledCommand
+
+
+class Command(ProfiledCommand):
+    help = ('Atualiza as estatísticas do planejador de consultas (PRAGMA optimize/ANALYZE no SQLite, '
+            'ANALYZE no PostgreSQL). Agende periodicamente, ex.: diariamente no cron.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--full', action='store_true',
+                            help='ANALYZE completo em vez do PRAGMA optimize incremental (SQLite).')
+        parser.add_argument('--checkpoint', action='store_true',
+                            help='No SQLite em WAL, também aplica e trunca o arquivo -wal.')
+
+    def handle(self, *args, **options):
+        self.stdout.write(f"[{timezone.now()}] Otimizando o banco ({connection.vendor})...")
+        with connection.cursor() as cursor:
+            if connection.vendor != 'sqlite':
+                cursor.execute('ANALYZE')
+            else:
+                if options['full']:
+                    cursor.execute('ANALYZE')
+                else:
+                    # analysis_limit limita as linhas lidas por índice: rápido mesmo em tabelas grandes.
+                    cursor.execute('PRAGMA analysis_limit=1000')
+                    cursor.execute('PRAGMA optimize')
+                if options['checkpoint']:
+                    cursor.execute('PRAGMA wal_checkpoint(TRUNCATE)')
+                    busy, wal_pages, checkpointed = cursor.fetchone()
+                    self.stdout.write(f"  Checkpoint: {checkpointed}/{wal_pages} páginas do WAL aplicadas"
+                                      f"{' (banco ocupado)' if busy else ''}.")
+        self.stdout.write(self.style.SUCCESS(f"[{timezone.now()}] Otimização concluída."))
@@ -0,0 +1,39 @@
+# finance/management/commands/rebuild_balances.py
+
+from django.core.management.base import CommandError
+from django.utils import timezone
+
+from finance.balances import rebuild_accounts
+from finance.management.base import ProfiledCommand
+from finance.models import Account
+
+
+class Command(ProfiledCommand):
+    help = 'Reconstrói o saldo atual (AccountBalance) e o histórico diário (DailyBalance) das contas, em lotes.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--accounts-per-batch', type=int, default=20,
+                            help='Quantidade de contas recalculadas por transação (padrão: 20).')
+        parser.add_argument('--account', type=int, action='append', dest='account_ids',
+                            help='Reconstrói apenas a conta com este ID (pode ser repetido).')
+
+    def handle(self, *args, **options):
+        batch_size = options['accounts_per_batch']
+        if batch_size < 1:
+            raise CommandError('--accounts-per-batch deve ser maior que zero.')
+
+        accounts = Account.objects.order_by('pk')
+        if options['account_ids']:
+            accounts = accounts.filter(pk__in=options['account_ids'])
+        account_ids = list(accounts.values_list('pk', flat=True))
+
+        self.stdout.write(f"[{timezone.now()}] Reconstruindo saldos de {len(account_ids)} contas...")
+        total_days = 0
+        for start in range(0, len(account_ids), batch_size):
+            batch = account_ids[start:start + batch_size]
+            days = rebuild_accounts(batch)
+            total_days += days
+            self.stdout.write(f"  Contas {batch[0]}..{batch[-1]}: {days} dias de histórico.")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"[{timezone.now()}] Reconstrução concluída. {total_days} linhas de histórico gravadas."))
@@ -0,0 +1,57 @@
+# finance/management/commands/rebuild_monthly_summary.py
+
+from datetime import datetime
+
+from django.core.management.base import CommandError
+from django.utils import timezone
+
+from finance.conditional import bump_data_version
+from finance.management.base import ProfiledCommand
+from finance.models import MonthlySummary
+from finance.rollups import iter_month_chunks, ledger_month_range, rebuild_chunk
+
+
+class Command(ProfiledCommand):
+    help = 'Reconstrói a tabela de resumos mensais (MonthlySummary) a partir dos lançamentos, em blocos de meses.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--months-per-chunk', type=int, default=3,
+                            help='Quantidade de meses recalculados por transação (padrão: 3).')
+        parser.add_argument('--from', dest='month_from', help='Primeiro mês a reconstruir (AAAA-MM).')
+        parser.add_argument('--to', dest='month_to', help='Último mês a reconstruir (AAAA-MM).')
+        parser.add_argument('--batch-size', type=int, default=1000, help='Tamanho dos lotes de INSERT.')
+
+    def handle(self, *args, **options):
+        if options['months_per_chunk'] < 1:
+            raise CommandError('--months-per-chunk deve ser maior que zero.')
+
+        ledger_range = ledger_month_range()
+        if ledger_range is None:
+            deleted, _ = MonthlySummary.objects.all().delete()
+            bump_data_version()
+            self.stdout.write(self.style.SUCCESS(f"Nenhum lançamento encontrado. {deleted} resumos removidos."))
+            return
+
+        first_month = self._parse_month(options['month_from']) or ledger_range[0]
+        last_month = self._parse_month(options['month_to']) or ledger_range[1]
+        if not options['month_from'] and not options['month_to']:
+            # Reconstrução completa: remove resumos de meses que não têm mais lançamentos.
+            MonthlySummary.objects.exclude(month__gte=first_month, month__lte=last_month).delete()
+
+        self.stdout.write(f"[{timezone.now()}] Reconstruindo resumos de {first_month:%m/%Y} a {last_month:%m/%Y}...")
+        total_rows = 0
+        for start, end in iter_month_chunks(first_month, last_month, options['months_per_chunk']):
+            rows = rebuild_chunk(start, end, batch_size=options['batch_size'])
+            total_rows += rows
+            self.stdout.write(f"  {start:%m/%Y} até {end:%m/%Y} (exclusive): {rows} linhas.")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"[{timezone.now()}] Reconstrução concluída. {total_rows} linhas de resumo gravadas."))
+
+    def _parse_month(self, value):
+        if not value:
+            return None
+        try:
+            return datetime.strptime(value, '%Y-%m').date()
+        except ValueError:
+            raise CommandError(f"Mês inválido '{value}'. Use o formato AAAA-MM.")
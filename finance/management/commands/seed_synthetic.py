@@ -0,0 +1,40 @@
+# finance/management/commands/seed_synthetic.py
+
+import json
+
+from django.core.management.base import CommandError
+
+from finance.management.base import ProfiledCommand
+from finance.synthetic import SEED_BATCH_SIZE, SyntheticSpec, seed_synthetic
+
+
+class Command(ProfiledCommand):
+    help = 'Popula o banco com dados sintéticos reproduzíveis (contas, categorias, lançamentos, transferências, parcelamentos, metas e recorrências).'
+
+    def add_arguments(self, parser):
+        defaults = SyntheticSpec()
+        parser.add_argument('--accounts', type=int, default=defaults.accounts)
+        parser.add_argument('--categories', type=int, default=defaults.categories)
+        parser.add_argument('--entries', type=int, default=defaults.entries,
+                            help='Lançamentos avulsos (padrão: %(default)s; aceita até 10 milhões).')
+        parser.add_argument('--transfers', type=int, default=defaults.transfers)
+        parser.add_argument('--installment-plans', type=int, default=defaults.installment_plans)
+        parser.add_argument('--goals', type=int, default=defaults.goals)
+        parser.add_argument('--recurrences', type=int, default=defaults.recurrences)
+        parser.add_argument('--months', type=int, default=defaults.months,
+                            help='Meses de histórico em que as datas são distribuídas (padrão: %(default)s).')
+        parser.add_argument('--seed', type=int, default=0, help='Semente do gerador (mesma semente, mesmos dados).')
+        parser.add_argument('--batch-size', type=int, default=SEED_BATCH_SIZE,
+                            help='Linhas por bulk_create (padrão: %(default)s).')
+        parser.add_argument('--json', action='store_true', help='Imprime o relatório final em JSON.')
+
+    def handle(self, *args, **options):
+        counts = {name: options[name] for name in SyntheticSpec.__dataclass_fields__}
+        if any(value < 0 for value in counts.values()) or options['batch_size'] < 1:
+            raise CommandError('As quantidades não podem ser negativas e --batch-size deve ser positivo.')
+        result = seed_synthetic(SyntheticSpec(**counts), seed=options['seed'], batch_size=options['batch_size'],
+                                log=self.stdout.write)
+        summary = ', '.join(f'{value} {name}' for name, value in result.counts.items())
+        self.stdout.write(self.style.SUCCESS(f"Dados sintéticos gerados em {result.elapsed_seconds:.1f}s: {summary}."))
+        if options['json']:
+            self.stdout.write(json.dumps(result.as_report()))
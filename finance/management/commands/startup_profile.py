@@ -0,0 +1,48 @@
+# finance/management/commands/startup_profile.py
+
+import json
+
+from django.core.management.base import CommandError
+
+from finance.management.base import ProfiledCommand
+from finance.startup import STARTUP_PATH, STARTUP_TOP_MODULES, measure_cold_start
+
+
+class Command(ProfiledCommand):
+    help = ('Mede o cold start da aplicação WSGI (como na Vercel) num processo novo: tempo até ficar pronta, '
+            'primeira requisição e tempo de importação por módulo, comparados com COLD_START_BUDGET_MS.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--path', default=STARTUP_PATH, help='URL da primeira requisição (padrão: %(default)s).')
+        parser.add_argument('--top', type=int, default=STARTUP_TOP_MODULES,
+                            help='Módulos listados, pelo tempo acumulado (padrão: %(default)s).')
+        parser.add_argument('--budget-ms', type=float,
+                            help='Orçamento em ms até a aplicação ficar pronta (padrão: COLD_START_BUDGET_MS).')
+        parser.add_argument('--serverless', action='store_true',
+                            help='Simula o ambiente da Vercel (VERCEL=1: sem dotenv, WhiteNoise e admin).')
+        parser.add_argument('--json', action='store_true', help='Imprime o relatório em JSON.')
+
+    def handle(self, *args, **options):
+        try:
+            report = measure_cold_start(options['path'], options['top'],
+                                        env={'VERCEL': '1'} if options['serverless'] else None)
+        except RuntimeError as exc:
+            raise CommandError(f"Falha ao medir o cold start: {exc}")
+        if options['budget_ms'] is not None:
+            report.budget_ms = options['budget_ms']
+
+        if options['json']:
+            self.stdout.write(json.dumps(report.as_dict(), indent=2))
+        else:
+            self.stdout.write(f"Aplicação pronta: {report.ready_ms:.1f} ms | primeira requisição "
+                              f"({options['path']}, {report.status}): {report.first_request_ms:.1f} ms | "
+                              f"total: {report.total_ms:.1f} ms")
+            self.stdout.write(f"{'acumulado':>11} {'próprio':>9}  módulo")
+            for module in report.modules:
+                self.stdout.write(f"{module['cumulative_ms']:>8.1f} ms {module['self_ms']:>6.1f} ms  "
+                                  f"{'  ' * module['depth']}{module['module']}")
+
+        if report.over_budget:
+            raise CommandError(f"Cold start acima do orçamento: {report.ready_ms:.1f} ms > {report.budget_ms:.0f} ms.")
+        if report.budget_ms is not None:
+            self.stdout.write(self.style.SUCCESS(f"Dentro do orçamento de {report.budget_ms:.0f} ms."))
@@ -0,0 +1,115 @@
+import threading
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+
+from django.conf import settings
+from django.template.backends.django import DjangoTemplates
+
+# Métricas da requisição em andamento (None fora do RequestMetricsMiddleware).
+_current_metrics = ContextVar('request_metrics', default=None)
+_metrics_lock = threading.Lock()
+
+
+@dataclass
+class RequestMetrics:
+    started: float = field(default_factory=time.perf_counter)
+    queries: int = 0
+    db_seconds: float = 0.0
+    template_seconds: float = 0.0  # inclui as consultas feitas durante a renderização
+    total_seconds: float = 0.0
+
+    def finish(self):
+        self.total_seconds = time.perf_counter() - self.started
+
+    def server_timing(self):
+        """Valor do cabeçalho Server-Timing (durações em milissegundos)."""
+        return ', '.join([
+            f'db;dur={self.db_seconds * 1000:.1f};desc="{self.queries} queries"',
+            f'tpl;dur={self.template_seconds * 1000:.1f}',
+            f'total;dur={self.total_seconds * 1000:.1f}',
+        ])
+
+    def as_log(self):
+        return {
+            'queries': self.queries,
+            'db_ms': round(self.db_seconds * 1000, 1),
+            'template_ms': round(self.template_seconds * 1000, 1),
+            'total_ms': round(self.total_seconds * 1000, 1),
+        }
+
+
+def current_metrics():
+    return _current_metrics.get()
+
+
+def begin_metrics():
+    metrics = RequestMetrics()
+    return metrics, _current_metrics.set(metrics)
+
+
+def end_metrics(token):
+    _current_metrics.reset(token)
+
+
+BUDGETED_METHODS = ('GET', 'HEAD')
+
+
+def query_budget(view_name, method='GET'):
+    """
+    Orçamento de consultas da view (settings.VIEW_QUERY_BUDGETS), ou None quando não há limite.
+    Só leituras (GET/HEAD) têm orçamento: as escritas também mantêm resumos e saldos.
+    """
+    if method not in BUDGETED_METHODS:
+        return None
+    return getattr(settings, 'VIEW_QUERY_BUDGETS', {}).get(view_name)
+
+
+# ===============================================
+# CONSULTAS: execute_wrapper conta e cronometra cada SQL
+# ===============================================
+def record_query(execute, sql, params, many, context):
+    metrics = _current_metrics.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        elapsed = time.perf_counter() - started
+        with _metrics_lock:  # views assíncronas consultam em várias threads (finance/querygroups.py)
+            metrics.queries += 1
+            metrics.db_seconds += elapsed
+
+
+# ===============================================
+# TEMPLATES: backend que cronometra a renderização
+# ===============================================
+class TimedTemplate:
+    """Envolve o template do backend e soma o tempo de render() nas métricas da requisição."""
+
+    def __init__(self, template):
+        self.template = template
+
+    def __getattr__(self, name):
+        return getattr(self.template, name)
+
+    def render(self, context=None, request=None):
+        metrics = _current_metrics.get()
+        if metrics is None:
+            return self.template.render(context, request)
+        started = time.perf_counter()
+        try:
+            return self.template.render(context, request)
+        finally:
+            metrics.template_seconds += time.perf_counter() - started
+
+
+class TimedDjangoTemplates(DjangoTemplates):
+    """DjangoTemplates com tempo de renderização medido (só os templates de nível superior)."""
+
+    def from_string(self, template_code):
+        return TimedTemplate(super().from_string(template_code))
+
+    def get_template(self, template_name):
+        return TimedTemplate(super().get_template(template_name))
@@ -0,0 +1,98 @@
+import json
+import logging
+from contextlib import ExitStack
+
+from django.db import connections
+from django.http import HttpResponse
+
+from .metrics import begin_metrics, end_metrics, query_budget, record_query
+from .profiling import profile_call, save_profile
+from .refdata import begin_request, end_request
+
+logger = logging.getLogger('finance.metrics')
+
+
+# ===============================================
+# MIDDLEWARE: métricas de SQL e latência por requisição
+# ===============================================
+class RequestMetricsMiddleware:
+    """
+    Conta as consultas e mede o tempo de banco, de templates e total de cada requisição.
+    Devolve tudo no cabeçalho Server-Timing, registra uma linha JSON no logger finance.metrics
+    e avisa quando uma leitura (GET/HEAD) passa do orçamento de consultas da view (settings.VIEW_QUERY_BUDGETS).
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        metrics, token = begin_metrics()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(record_query))
+                response = self.get_response(request)
+        finally:
+            end_metrics(token)
+        metrics.finish()
+
+        view_name = request.resolver_match.view_name if request.resolver_match else None
+        response['Server-Timing'] = metrics.server_timing()
+        record = {'method': request.method, 'path': request.path, 'view': view_name,
+                  'status': response.status_code, **metrics.as_log()}
+        logger.info(json.dumps(record))
+        budget = query_budget(view_name, request.method)
+        if budget is not None and metrics.queries > budget:
+            logger.warning(json.dumps({**record, 'event': 'query_budget_exceeded', 'budget': budget}))
+        return response
+
+
+# ===============================================
+# MIDDLEWARE: dados de referência por requisição
+# ===============================================
+class ReferenceDataMiddleware:
+    """Abre o escopo em que contas/categorias dos formulários são carregadas uma única vez."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        token = begin_request()
+        try:
+            return self.get_response(request)
+        finally:
+            end_request(token)
+
+
+# ===============================================
+# MIDDLEWARE: perfil sob demanda (somente equipe)
+# ===============================================
+PROFILE_PARAM = '_profile'
+PROFILE_HEADER = 'X-Profile'
+PROFILE_MODES = ('1', 'show')
+
+
+class ProfilingMiddleware:
+    """
+    Para usuários da equipe (is_staff), ?_profile=1 ou o cabeçalho X-Profile: 1 executam a view
+    sob o cProfile e gravam o perfil em PROFILING_DIR (cabeçalho X-Profile-Path na resposta).
+    Com ?_profile=show a resposta é substituída pelo relatório em texto (funções e SQL).
+    Qualquer outro valor (0, false...) não liga o perfil.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        mode = request.GET.get(PROFILE_PARAM) or request.headers.get(PROFILE_HEADER)
+        user = getattr(request, 'user', None)
+        if mode not in PROFILE_MODES or not (user and user.is_staff):
+            return self.get_response(request)
+
+        response, report, profiler = profile_call(f"{request.method} {request.path}", self.get_response, request)
+        path = save_profile(report, profiler)
+        if mode == 'show':
+            response = HttpResponse(report.as_text(), content_type='text/plain; charset=utf-8')
+        if path:
+            response['X-Profile-Path'] = path
+        return response
@@ -0,0 +1,46 @@
+# Generated by Django 5.2.7 on 2026-10-18 17:16
+
+import django.db.models.deletion
+from decimal import Decimal
+from django.db import migrations, models
+from django.db.models import Count, Sum
+from django.db.models.functions import TruncMonth
+
+
+def populate_monthly_summary(apps, schema_editor):
+    AccountEntry = apps.get_model('finance', 'AccountEntry')
+    MonthlySummary = apps.get_model('finance', 'MonthlySummary')
+    rows = (AccountEntry.objects.annotate(month=TruncMonth('competence_date'))
+            .values('month', 'category_id', 'account_id')
+            .annotate(total=Sum('value'), count=Count('id')).order_by())
+    MonthlySummary.objects.bulk_create(
+        [MonthlySummary(month=row['month'], category_id=row['category_id'], account_id=row['account_id'],
+                        total_value=row['total'], entry_count=row['count']) for row in rows],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('finance', '0010_recurringtransaction'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MonthlySummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('month', models.DateField(verbose_name='Mês (primeiro dia)')),
+                ('total_value', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=14)),
+                ('entry_count', models.IntegerField(default=0)),
+                ('account', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='monthly_summaries', to='finance.account')),
+                ('category', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='monthly_summaries', to='finance.category')),
+            ],
+            options={
+                'ordering': ['month'],
+                'constraints': [models.UniqueConstraint(fields=('month', 'category', 'account'), name='unique_monthly_summary_key')],
+            },
+        ),
+        migrations.RunPython(populate_monthly_summary, migrations.RunPython.noop),
+    ]
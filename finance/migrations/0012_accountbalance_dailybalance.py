@@ -0,0 +1,64 @@
+# Generated by Django 5.2.7 on 2026-10-18 17:18
+
+import django.db.models.deletion
+from decimal import Decimal
+from collections import defaultdict
+from django.db import migrations, models
+from django.db.models import Sum
+
+
+def populate_balances(apps, schema_editor):
+    AccountEntry = apps.get_model('finance', 'AccountEntry')
+    Transfer = apps.get_model('finance', 'Transfer')
+    AccountBalance = apps.get_model('finance', 'AccountBalance')
+    DailyBalance = apps.get_model('finance', 'DailyBalance')
+    deltas = defaultdict(lambda: Decimal('0.00'))
+    for row in (AccountEntry.objects.values('account_id', 'competence_date', 'category__type')
+                .annotate(total=Sum('value')).order_by()):
+        direction = 1 if row['category__type'] == 'R' else -1
+        deltas[(row['account_id'], row['competence_date'])] += direction * row['total']
+    for field, direction in (('account_origin_id', -1), ('account_destination_id', 1)):
+        for row in Transfer.objects.values(field, 'date').annotate(total=Sum('value')).order_by():
+            deltas[(row[field], row['date'])] += direction * row['total']
+    history, totals = [], defaultdict(lambda: Decimal('0.00'))
+    for (account_id, day), value in sorted(deltas.items()):
+        totals[account_id] += value
+        history.append(DailyBalance(account_id=account_id, date=day, delta=value, balance=totals[account_id]))
+    DailyBalance.objects.bulk_create(history, batch_size=1000)
+    AccountBalance.objects.bulk_create(
+        [AccountBalance(account_id=account_id, balance=total) for account_id, total in totals.items()],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('finance', '0011_monthlysummary'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AccountBalance',
+            fields=[
+                ('account', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='balance_snapshot', serialize=False, to='finance.account')),
+                ('balance', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=14)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='DailyBalance',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('delta', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=14)),
+                ('balance', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=14)),
+                ('account', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_balances', to='finance.account')),
+            ],
+            options={
+                'ordering': ['account', 'date'],
+                'constraints': [models.UniqueConstraint(fields=('account', 'date'), name='unique_daily_balance_key')],
+            },
+        ),
+        migrations.RunPython(populate_balances, migrations.RunPython.noop),
+    ]
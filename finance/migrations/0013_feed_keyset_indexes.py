@@ -0,0 +1,21 @@
+# Generated by Django 5.2.7 on 2026-10-18 17:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('finance', '0012_accountbalance_dailybalance'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='accountentry',
+            index=models.Index(fields=['competence_date', 'id'], name='entry_feed_keyset_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='transfer',
+            index=models.Index(fields=['date', 'id'], name='transfer_feed_keyset_idx'),
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 5.2.7 on 2026-10-18 17:25
+
+from dateutil.relativedelta import relativedelta
+from django.db import migrations, models
+
+STEPS = {'WEEKLY': relativedelta(weeks=1), 'MONTHLY': relativedelta(months=1), 'YEARLY': relativedelta(years=1)}
+
+
+def refresh_next_due_dates(apps, schema_editor):
+    # Mesma regra de RecurringTransaction.calculate_next_due_date (modelos históricos não têm o método).
+    RecurringTransaction = apps.get_model('finance', 'RecurringTransaction')
+    changed = []
+    for rt in RecurringTransaction.objects.all():
+        step = STEPS.get(rt.frequency)
+        next_date = (rt.last_generated_date or rt.start_date) + step if step else None
+        if next_date and rt.end_date and next_date > rt.end_date:
+            next_date = None
+        if next_date and next_date < rt.start_date:
+            next_date = rt.start_date if not rt.last_generated_date else None
+        if next_date != rt.next_due_date:
+            rt.next_due_date = next_date
+            changed.append(rt)
+    RecurringTransaction.objects.bulk_update(changed, ['next_due_date'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('finance', '0013_feed_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='recurringtransaction',
+            index=models.Index(fields=['is_active', 'next_due_date'], name='recurrence_due_idx'),
+        ),
+        migrations.RunPython(refresh_next_due_dates, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,46 @@
+# Generated by Django 5.2.7 on 2026-10-18 17:34
+
+import hashlib
+import unicodedata
+from decimal import Decimal
+
+from django.db import migrations, models
+
+
+def fingerprint(entry):
+    # Cópia de finance.models.entry_fingerprint (a migração não depende do código atual do app).
+    text = unicodedata.normalize('NFKD', entry.describe or '')
+    describe = ' '.join(''.join(c for c in text if not unicodedata.combining(c)).casefold().split())
+    value = Decimal(str(entry.value)).quantize(Decimal('0.01'))
+    raw = f"{entry.account_id}|{entry.category_id}|{value}|{entry.competence_date.isoformat()}|{describe}"
+    return hashlib.sha1(raw.encode('utf-8')).hexdigest()
+
+
+def populate_fingerprints(apps, schema_editor):
+    AccountEntry = apps.get_model('finance', 'AccountEntry')
+    entries = AccountEntry.objects.only('account_id', 'category_id', 'value', 'competence_date', 'describe')
+    batch = []
+    for entry in entries.iterator(chunk_size=2000):
+        entry.fingerprint = fingerprint(entry)
+        batch.append(entry)
+        if len(batch) >= 2000:
+            AccountEntry.objects.bulk_update(batch, ['fingerprint'])
+            batch = []
+    if batch:
+        AccountEntry.objects.bulk_update(batch, ['fingerprint'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('finance', '0015_recurrence_due_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='accountentry',
+            name='fingerprint',
+            field=models.CharField(db_index=True, default='', editable=False, max_length=40),
+        ),
+        migrations.RunPython(populate_fingerprints, migrations.RunPython.noop),
+    ]
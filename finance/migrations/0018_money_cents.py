@@ -0,0 +1,43 @@
+# Generated by Django 5.2.7 on 2026-10-18 18:00
+
+import django.db.models.expressions
+import django.db.models.functions.comparison
+import django.db.models.functions.math
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('finance', '0017_dataversion'),
+    ]
+
+    # Colunas geradas e gravadas pelo banco: o ADD COLUMN já preenche as linhas existentes
+    # (não há RunPython de migração de dados) e toda escrita posterior as recalcula.
+    operations = [
+        migrations.AddField(
+            model_name='accountentry',
+            name='value_cents',
+            field=models.GeneratedField(db_persist=True, expression=django.db.models.functions.comparison.Cast(django.db.models.functions.math.Round(django.db.models.expressions.CombinedExpression(models.F('value'), '*', models.Value(100))), models.BigIntegerField()), output_field=models.BigIntegerField()),
+        ),
+        migrations.AddField(
+            model_name='goal',
+            name='target_amount_cents',
+            field=models.GeneratedField(db_persist=True, expression=django.db.models.functions.comparison.Cast(django.db.models.functions.math.Round(django.db.models.expressions.CombinedExpression(models.F('target_amount'), '*', models.Value(100))), models.BigIntegerField()), output_field=models.BigIntegerField()),
+        ),
+        migrations.AddField(
+            model_name='installmentplan',
+            name='total_value_cents',
+            field=models.GeneratedField(db_persist=True, expression=django.db.models.functions.comparison.Cast(django.db.models.functions.math.Round(django.db.models.expressions.CombinedExpression(models.F('total_value'), '*', models.Value(100))), models.BigIntegerField()), output_field=models.BigIntegerField()),
+        ),
+        migrations.AddField(
+            model_name='recurringtransaction',
+            name='value_cents',
+            field=models.GeneratedField(db_persist=True, expression=django.db.models.functions.comparison.Cast(django.db.models.functions.math.Round(django.db.models.expressions.CombinedExpression(models.F('value'), '*', models.Value(100))), models.BigIntegerField()), output_field=models.BigIntegerField()),
+        ),
+        migrations.AddField(
+            model_name='transfer',
+            name='value_cents',
+            field=models.GeneratedField(db_persist=True, expression=django.db.models.functions.comparison.Cast(django.db.models.functions.math.Round(django.db.models.expressions.CombinedExpression(models.F('value'), '*', models.Value(100))), models.BigIntegerField()), output_field=models.BigIntegerField()),
+        ),
+    ]
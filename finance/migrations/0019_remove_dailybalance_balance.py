@@ -0,0 +1,17 @@
+# Generated by Django 5.2.7 on 2026-10-18 18:18
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('finance', '0018_money_cents'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='dailybalance',
+            name='balance',
+        ),
+    ]
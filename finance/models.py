@@ -1,10 +1,28 @@
-from django.db import models
+import hashlib
+import unicodedata
+
+from django.db import models, transaction
 from django.db.models.signals import pre_delete
 from django.dispatch import receiver
 from django.utils import timezone
 from datetime import date
 from decimal import Decimal  # Import necessário
 
+from .money import cents_field
+
+
+def normalize_description(text):
+    """Descrição sem acentos, em minúsculas e com espaços simples (para comparar lançamentos)."""
+    text = unicodedata.normalize('NFKD', text or '')
+    return ' '.join(''.join(c for c in text if not unicodedata.combining(c)).casefold().split())
+
+
+def entry_fingerprint(account_id, category_id, value, competence_date, describe):
+    """Hash estável do conteúdo de um lançamento: conta, categoria, valor, data e descrição normalizada."""
+    value = Decimal(str(value)).quantize(Decimal('0.01'))
+    raw = f"{account_id}|{category_id}|{value}|{competence_date.isoformat()}|{normalize_description(describe)}"
+    return hashlib.sha1(raw.encode('utf-8')).hexdigest()
+
 
 # ===============================================
 # MODELO: CONTA (Sem alterações)
@@ -48,6 +66,11 @@ class Category(models.Model):
         status = "" if self.is_active else "Arquivada"
         return f"[{self.get_type_display()}] {self.name}{status}"
 
+    def save(self, *args, **kwargs):
+        # Mudar o tipo reconstrói os saldos das contas (sinal post_save) na mesma transação.
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+
     class Meta:
         ordering = ['type', 'name']
 
@@ -58,6 +81,7 @@ class Category(models.Model):
 class InstallmentPlan(models.Model):
     name = models.CharField(max_length=150, verbose_name="Nome da Compra")
     total_value = models.DecimalField(max_digits=10, decimal_places=2, verbose_name="Valor Total")
+    total_value_cents = cents_field('total_value')  # mesmo valor em centavos (BIGINT gerado pelo banco)
     number_of_installments = models.PositiveSmallIntegerField(verbose_name="Número de Parcelas")
     account = models.ForeignKey(Account, on_delete=models.PROTECT, verbose_name="Conta (Cartão)")
     category = models.ForeignKey(Category, on_delete=models.PROTECT, verbose_name="Categoria")
@@ -82,6 +106,7 @@ class AccountEntry(models.Model):
     category = models.ForeignKey(Category, on_delete=models.PROTECT)
     account = models.ForeignKey(Account, on_delete=models.PROTECT, verbose_name="Conta")
     value = models.DecimalField(max_digits=10, decimal_places=2)
+    value_cents = cents_field('value')  # mesmo valor em centavos (BIGINT gerado pelo banco)
     date_added = models.DateTimeField(auto_now_add=True)
     competence_date = models.DateField(default=date.today, verbose_name="Data da Competência")
     date_payment = models.DateField(null=True, blank=True, verbose_name="Data do Pagamento (Opcional)",
@@ -90,12 +115,34 @@ class AccountEntry(models.Model):
     installment_plan = models.ForeignKey(InstallmentPlan, on_delete=models.CASCADE, null=True, blank=True,
                                          verbose_name="Plano de Parcelamento")
     installment_number = models.PositiveSmallIntegerField(null=True, blank=True, verbose_name="Número da Parcela")
+    # Hash do conteúdo (entry_fingerprint) para detectar duplicatas com uma consulta indexada.
+    fingerprint = models.CharField(max_length=40, db_index=True, editable=False, default='')
 
     def __str__(self):
         return f"[{self.category.get_type_display()}] {self.describe or self.category.name} - R$ {self.value}"
 
     class Meta:
         ordering = ['-competence_date', '-date_added']
+        indexes = [
+            # Paginação por cursor do histórico (finance/feed.py)
+            models.Index(fields=['competence_date', 'id'], name='entry_feed_keyset_idx'),
+        ]
+
+    def refresh_fingerprint(self):
+        """Recalcula o fingerprint; caminhos em lote (bulk_create/bulk_update) devem chamá-lo antes de gravar."""
+        self.fingerprint = entry_fingerprint(self.account_id, self.category_id, self.value,
+                                             self.competence_date, self.describe)
+        return self.fingerprint
+
+    def save(self, *args, **kwargs):
+        # Mantém o fingerprint em dia a cada gravação
+        self.refresh_fingerprint()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'fingerprint' not in update_fields:
+            kwargs['update_fields'] = [*update_fields, 'fingerprint']
+        # O INSERT/UPDATE e a manutenção dos resumos (sinais post_save) entram ou falham juntos.
+        with transaction.atomic():
+            super().save(*args, **kwargs)
 
 
 @receiver(pre_delete, sender=Category)
@@ -113,14 +160,23 @@ class Transfer(models.Model):
     account_destination = models.ForeignKey(Account, on_delete=models.PROTECT, related_name="transfers_in",
                                             verbose_name="Conta de Destino")
     value = models.DecimalField(max_digits=10, decimal_places=2, verbose_name="Valor (R$)")
+    value_cents = cents_field('value')  # mesmo valor em centavos (BIGINT gerado pelo banco)
     date = models.DateField(default=date.today, verbose_name="Data da Transferência")
     describe = models.CharField(max_length=200, blank=True, null=True, verbose_name="Descrição (Opcional)")
 
     def __str__(self):
         return f"R$ {self.value} de {self.account_origin.name} para {self.account_destination.name}"
 
+    def save(self, *args, **kwargs):
+        # A gravação e a atualização dos saldos (sinais post_save) entram ou falham juntas.
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+
     class Meta:
         ordering = ['-date']
+        indexes = [
+            models.Index(fields=['date', 'id'], name='transfer_feed_keyset_idx'),
+        ]
 
 
 # ===============================================
@@ -129,6 +185,7 @@ class Transfer(models.Model):
 class Goal(models.Model):
     name = models.CharField(max_length=150, verbose_name="Nome da Meta")
     target_amount = models.DecimalField(max_digits=12, decimal_places=2, verbose_name="Valor Alvo (R$)")
+    target_amount_cents = cents_field('target_amount')  # mesmo valor em centavos (BIGINT gerado pelo banco)
     target_date = models.DateField(verbose_name="Data Prevista")
     linked_category = models.ForeignKey(Category, on_delete=models.PROTECT,
                                         verbose_name="Categoria Vinculada (Poupança/Investimento)",
@@ -153,6 +210,7 @@ class RecurringTransaction(models.Model):
     category = models.ForeignKey(Category, on_delete=models.PROTECT, verbose_name="Categoria")
     account = models.ForeignKey(Account, on_delete=models.PROTECT, verbose_name="Conta")
     value = models.DecimalField(max_digits=10, decimal_places=2, verbose_name="Valor (R$)")
+    value_cents = cents_field('value')  # mesmo valor em centavos (BIGINT gerado pelo banco)
     describe = models.CharField(max_length=200, verbose_name="Descrição")
 
     FREQUENCY_CHOICES = [
@@ -181,6 +239,10 @@ class RecurringTransaction(models.Model):
         ordering = ['start_date', 'describe']
         verbose_name = "Transação Recorrente"
         verbose_name_plural = "Transações Recorrentes"
+        indexes = [
+            # Varredura do cron: apenas as recorrências ativas com next_due_date <= hoje.
+            models.Index(fields=['is_active', 'next_due_date'], name='recurrence_due_idx'),
+        ]
 
     # Método para calcular a próxima data (pode ser usado no comando)
     def calculate_next_due_date(self, from_date=None):
@@ -212,7 +274,95 @@ class RecurringTransaction(models.Model):
 
         return next_date
 
-    def save(self, *args, **kwargs):
-        # Atualiza a next_due_date sempre que salvar
+    def refresh_next_due_date(self):
+        """Recalcula next_due_date a partir da última data gerada (None quando não há próxima)."""
         self.next_due_date = self.calculate_next_due_date()
-        super().save(*args, **kwargs)
\ No newline at end of file
+        return self.next_due_date
+
+    def save(self, *args, **kwargs):
+        # Atualiza a next_due_date sempre que salvar (criação, edição e ativação/desativação)
+        self.refresh_next_due_date()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'next_due_date' not in update_fields:
+            kwargs['update_fields'] = [*update_fields, 'next_due_date']
+        super().save(*args, **kwargs)
+
+# ===============================================
+# NOVO MODELO: RESUMO MENSAL (mês x categoria x conta)
+# ===============================================
+class MonthlySummary(models.Model):
+    """
+    Totais materializados dos lançamentos por mês, categoria e conta.
+    Mantido incrementalmente por finance/rollups.py; pode ser reconstruído
+    com o comando rebuild_monthly_summary.
+    """
+    month = models.DateField(verbose_name="Mês (primeiro dia)")
+    category = models.ForeignKey(Category, on_delete=models.CASCADE, related_name="monthly_summaries")
+    account = models.ForeignKey(Account, on_delete=models.CASCADE, related_name="monthly_summaries")
+    total_value = models.DecimalField(max_digits=14, decimal_places=2, default=Decimal('0.00'))
+    total_value_cents = cents_field('total_value')  # mesmo valor em centavos (BIGINT gerado pelo banco)
+    entry_count = models.IntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.month:%m/%Y} - {self.category_id}/{self.account_id}: R$ {self.total_value}"
+
+    class Meta:
+        ordering = ['month']
+        constraints = [
+            models.UniqueConstraint(fields=['month', 'category', 'account'], name='unique_monthly_summary_key'),
+        ]
+
+
+# ===============================================
+# NOVOS MODELOS: SALDO POR CONTA
+# ===============================================
+class AccountBalance(models.Model):
+    """
+    Saldo atual de cada conta (receitas - despesas + transferências recebidas - enviadas).
+    Mantido a cada escrita por finance/balances.py.
+    """
+    account = models.OneToOneField(Account, on_delete=models.CASCADE, primary_key=True,
+                                   related_name="balance_snapshot")
+    balance = models.DecimalField(max_digits=14, decimal_places=2, default=Decimal('0.00'))
+    balance_cents = cents_field('balance')  # mesmo valor em centavos (BIGINT gerado pelo banco)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.account_id}: R$ {self.balance}"
+
+
+class DailyBalance(models.Model):
+    """
+    Histórico diário de cada conta: movimento líquido do dia (só para os dias com movimento).
+    O saldo ao final do dia é a soma acumulada dos movimentos, calculada na leitura
+    (balances.balance_history), então uma escrita retroativa não reescreve os dias seguintes.
+    """
+    account = models.ForeignKey(Account, on_delete=models.CASCADE, related_name="daily_balances")
+    date = models.DateField()
+    delta = models.DecimalField(max_digits=14, decimal_places=2, default=Decimal('0.00'))
+    delta_cents = cents_field('delta')  # mesmo valor em centavos (BIGINT gerado pelo banco)
+
+    def __str__(self):
+        return f"{self.account_id} {self.date:%d/%m/%Y}: R$ {self.delta:+}"
+
+    class Meta:
+        ordering = ['account', 'date']
+        constraints = [
+            models.UniqueConstraint(fields=['account', 'date'], name='unique_daily_balance_key'),
+        ]
+
+
+# ===============================================
+# NOVO MODELO: VERSÃO DOS DADOS (ETag das páginas de leitura)
+# ===============================================
+class DataVersion(models.Model):
+    """
+    Carimbos globais incrementados após o commit das escritas. A linha 1 cobre os dados do
+    usuário: as views de leitura derivam dela o ETag e o Last-Modified (finance/conditional.py).
+    A linha 2 cobre só contas e categorias, para as listas dos formulários (finance/refdata.py).
+    """
+    version = models.PositiveBigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Versão dos dados {self.version} ({self.updated_at:%d/%m/%Y %H:%M})"
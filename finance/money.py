@@ -0,0 +1,95 @@
+from dataclasses import dataclass
+from decimal import ROUND_HALF_UP, Decimal
+
+from django.db import models
+from django.db.models import F
+from django.db.models.functions import Cast, Round
+
+CENTS = Decimal('0.01')
+
+
+def _div_half_up(numerator, denominator):
+    """Divisão inteira com arredondamento meio-para-longe-do-zero (o ROUND_HALF_UP do Decimal)."""
+    quotient, remainder = divmod(abs(numerator), denominator)
+    if 2 * remainder >= denominator:
+        quotient += 1
+    return quotient if numerator >= 0 else -quotient
+
+
+def split_cents(cents, parts):
+    """
+    Divide `cents` em `parts` parcelas arredondadas ao centavo (meio para cima); a última
+    absorve a diferença, como installments.split_total sempre fez. Só aritmética de int.
+    """
+    installment = _div_half_up(cents, parts)
+    return [installment] * (parts - 1) + [cents - installment * (parts - 1)]
+
+
+# ===============================================
+# TIPO DE VALOR: centavos inteiros
+# ===============================================
+@dataclass(frozen=True, order=True, slots=True, repr=False)
+class Money:
+    """
+    Valor monetário exato e imutável em centavos inteiros. As contas (somas, divisão em parcelas)
+    são feitas só com int e sempre devolvem um novo Money; Decimal e float aparecem apenas na
+    fronteira (formulários e templates).
+    """
+    cents: int = 0
+
+    def __post_init__(self):
+        object.__setattr__(self, 'cents', int(self.cents))
+
+    @classmethod
+    def from_decimal(cls, value):
+        return cls(decimal_to_cents(value))
+
+    def to_decimal(self):
+        return Decimal(self.cents).scaleb(-2)
+
+    def split(self, parts):
+        """Parcelas de split_cents, um Money por parcela."""
+        return [Money(cents) for cents in split_cents(self.cents, parts)]
+
+    def __add__(self, other):
+        return Money(self.cents + other.cents) if isinstance(other, Money) else NotImplemented
+
+    def __sub__(self, other):
+        return Money(self.cents - other.cents) if isinstance(other, Money) else NotImplemented
+
+    def __neg__(self):
+        return Money(-self.cents)
+
+    def __bool__(self):
+        return bool(self.cents)
+
+    def __float__(self):
+        return self.cents / 100
+
+    def __str__(self):
+        return str(self.to_decimal())
+
+    def __repr__(self):
+        return f"Money('{self}')"
+
+
+def decimal_to_cents(value):
+    """Decimal (ou texto) arredondado ao centavo, meio para cima, como int."""
+    return int(Decimal(value).quantize(CENTS, rounding=ROUND_HALF_UP).scaleb(2))
+
+
+def cents_to_decimal(cents):
+    """Soma em centavos vinda do banco (None quando não há linhas) como Decimal de 2 casas."""
+    return Decimal(cents or 0).scaleb(-2)
+
+
+# ===============================================
+# ARMAZENAMENTO: coluna gerada com o valor em centavos
+# ===============================================
+def cents_field(source):
+    """
+    Coluna BIGINT calculada e gravada pelo próprio banco a partir do DecimalField `source`:
+    sempre em dia, inclusive em bulk_create/update, e somada sem conversões de Decimal.
+    """
+    return models.GeneratedField(expression=Cast(Round(F(source) * 100), models.BigIntegerField()),
+                                 output_field=models.BigIntegerField(), db_persist=True)
@@ -0,0 +1,134 @@
+import cProfile
+import io
+import json
+import logging
+import pstats
+import re
+import time
+from contextlib import ExitStack
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+
+from django.conf import settings
+from django.db import connections
+from django.utils import timezone
+
+logger = logging.getLogger('finance.metrics')
+
+PROFILE_TOP_FUNCTIONS = 30
+PROFILE_MAX_QUERIES = 200
+
+
+@dataclass
+class ProfileReport:
+    label: str
+    created_at: str = ''
+    total_ms: float = 0.0
+    query_count: int = 0
+    db_ms: float = 0.0
+    functions: list = field(default_factory=list)  # as mais custosas pelo tempo acumulado
+    queries: list = field(default_factory=list)  # SQL sem os parâmetros (podem conter dados pessoais)
+    text: str = ''  # saída do pstats, para leitura direta
+    path: str = None  # arquivo .prof gravado (abre com pstats ou snakeviz)
+
+    def as_dict(self):
+        return asdict(self)
+
+    def as_text(self):
+        lines = [f"Perfil {self.label}: {self.total_ms:.1f} ms, {self.query_count} consultas ({self.db_ms:.1f} ms)"]
+        if self.path:
+            lines.append(f"Arquivo: {self.path}")
+        lines += ['', self.text, 'SQL:']
+        lines += [f"  {query['ms']:8.2f} ms  {query['sql']}" for query in self.queries]
+        return '\n'.join(lines)
+
+
+# ===============================================
+# COLETA (cProfile + SQL executado)
+# ===============================================
+class _QueryRecorder:
+    def __init__(self):
+        self.count, self.seconds, self.queries = 0, 0.0, []
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - started
+            self.count += 1
+            self.seconds += elapsed
+            if len(self.queries) < PROFILE_MAX_QUERIES:
+                self.queries.append({'sql': sql, 'ms': round(elapsed * 1000, 2)})
+
+
+def _top_functions(stats, limit):
+    rows = []
+    for func in stats.fcn_list[:limit]:
+        _, calls, total, cumulative, _ = stats.stats[func]
+        filename, line, name = func
+        rows.append({'function': f"{filename}:{line}({name})", 'calls': calls,
+                     'total_ms': round(total * 1000, 2), 'cumulative_ms': round(cumulative * 1000, 2)})
+    return rows
+
+
+def profile_call(label, func, *args, **kwargs):
+    """Executa func sob o cProfile, gravando também o SQL; devolve (resultado, ProfileReport, profile)."""
+    profiler, recorder = cProfile.Profile(), _QueryRecorder()
+    started = time.perf_counter()
+    with ExitStack() as stack:
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(recorder))
+        result = profiler.runcall(func, *args, **kwargs)
+    total = time.perf_counter() - started
+
+    buffer = io.StringIO()
+    stats = pstats.Stats(profiler, stream=buffer).sort_stats('cumulative')
+    stats.print_stats(PROFILE_TOP_FUNCTIONS)
+    report = ProfileReport(label=label, created_at=timezone.now().isoformat(), total_ms=round(total * 1000, 1),
+                           query_count=recorder.count, db_ms=round(recorder.seconds * 1000, 1),
+                           functions=_top_functions(stats, PROFILE_TOP_FUNCTIONS), queries=recorder.queries,
+                           text=buffer.getvalue().strip())
+    return result, report, profiler
+
+
+# ===============================================
+# ARMAZENAMENTO (diretório local com limite de tamanho)
+# ===============================================
+def profile_dir():
+    return Path(settings.PROFILING_DIR)
+
+
+def save_profile(report, profiler):
+    """
+    Grava <data>-<rótulo>.prof e .json em PROFILING_DIR e descarta os mais antigos acima do limite.
+    Se o diretório não aceitar escrita, registra o erro e devolve None: o perfil não derruba a
+    requisição nem o comando medidos.
+    """
+    directory = profile_dir()
+    slug = re.sub(r'[^A-Za-z0-9_-]+', '-', report.label).strip('-')[:60] or 'perfil'
+    base = directory / f"{timezone.now():%Y%m%d-%H%M%S-%f}-{slug}"
+    try:
+        directory.mkdir(parents=True, exist_ok=True)
+        profiler.dump_stats(base.with_suffix('.prof'))
+        report.path = str(base.with_suffix('.prof'))
+        base.with_suffix('.json').write_text(json.dumps(report.as_dict(), indent=2), encoding='utf-8')
+        evict_profiles(directory, settings.PROFILING_MAX_BYTES)
+    except OSError:
+        logger.exception('Falha ao gravar o perfil %s em %s', report.label, directory)
+        report.path = None
+    return report.path
+
+
+def evict_profiles(directory, max_bytes):
+    """Remove os perfis mais antigos (pelo nome, que começa com a data) até caber em max_bytes."""
+    files = sorted(path for path in Path(directory).iterdir() if path.suffix in ('.prof', '.json'))
+    total = sum(path.stat().st_size for path in files)
+    removed = 0
+    for path in files:
+        if total <= max_bytes:
+            break
+        total -= path.stat().st_size
+        path.unlink()
+        removed += 1
+    return removed
@@ -0,0 +1,87 @@
+import asyncio
+import threading
+from contextlib import ExitStack, nullcontext
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections, connection, connections
+
+from .metrics import record_query
+
+
+# Vagas do pool deste processo para os grupos, criadas na primeira vez que são usadas.
+_group_slots = {'semaphore': None}
+_group_slots_lock = threading.Lock()
+
+
+# ===============================================
+# GRUPOS DE CONSULTAS INDEPENDENTES (views assíncronas)
+# ===============================================
+def _pool_size():
+    """max_size do pool de conexões (DB_CONNECTION_MODE=pool), ou None sem pool."""
+    pool = connection.settings_dict.get('OPTIONS', {}).get('pool')
+    return pool.get('max_size') if isinstance(pool, dict) else None
+
+
+def _slots():
+    """
+    Semáforo do processo com uma vaga a menos que o pool (sobra sempre uma conexão para as
+    threads das requisições): os grupos de todas as requisições esperam aqui, e não no pool,
+    onde estourariam o DB_POOL_TIMEOUT. Sem pool não há limite.
+    """
+    size = _pool_size()
+    if not size:
+        return nullcontext()
+    with _group_slots_lock:
+        if _group_slots['semaphore'] is None:
+            _group_slots['semaphore'] = threading.BoundedSemaphore(max(size - 1, 1))
+    return _group_slots['semaphore']
+
+
+def _run_sequentially(groups):
+    return {name: func() for name, func in groups.items()}
+
+
+def _sequential_results(groups):
+    """
+    Roda na thread da requisição. Sem paralelismo configurado, ou dentro de uma transação
+    (ATOMIC_REQUESTS, testes), executa os grupos em sequência nesta conexão, a única que
+    enxerga os dados ainda não confirmados; senão devolve None. No modo pool a conexão da
+    requisição volta ao pool antes dos grupos, para que eles não esperem por ela.
+    """
+    if getattr(settings, 'CONCURRENT_QUERY_GROUPS', False) and not connection.in_atomic_block:
+        if _pool_size():
+            connection.close()
+        return None
+    return _run_sequentially(groups)
+
+
+def _in_own_connection(func):
+    """Executa func numa thread de trabalho, com a conexão dela, como uma requisição faria."""
+    def run():
+        with _slots():
+            close_old_connections()
+            try:
+                with ExitStack() as stack:
+                    # As consultas entram nas métricas da requisição (o ContextVar é copiado para a thread).
+                    for conn in connections.all():
+                        stack.enter_context(conn.execute_wrapper(record_query))
+                    return func()
+            finally:
+                close_old_connections()
+    return run
+
+
+async def run_query_groups(groups):
+    """
+    Executa os grupos {nome: função sem argumentos} e devolve {nome: resultado}. Com
+    CONCURRENT_QUERY_GROUPS cada grupo roda ao mesmo tempo numa thread com conexão própria, e a
+    latência fica perto da do grupo mais lento. Os grupos devem devolver dados já avaliados
+    (listas, não QuerySets), porque a conexão da thread é liberada ao fim de cada um.
+    """
+    results = await sync_to_async(_sequential_results)(groups)
+    if results is not None:
+        return results
+    values = await asyncio.gather(*(sync_to_async(_in_own_connection(func), thread_sensitive=False)()
+                                    for func in groups.values()))
+    return dict(zip(groups, values))
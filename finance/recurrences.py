@@ -0,0 +1,143 @@
+import time
+from dataclasses import asdict, dataclass
+
+from django.db import transaction
+
+from .conditional import bump_data_version
+from .dedup import existing_fingerprints
+from .models import AccountEntry, RecurringTransaction
+from .money import Money
+from .signals import ledger_bulk_changed
+
+RECURRENCE_BATCH_SIZE = 200
+
+
+@dataclass
+class GenerationResult:
+    run_date: object = None
+    recurrences: int = 0
+    generated: int = 0
+    generated_value: Money = Money()  # soma dos lançamentos gerados, em centavos
+    skipped: int = 0
+    chunks: int = 0
+    elapsed_seconds: float = 0.0
+    stopped_by: str = None  # 'time' ou 'rows' quando o orçamento acabou antes do fim
+    has_more: bool = False
+
+    def as_report(self):
+        """Relatório serializável em JSON, com a vazão da execução."""
+        report = asdict(self)
+        report['run_date'] = self.run_date.isoformat() if self.run_date else None
+        report['generated_value'] = str(self.generated_value)
+        report['elapsed_seconds'] = round(self.elapsed_seconds, 3)
+        elapsed = self.elapsed_seconds or None
+        report['recurrences_per_second'] = round(self.recurrences / elapsed, 1) if elapsed else None
+        report['entries_per_second'] = round(self.generated / elapsed, 1) if elapsed else None
+        return report
+
+
+# ===============================================
+# EXPANSÃO DAS OCORRÊNCIAS (em memória)
+# ===============================================
+def expand_occurrences(rt, today):
+    """
+    Lista as datas pendentes (<= today) da recorrência, na mesma sequência do cálculo
+    original (calculate_next_due_date a partir da última data gerada), e avança em memória
+    last_generated_date/next_due_date como se todas tivessem sido processadas.
+    """
+    occurrences = []
+    next_date = rt.calculate_next_due_date()
+    while next_date and next_date <= today:
+        if rt.end_date and next_date > rt.end_date:
+            next_date = None
+            break
+        occurrences.append(next_date)
+        rt.last_generated_date = next_date
+        next_date = rt.calculate_next_due_date(from_date=next_date)
+    # Sempre fica > today ou None, para a recorrência sair da fila de pendentes.
+    rt.next_due_date = next_date
+    return occurrences
+
+
+def pending_recurrences(today):
+    """
+    Recorrências ativas com ocorrência vencida, das mais atrasadas para as mais recentes.
+    Usa o índice (is_active, next_due_date): o custo depende só de quantas estão vencidas.
+    next_due_date None significa que a recorrência não tem mais ocorrências.
+    """
+    return (RecurringTransaction.objects.filter(is_active=True, next_due_date__lte=today)
+            .order_by('next_due_date', 'pk'))
+
+
+# ===============================================
+# GERAÇÃO EM LOTE
+# ===============================================
+def generate_batch(batch, today, result, log):
+    """Gera os lançamentos de um lote de recorrências: uma consulta de fingerprints e as escritas em massa."""
+    before = {rt.pk: (rt.last_generated_date, rt.next_due_date) for rt in batch}
+    planned = [(rt, day) for rt in batch for day in expand_occurrences(rt, today)]
+    candidates = [AccountEntry(category_id=rt.category_id, account_id=rt.account_id, value=rt.value,
+                               describe=rt.describe, competence_date=day, date_payment=None)
+                  for rt, day in planned]
+    seen = existing_fingerprints(entry.refresh_fingerprint() for entry in candidates)
+
+    new_entries = []
+    for (rt, day), entry in zip(planned, candidates):
+        if entry.fingerprint in seen:
+            log(f"  Lançamento para '{rt.describe}' na data {day.strftime('%d/%m/%Y')} já existe. Pulando.")
+            result.skipped += 1
+            continue
+        log(f"  Gerando lançamento para '{rt.describe}' com data de competência {day.strftime('%d/%m/%Y')}...")
+        seen.add(entry.fingerprint)
+        new_entries.append(entry)
+        result.generated_value += Money(rt.value_cents)
+
+    if new_entries:
+        AccountEntry.objects.bulk_create(new_entries, batch_size=500)
+        ledger_bulk_changed.send(sender=AccountEntry, added=new_entries)
+        result.generated += len(new_entries)
+    advanced = [rt for rt in batch if before[rt.pk] != (rt.last_generated_date, rt.next_due_date)]
+    if advanced:
+        RecurringTransaction.objects.bulk_update(advanced, ['last_generated_date', 'next_due_date'])
+        bump_data_version()
+
+
+def generate_due_entries(today, batch_size=RECURRENCE_BATCH_SIZE, log=None, max_seconds=None, max_recurrences=None):
+    """
+    Gera os lançamentos pendentes das recorrências ativas, em lotes ordenados por next_due_date.
+    Cada lote é gravado na sua própria transação e avança o next_due_date das recorrências, que
+    saem da fila de pendentes: uma execução interrompida (ou limitada por max_seconds/
+    max_recurrences) é retomada na próxima chamada sem estado extra.
+    Execuções simultâneas (cron sobreposto) não geram em dobro: cada lote é bloqueado com
+    SELECT ... FOR UPDATE SKIP LOCKED, e uma execução pula as recorrências que a outra já pegou.
+    """
+    log = log or (lambda message: None)
+    started = time.monotonic()
+    result = GenerationResult(run_date=today)
+
+    while True:
+        if max_seconds is not None and time.monotonic() - started >= max_seconds:
+            result.stopped_by = 'time'
+            break
+        limit = batch_size
+        if max_recurrences is not None:
+            limit = min(limit, max_recurrences - result.recurrences)
+            if limit <= 0:
+                result.stopped_by = 'rows'
+                break
+
+        with transaction.atomic():
+            batch = list(pending_recurrences(today).select_for_update(skip_locked=True)[:limit])
+            if not batch:
+                break
+            # Ao avançar next_due_date, as recorrências do lote saem da fila de pendentes.
+            generate_batch(batch, today, result, log)
+        result.chunks += 1
+        result.recurrences += len(batch)
+        if len(batch) < limit:
+            break
+
+    if result.stopped_by:
+        result.has_more = pending_recurrences(today).exists()
+    result.elapsed_seconds = time.monotonic() - started
+    return result
@@ -0,0 +1,92 @@
+from contextvars import ContextVar
+from dataclasses import dataclass
+
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import Account, Category, DataVersion
+
+# Linha própria em DataVersion (a 1 é a versão global dos dados, finance/conditional.py): fica no
+# banco, então todos os processos veem a mesma versão.
+REFDATA_VERSION_PK = 2
+
+# Cópia em memória do processo (versão + listas) e cópia da requisição em andamento.
+_process_data = {'current': None}
+_request_data = ContextVar('reference_data', default=None)
+
+
+@dataclass(frozen=True)
+class ReferenceData:
+    """Contas e categorias ativas (na ordenação padrão de cada modelo) numa versão."""
+    version: int
+    accounts: tuple
+    categories: tuple
+
+    def objects(self, model):
+        return self.accounts if model is Account else self.categories
+
+
+# ===============================================
+# CARGA (no máximo uma vez por requisição)
+# ===============================================
+def current_version():
+    return DataVersion.objects.filter(pk=REFDATA_VERSION_PK).values_list('version', flat=True).first() or 0
+
+
+def load_reference_data():
+    """
+    Lê a versão no banco (uma consulta) e devolve a cópia do processo se ela ainda for a atual;
+    senão recarrega as listas (mais duas consultas).
+    """
+    version = current_version()
+    data = _process_data['current']
+    if data is None or data.version != version:
+        data = ReferenceData(version, tuple(Account.objects.filter(is_active=True)),
+                             tuple(Category.objects.filter(is_active=True)))
+        _process_data['current'] = data
+    return data
+
+
+def reference_data():
+    """
+    Dados de referência para os formulários. Dentro de uma requisição (ReferenceDataMiddleware)
+    a primeira chamada carrega e as seguintes reutilizam o mesmo objeto.
+    """
+    scope = _request_data.get()
+    if scope is None:
+        return load_reference_data()
+    if 'data' not in scope:
+        scope['data'] = load_reference_data()
+    return scope['data']
+
+
+def begin_request():
+    return _request_data.set({})
+
+
+def end_request(token):
+    _request_data.reset(token)
+
+
+# ===============================================
+# INVALIDAÇÃO
+# ===============================================
+def _bump():
+    if not DataVersion.objects.filter(pk=REFDATA_VERSION_PK).update(version=F('version') + 1,
+                                                                    updated_at=timezone.now()):
+        DataVersion.objects.get_or_create(pk=REFDATA_VERSION_PK, defaults={'version': 1})
+
+
+def invalidate_reference_data():
+    """
+    Descarta a cópia deste processo na hora e incrementa a versão no banco após o commit (uma vez
+    por transação): os outros processos recarregam na próxima leitura da versão.
+    """
+    _process_data['current'] = None
+    scope = _request_data.get()
+    if scope is not None:
+        scope.pop('data', None)
+    if any(func is _bump for _, func, _ in transaction.get_connection().run_on_commit):
+        return
+    transaction.on_commit(_bump)
@@ -0,0 +1,277 @@
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.db.models import (
+    BigIntegerField, BooleanField, Case, DateField, DurationField, ExpressionWrapper, F, FloatField, OuterRef, Q,
+    Subquery, Sum, Value, When,
+)
+from django.db.models.functions import Coalesce
+
+from .models import AccountEntry, Goal, MonthlySummary
+from .money import cents_to_decimal
+
+ZERO = Decimal('0.00')
+
+
+# ===============================================
+# FUNÇÕES AUXILIARES DE PERÍODO
+# ===============================================
+def month_bounds(day):
+    """Retorna (primeiro dia do mês, primeiro dia do mês seguinte) para a data informada."""
+    start = day.replace(day=1)
+    if start.month == 12:
+        return start, start.replace(year=start.year + 1, month=1)
+    return start, start.replace(month=start.month + 1)
+
+
+def previous_month_bounds(day):
+    start, _ = month_bounds(day)
+    return month_bounds(start - timedelta(days=1))
+
+
+def _percent(part, whole):
+    return round((part / whole) * 100, 2) if whole > 0 else 0
+
+
+# ===============================================
+# RESULTADO TIPADO DO DASHBOARD
+# ===============================================
+@dataclass(frozen=True)
+class MonthTotals:
+    month: date
+    receitas: Decimal
+    despesas: Decimal
+
+
+@dataclass(frozen=True)
+class DashboardSummary:
+    """
+    Todos os números agregados do dashboard, calculados em poucas consultas.
+    A view apenas formata estes valores para o template.
+    """
+    date_from: date
+    date_to: date
+    all_receitas: Decimal = ZERO
+    all_despesas: Decimal = ZERO
+    receitas_periodo: Decimal = ZERO
+    despesas_periodo: Decimal = ZERO
+    gasto_essenciais: Decimal = ZERO
+    gasto_lazer: Decimal = ZERO
+    gasto_investimentos: Decimal = ZERO
+    current_month_receitas: Decimal = ZERO
+    current_month_despesas: Decimal = ZERO
+    previous_month_receitas: Decimal = ZERO
+    previous_month_despesas: Decimal = ZERO
+    has_previous_month_data: bool = False
+    months: list = field(default_factory=list)
+
+    @property
+    def saldo_total(self):
+        return self.all_receitas - self.all_despesas
+
+    @property
+    def current_month_profit(self):
+        return self.current_month_receitas - self.current_month_despesas
+
+    @property
+    def previous_month_profit(self):
+        return self.previous_month_receitas - self.previous_month_despesas
+
+    def budget_50_30_20(self):
+        """Monta o dicionário do bloco 50/30/20 usado pelo template."""
+        receitas = self.receitas_periodo
+        if receitas > 0:
+            meta_essenciais = receitas * Decimal('0.50')
+            meta_lazer = receitas * Decimal('0.30')
+            meta_investimentos = receitas * Decimal('0.20')
+        else:
+            meta_essenciais = meta_lazer = meta_investimentos = ZERO
+        return {
+            'essenciais_gasto': float(self.gasto_essenciais),
+            'essenciais_meta': float(meta_essenciais),
+            'essenciais_percent_receita': float(_percent(self.gasto_essenciais, receitas)),
+            'essenciais_perc_utilizado': float(_percent(self.gasto_essenciais, meta_essenciais)),
+            'lazer_gasto': float(self.gasto_lazer),
+            'lazer_meta': float(meta_lazer),
+            'lazer_percent_receita': float(_percent(self.gasto_lazer, receitas)),
+            'lazer_perc_utilizado': float(_percent(self.gasto_lazer, meta_lazer)),
+            'investimentos_gasto': float(self.gasto_investimentos),
+            'investimentos_meta': float(meta_investimentos),
+            'investimentos_percent_receita': float(_percent(self.gasto_investimentos, receitas)),
+            'investimentos_perc_utilizado': float(_percent(self.gasto_investimentos, meta_investimentos)),
+        }
+
+    def chart_series(self, today):
+        """Retorna (meses, receitas_data, despesas_data) para o gráfico mensal."""
+        meses, receitas_data, despesas_data = [], [], []
+        for row in self.months:
+            meses.append(row.month.strftime('%b'))
+            receitas_data.append(float(row.receitas))
+            despesas_data.append(float(row.despesas))
+        if not meses:
+            for i in range(5, -1, -1):
+                dt = today.replace(day=1) - timedelta(days=30 * i)
+                meses.append(dt.strftime('%b'))
+                receitas_data.append(0)
+                despesas_data.append(0)
+        return meses, receitas_data, despesas_data
+
+
+# ===============================================
+# MOTOR DE AGREGAÇÃO DO DASHBOARD
+# ===============================================
+def compute_dashboard_summary(date_from, date_to, today):
+    """
+    Calcula os totais do dashboard em duas consultas:
+    - os totais históricos, mensais e o gráfico vêm do MonthlySummary (uma linha por mês);
+    - os totais do período filtrado (datas arbitrárias) usam agregação condicional
+      sobre os lançamentos do próprio período.
+    As duas são independentes (monthly_totals e period_totals) e podem rodar em paralelo.
+    """
+    return build_dashboard_summary(date_from, date_to, monthly_totals(today), period_totals(date_from, date_to))
+
+
+def monthly_totals(today):
+    """
+    Totais históricos, do mês atual, do anterior e do gráfico (uma consulta ao MonthlySummary).
+    Soma e acumula em centavos; cada total vira Decimal só no fim.
+    """
+    receita, despesa = Q(category__type='R'), Q(category__type='D')
+    current_month, _ = month_bounds(today)
+    previous_month, _ = previous_month_bounds(today)
+    start_month_chart = (today.replace(day=1) - timedelta(days=180)).replace(day=1)
+
+    monthly = (MonthlySummary.objects.values('month')
+               .annotate(receitas=Sum('total_value_cents', filter=receita),
+                         despesas=Sum('total_value_cents', filter=despesa), entries=Sum('entry_count'))
+               .order_by('month'))
+    all_receitas = all_despesas = 0
+    by_month, months = {}, []
+    for row in monthly:
+        all_receitas += row['receitas'] or 0
+        all_despesas += row['despesas'] or 0
+        totals = MonthTotals(row['month'], cents_to_decimal(row['receitas']), cents_to_decimal(row['despesas']))
+        if row['entries']:
+            by_month[totals.month] = totals
+            if totals.month >= start_month_chart:
+                months.append(totals)
+    empty = MonthTotals(None, ZERO, ZERO)
+    current, previous = by_month.get(current_month, empty), by_month.get(previous_month, empty)
+    return {
+        'all_receitas': cents_to_decimal(all_receitas), 'all_despesas': cents_to_decimal(all_despesas),
+        'current_month_receitas': current.receitas, 'current_month_despesas': current.despesas,
+        'previous_month_receitas': previous.receitas, 'previous_month_despesas': previous.despesas,
+        'has_previous_month_data': previous_month in by_month, 'months': months,
+    }
+
+
+def period_totals(date_from, date_to):
+    """
+    Receitas, despesas e gastos por balde do período filtrado (uma consulta agregada).
+    Soma a coluna em centavos (inteiros exatos, sem a conversão de Decimal linha a linha).
+    """
+    receita, despesa = Q(category__type='R'), Q(category__type='D')
+    bucket = Q(category__type='D', category__is_active=True)
+    period = AccountEntry.objects.filter(competence_date__gte=date_from, competence_date__lte=date_to).aggregate(
+        receitas_periodo=Sum('value_cents', filter=receita),
+        despesas_periodo=Sum('value_cents', filter=despesa),
+        gasto_essenciais=Sum('value_cents', filter=bucket & Q(category__financial_bucket='ESS')),
+        gasto_lazer=Sum('value_cents', filter=bucket & Q(category__financial_bucket='LAZ')),
+        gasto_investimentos=Sum('value_cents', filter=bucket & Q(category__financial_bucket='INV')),
+    )
+    return {key: cents_to_decimal(cents) for key, cents in period.items()}
+
+
+def build_dashboard_summary(date_from, date_to, monthly, period):
+    """Junta os resultados de monthly_totals e period_totals no DashboardSummary."""
+    return DashboardSummary(date_from=date_from, date_to=date_to, **monthly, **period)
+
+
+# ===============================================
+# GASTOS POR CATEGORIA (uma consulta agrupada)
+# ===============================================
+DASHBOARD_TOP_CATEGORIES = 10
+OTHERS_LABEL = 'Outras categorias'
+
+
+def category_breakdown(date_from, date_to, receitas_periodo, top_n=DASHBOARD_TOP_CATEGORIES):
+    """
+    Gastos do período por categoria de despesa ativa, ordenados do maior para o menor,
+    com o percentual sobre a receita do período. Se top_n for informado, as categorias
+    além das top_n maiores são somadas numa linha "Outras categorias".
+    """
+    return format_category_breakdown(category_totals(date_from, date_to), receitas_periodo, top_n)
+
+
+def category_totals(date_from, date_to):
+    """Total gasto por categoria de despesa ativa no período (não depende da receita do período)."""
+    rows = (AccountEntry.objects
+            .filter(competence_date__gte=date_from, competence_date__lte=date_to,
+                    category__type='D', category__is_active=True)
+            .values('category_id', 'category__name')
+            .annotate(total_cents=Sum('value_cents'))
+            .filter(total_cents__gt=0)
+            .order_by('-total_cents', 'category__name'))
+    return [{'category_id': row['category_id'], 'category__name': row['category__name'],
+             'total': cents_to_decimal(row['total_cents'])} for row in rows]
+
+
+def format_category_breakdown(rows, receitas_periodo, top_n=DASHBOARD_TOP_CATEGORIES):
+    categorias, others = [], ZERO
+    for index, row in enumerate(rows):
+        if top_n and index >= top_n:
+            others += row['total']
+            continue
+        categorias.append({'name': row['category__name'], 'total_gasto': float(row['total']),
+                           'percent_of_revenue': float(_percent(row['total'], receitas_periodo))})
+    if others:
+        categorias.append({'name': OTHERS_LABEL, 'total_gasto': float(others),
+                           'percent_of_revenue': float(_percent(others, receitas_periodo)), 'is_others': True})
+    return categorias
+
+
+# ===============================================
+# PROGRESSO DAS METAS (uma consulta para todas as metas)
+# ===============================================
+def goals_with_progress(today, status='all'):
+    """
+    Metas anotadas com valor acumulado (a partir do MonthlySummary da categoria vinculada),
+    percentual de progresso, conclusão e dias restantes. O filtro de status e a ordenação
+    por prazo são feitos no banco, comparando centavos inteiros.
+    """
+    accumulated = (MonthlySummary.objects.filter(category=OuterRef('linked_category'))
+                   .values('category').annotate(total=Sum('total_value_cents')).values('total'))
+    cents = BigIntegerField()
+    goals = (Goal.objects.select_related('linked_category')
+             .annotate(current_cents=Coalesce(Subquery(accumulated, output_field=cents), Value(0), output_field=cents))
+             .annotate(
+                 is_completed=Case(When(current_cents__gte=F('target_amount_cents'), then=Value(True)),
+                                   default=Value(False), output_field=BooleanField()),
+                 progress_percent=Case(
+                     When(target_amount_cents__gt=0,
+                          then=F('current_cents') * Value(100.0) / F('target_amount_cents')),
+                     default=Value(0.0), output_field=FloatField()),
+                 days_remaining=ExpressionWrapper(F('target_date') - Value(today, output_field=DateField()),
+                                                  output_field=DurationField()),
+             ))
+    if status == 'completed':
+        goals = goals.filter(is_completed=True)
+    elif status == 'active':
+        goals = goals.filter(is_completed=False)
+    return goals.order_by('target_date', 'pk')
+
+
+def goal_progress_row(goal):
+    """Formata uma meta anotada por goals_with_progress para os templates."""
+    days_diff = goal.days_remaining.days
+    if goal.is_completed:
+        status, status_color = "Concluída!", "green"
+    elif days_diff < 0:
+        status, status_color = f"Atrasada em {-days_diff} dia(s)", "red"
+    else:
+        status, status_color = "Em Andamento", "blue"
+    return {'goal': goal, 'current_amount': float(cents_to_decimal(goal.current_cents)), 'progress_percent': round(goal.progress_percent, 2),
+            'status': status, 'status_color': status_color,
+            'days_remaining': days_diff if days_diff >= 0 and not goal.is_completed else None,
+            'is_completed': goal.is_completed, 'days_diff_sort': days_diff}
@@ -0,0 +1,100 @@
+from collections import defaultdict, namedtuple
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Count, Max, Min, Sum
+from django.db.models.functions import TruncMonth
+
+from .conditional import bump_data_version
+from .models import AccountEntry, MonthlySummary
+from .money import cents_to_decimal, decimal_to_cents
+from .reports import month_bounds
+from .upsert import lock_rows
+
+# Dados mínimos de um lançamento necessários para atualizar os resumos.
+EntrySnapshot = namedtuple('EntrySnapshot', ['competence_date', 'category_id', 'account_id', 'value'])
+
+# Soma líquida de vários lançamentos com a mesma (data, categoria, conta), usada pelo ledger_batch().
+EntryAggregate = namedtuple('EntryAggregate', ['competence_date', 'category_id', 'account_id', 'value', 'entry_count'])
+
+
+SUMMARY_KEY_FIELDS = ('month', 'category_id', 'account_id')
+
+
+def summary_key(entry):
+    return entry.competence_date.replace(day=1), entry.category_id, entry.account_id
+
+
+# ===============================================
+# ATUALIZAÇÃO INCREMENTAL
+# ===============================================
+def collect_deltas(added=(), removed=()):
+    """Agrupa os lançamentos por chave (mês, categoria, conta) -> [soma em centavos, quantidade]."""
+    deltas = defaultdict(lambda: [0, 0])
+    for sign, entries in ((1, added), (-1, removed)):
+        for entry in entries:
+            delta = deltas[summary_key(entry)]
+            delta[0] += sign * decimal_to_cents(entry.value)
+            delta[1] += sign * getattr(entry, 'entry_count', 1)
+    return {key: delta for key, delta in deltas.items() if delta[0] or delta[1]}
+
+
+def apply_changes(added=(), removed=()):
+    """
+    Aplica ao MonthlySummary as diferenças dos lançamentos adicionados e removidos.
+    Custo fixo, independente da quantidade de chaves afetadas: as linhas são bloqueadas (ou
+    criadas, se faltarem) por lock_rows e regravadas com um bulk_update. A soma é feita em
+    centavos (total_value_cents da linha lida); o Decimal só aparece na gravação.
+    """
+    deltas = collect_deltas(added, removed)
+    if not deltas:
+        return
+    # Sem savepoint: roda dentro da transação da escrita (AccountEntry.save, ledger_batch) e falha com ela.
+    with transaction.atomic(savepoint=False):
+        rows = lock_rows(MonthlySummary, SUMMARY_KEY_FIELDS, deltas,
+                         defaults={'total_value': Decimal('0.00'), 'entry_count': 0})
+        for key, (cents, count) in deltas.items():
+            rows[key].total_value = cents_to_decimal(rows[key].total_value_cents + cents)
+            rows[key].entry_count += count
+        MonthlySummary.objects.bulk_update(rows.values(), ['total_value', 'entry_count'])
+
+
+# ===============================================
+# RECONSTRUÇÃO COMPLETA (em blocos de meses)
+# ===============================================
+def ledger_month_range():
+    """Retorna (primeiro mês, último mês) com lançamentos, ou None se o razão estiver vazio."""
+    bounds = AccountEntry.objects.aggregate(first=Min('competence_date'), last=Max('competence_date'))
+    if bounds['first'] is None:
+        return None
+    return bounds['first'].replace(day=1), bounds['last'].replace(day=1)
+
+
+def iter_month_chunks(first_month, last_month, months_per_chunk):
+    """Gera intervalos [início, fim) cobrindo first_month..last_month em blocos de N meses."""
+    start = first_month
+    while start <= last_month:
+        end = start
+        for _ in range(months_per_chunk):
+            end = month_bounds(end)[1]
+        yield start, end
+        start = end
+
+
+def rebuild_chunk(start, end, batch_size=1000):
+    """
+    Recalcula os resumos dos meses em [start, end) a partir dos lançamentos brutos e muda a
+    versão dos dados no commit (ETag das páginas e cache da previsão).
+    """
+    rows = (AccountEntry.objects.filter(competence_date__gte=start, competence_date__lt=end)
+            .annotate(month=TruncMonth('competence_date'))
+            .values('month', 'category_id', 'account_id')
+            .annotate(total_cents=Sum('value_cents'), count=Count('id')).order_by())
+    summaries = [MonthlySummary(month=row['month'], category_id=row['category_id'], account_id=row['account_id'],
+                                total_value=cents_to_decimal(row['total_cents']), entry_count=row['count'])
+                 for row in rows]
+    with transaction.atomic():
+        MonthlySummary.objects.filter(month__gte=start, month__lt=end).delete()
+        MonthlySummary.objects.bulk_create(summaries, batch_size=batch_size)
+        bump_data_version()
+    return len(summaries)
@@ -0,0 +1,173 @@
+from collections import defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import Signal, receiver
+
+from . import balances, rollups
+from .conditional import bump_data_version
+from .models import Account, AccountEntry, Category, Goal, InstallmentPlan, RecurringTransaction, Transfer
+from .money import cents_to_decimal, decimal_to_cents
+from .refdata import invalidate_reference_data
+
+# ===============================================
+# SINAL: alterações em lote no razão
+# ===============================================
+# bulk_create/bulk_update/QuerySet.update não disparam post_save/post_delete.
+# Todo caminho em lote deve enviar este sinal para manter os resumos em dia:
+#   ledger_bulk_changed.send(sender=AccountEntry, added=[...], removed=[...])
+# "added" e "removed" são instâncias (ou snapshots) de AccountEntry com os
+# valores a somar e a subtrair, respectivamente.
+ledger_bulk_changed = Signal()
+
+# Alterações acumuladas dentro de um ledger_batch() (None fora de um lote), já somadas por
+# (data, categoria, conta): a memória depende dos dias/categorias tocados, não da quantidade de linhas.
+_pending_changes = ContextVar('pending_ledger_changes', default=None)
+
+
+def apply_entry_changes(added=(), removed=()):
+    pending = _pending_changes.get()
+    if pending is not None:
+        for sign, entries in ((1, added), (-1, removed)):
+            for entry in entries:
+                total = pending[(entry.competence_date, entry.category_id, entry.account_id)]
+                total[0] += sign * decimal_to_cents(entry.value)
+                total[1] += sign * getattr(entry, 'entry_count', 1)
+        return
+    rollups.apply_changes(added=added, removed=removed)
+    balances.apply_deltas(balances.entry_deltas(added=added, removed=removed))
+
+
+@contextmanager
+def ledger_batch():
+    """
+    Agrupa numa única transação as escritas de lançamentos feitas dentro do bloco e
+    atualiza os resumos uma só vez ao final (em vez de uma vez por linha salva ou excluída).
+    """
+    if _pending_changes.get() is not None:
+        yield
+        return
+    pending = defaultdict(lambda: [0, 0])
+    token = _pending_changes.set(pending)
+    try:
+        with transaction.atomic():
+            yield
+            _pending_changes.reset(token)
+            token = None
+            apply_entry_changes(added=[rollups.EntryAggregate(*key, cents_to_decimal(cents), count)
+                                       for key, (cents, count) in pending.items() if cents or count])
+    finally:
+        if token is not None:
+            _pending_changes.reset(token)
+
+
+# ===============================================
+# LANÇAMENTOS (AccountEntry)
+# ===============================================
+@receiver(pre_save, sender=AccountEntry)
+def remember_previous_entry(sender, instance, raw=False, **kwargs):
+    instance._previous_snapshot = None
+    if raw or instance.pk is None:
+        return
+    previous = (AccountEntry.objects.filter(pk=instance.pk)
+                .values(*rollups.EntrySnapshot._fields).first())
+    instance._previous_snapshot = rollups.EntrySnapshot(**previous) if previous else None
+
+
+@receiver(post_save, sender=AccountEntry)
+def entry_saved(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    previous = getattr(instance, '_previous_snapshot', None)
+    apply_entry_changes(added=[instance], removed=[previous] if previous else [])
+
+
+@receiver(post_delete, sender=AccountEntry)
+def entry_deleted(sender, instance, **kwargs):
+    apply_entry_changes(removed=[instance])
+
+
+@receiver(ledger_bulk_changed)
+def entries_bulk_changed(sender, added=(), removed=(), **kwargs):
+    apply_entry_changes(added=added, removed=removed)
+
+
+# ===============================================
+# TRANSFERÊNCIAS
+# ===============================================
+@receiver(pre_save, sender=Transfer)
+def remember_previous_transfer(sender, instance, raw=False, **kwargs):
+    instance._previous_snapshot = None
+    if raw or instance.pk is None:
+        return
+    previous = (Transfer.objects.filter(pk=instance.pk)
+                .values(*balances.TransferSnapshot._fields).first())
+    instance._previous_snapshot = balances.TransferSnapshot(**previous) if previous else None
+
+
+@receiver(post_save, sender=Transfer)
+def transfer_saved(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    previous = getattr(instance, '_previous_snapshot', None)
+    balances.apply_deltas(balances.transfer_deltas(added=[instance], removed=[previous] if previous else []))
+
+
+@receiver(post_delete, sender=Transfer)
+def transfer_deleted(sender, instance, **kwargs):
+    balances.apply_deltas(balances.transfer_deltas(removed=[instance]))
+
+
+# ===============================================
+# CATEGORIAS: mudar o tipo (R/D) inverte o sinal dos lançamentos no saldo
+# ===============================================
+@receiver(pre_save, sender=Category)
+def remember_previous_category_type(sender, instance, raw=False, **kwargs):
+    instance._previous_type = None
+    if not raw and instance.pk is not None:
+        instance._previous_type = Category.objects.filter(pk=instance.pk).values_list('type', flat=True).first()
+
+
+@receiver(post_save, sender=Category)
+def category_saved(sender, instance, raw=False, **kwargs):
+    previous_type = getattr(instance, '_previous_type', None)
+    if raw or previous_type is None or previous_type == instance.type:
+        return
+    account_ids = AccountEntry.objects.filter(category=instance).values_list('account_id', flat=True).distinct()
+    balances.rebuild_accounts(account_ids)
+
+
+# ===============================================
+# DADOS DE REFERÊNCIA DOS FORMULÁRIOS: contas e categorias
+# ===============================================
+@receiver(post_save, sender=Account)
+@receiver(post_delete, sender=Account)
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def reference_data_changed(sender, **kwargs):
+    invalidate_reference_data()
+
+
+# ===============================================
+# VERSÃO DOS DADOS: ETag das páginas de leitura (finance/conditional.py) e cache da previsão
+# ===============================================
+@receiver(post_save, sender=AccountEntry)
+@receiver(post_delete, sender=AccountEntry)
+@receiver(post_save, sender=Transfer)
+@receiver(post_delete, sender=Transfer)
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(post_save, sender=Account)
+@receiver(post_delete, sender=Account)
+@receiver(post_save, sender=Goal)
+@receiver(post_delete, sender=Goal)
+@receiver(post_save, sender=InstallmentPlan)
+@receiver(post_delete, sender=InstallmentPlan)
+@receiver(post_save, sender=RecurringTransaction)
+@receiver(post_delete, sender=RecurringTransaction)
+@receiver(ledger_bulk_changed)
+def user_data_changed(sender, raw=False, **kwargs):
+    if not raw:
+        bump_data_version()
@@ -0,0 +1,80 @@
+import json
+import os
+import re
+import subprocess
+import sys
+from dataclasses import asdict, dataclass, field
+
+from django.conf import settings
+
+STARTUP_PATH = '/accounts/login/'
+STARTUP_TOP_MODULES = 25
+
+# Roda num processo novo (cold start de verdade): importa o wsgi como a Vercel faz e atende uma
+# requisição; as marcas de tempo vão para a saída padrão e o -X importtime para a de erro.
+_COLD_START_SCRIPT = """
+import json, sys, time
+started = time.perf_counter()
+from financial_management.wsgi import app
+ready = time.perf_counter()
+from wsgiref.util import setup_testing_defaults
+environ = {'PATH_INFO': sys.argv[1], 'HTTP_HOST': '127.0.0.1', 'SERVER_NAME': '127.0.0.1'}
+setup_testing_defaults(environ)
+status = []
+body = b''.join(app(environ, lambda code, headers, exc_info=None: status.append(code)))
+done = time.perf_counter()
+print(json.dumps({'ready_ms': (ready - started) * 1000, 'first_request_ms': (done - ready) * 1000,
+                  'status': status[0], 'bytes': len(body)}))
+"""
+_IMPORTTIME_LINE = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)\s*$')
+
+
+@dataclass
+class StartupReport:
+    ready_ms: float = 0.0  # importação do wsgi e django.setup()
+    first_request_ms: float = 0.0
+    status: str = ''
+    budget_ms: float = None
+    modules: list = field(default_factory=list)  # mais custosos pelo tempo acumulado
+
+    @property
+    def total_ms(self):
+        return self.ready_ms + self.first_request_ms
+
+    @property
+    def over_budget(self):
+        return self.budget_ms is not None and self.ready_ms > self.budget_ms
+
+    def as_dict(self):
+        report = asdict(self)
+        report['total_ms'] = round(self.total_ms, 1)
+        return report
+
+
+def parse_importtime(output):
+    """Linhas do -X importtime em dicionários (módulo, próprio e acumulado em ms, nível de aninhamento)."""
+    modules = []
+    for line in output.splitlines():
+        match = _IMPORTTIME_LINE.match(line)
+        if match:
+            own, cumulative, indent, name = match.groups()
+            modules.append({'module': name, 'self_ms': round(int(own) / 1000, 2),
+                            'cumulative_ms': round(int(cumulative) / 1000, 2), 'depth': len(indent) // 2})
+    return modules
+
+
+def measure_cold_start(path=STARTUP_PATH, top=STARTUP_TOP_MODULES, env=None):
+    """Mede um cold start num subprocesso com as configurações atuais (ou com `env` sobreposto)."""
+    process_env = {**os.environ, 'DJANGO_SETTINGS_MODULE': os.environ.get('DJANGO_SETTINGS_MODULE',
+                                                                          'financial_management.settings')}
+    process_env.update(env or {})
+    completed = subprocess.run([sys.executable, '-X', 'importtime', '-c', _COLD_START_SCRIPT, path],
+                               capture_output=True, text=True, cwd=settings.BASE_DIR, env=process_env)
+    if completed.returncode != 0:
+        raise RuntimeError(completed.stderr.strip().splitlines()[-1] if completed.stderr.strip() else
+                           f"o subprocesso terminou com código {completed.returncode}")
+    timings = json.loads(completed.stdout.strip().splitlines()[-1])
+    modules = sorted(parse_importtime(completed.stderr), key=lambda module: module['cumulative_ms'], reverse=True)
+    return StartupReport(ready_ms=round(timings['ready_ms'], 1), first_request_ms=round(timings['first_request_ms'], 1),
+                         status=timings['status'], budget_ms=getattr(settings, 'COLD_START_BUDGET_MS', None),
+                         modules=modules[:top])
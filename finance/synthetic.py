@@ -0,0 +1,199 @@
+import random
+import time
+from dataclasses import asdict, dataclass, field
+from datetime import timedelta
+from decimal import Decimal
+
+from django.db import transaction
+from django.utils import timezone
+
+from . import balances
+from .conditional import bump_data_version
+from .installments import build_schedule
+from .models import Account, AccountEntry, Category, Goal, InstallmentPlan, RecurringTransaction, Transfer
+from .refdata import invalidate_reference_data
+from .signals import ledger_batch, ledger_bulk_changed
+
+SEED_BATCH_SIZE = 5000
+BATCHES_PER_TRANSACTION = 20  # a cada 100k linhas (padrão) os resumos são gravados e a transação fecha
+SYNTHETIC_PREFIX = '[sintético]'
+
+ACCOUNT_TYPES = ['CHECKING', 'CHECKING', 'SAVINGS', 'CREDIT_CARD', 'INVESTMENT']
+# (nome, tipo, balde, faixa de valores em reais)
+CATEGORY_TEMPLATES = [
+    ('Salário', 'R', 'NA', (3000, 9000)), ('Freelance', 'R', 'NA', (300, 3000)),
+    ('Rendimentos', 'R', 'NA', (10, 400)), ('Mercado', 'D', 'ESS', (40, 600)),
+    ('Aluguel', 'D', 'ESS', (1200, 3500)), ('Transporte', 'D', 'ESS', (5, 150)),
+    ('Saúde', 'D', 'ESS', (30, 800)), ('Restaurante', 'D', 'LAZ', (25, 300)),
+    ('Cinema', 'D', 'LAZ', (20, 120)), ('Viagens', 'D', 'LAZ', (300, 5000)),
+    ('Reserva', 'D', 'INV', (100, 2000)), ('Ações', 'D', 'INV', (100, 3000)),
+]
+DESCRIPTIONS = ['Padaria', 'Posto', 'Farmácia', 'Supermercado', 'Uber', 'iFood', 'Assinatura', 'Loja',
+                'Pix recebido', 'Boleto', 'Cartão', 'Transferência', '']
+
+
+@dataclass
+class SyntheticSpec:
+    """Quantidades de cada tipo de registro gerado (entries aceita até dezenas de milhões)."""
+    accounts: int = 6
+    categories: int = 24
+    entries: int = 10000
+    transfers: int = 1000
+    installment_plans: int = 100
+    goals: int = 10
+    recurrences: int = 200
+    months: int = 24  # histórico distribuído pelos últimos N meses
+
+
+@dataclass
+class SeedResult:
+    seed: int = 0
+    counts: dict = field(default_factory=dict)
+    elapsed_seconds: float = 0.0
+
+    def as_report(self):
+        report = asdict(self)
+        report['elapsed_seconds'] = round(self.elapsed_seconds, 3)
+        return report
+
+
+# ===============================================
+# DADOS DE REFERÊNCIA
+# ===============================================
+def _money(rng, low, high):
+    return Decimal(rng.randint(low * 100, high * 100)) / 100
+
+
+def _create_reference(spec, rng):
+    accounts = Account.objects.bulk_create([
+        Account(name=f'{SYNTHETIC_PREFIX} Conta {n + 1}', type=ACCOUNT_TYPES[n % len(ACCOUNT_TYPES)])
+        for n in range(max(spec.accounts, 1))
+    ])
+    templates = [CATEGORY_TEMPLATES[n % len(CATEGORY_TEMPLATES)] for n in range(max(spec.categories, 1))]
+    categories = Category.objects.bulk_create([
+        Category(name=f'{SYNTHETIC_PREFIX} {name} {n // len(CATEGORY_TEMPLATES) + 1}', type=tipo,
+                 financial_bucket=bucket, classification=rng.choice('ABCD'))
+        for n, (name, tipo, bucket, _) in enumerate(templates)
+    ])
+    ranges = {category.pk: template[3] for category, template in zip(categories, templates)}
+    return accounts, categories, ranges
+
+
+# ===============================================
+# GRAVAÇÃO EM LOTES
+# ===============================================
+def _in_batches(objects, batch_size):
+    batch = []
+    for obj in objects:
+        batch.append(obj)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _write_entries(entries, batch_size, log, label):
+    """bulk_create em lotes; os resumos e saldos são somados em ledger_batch a cada N lotes."""
+    written, batches = 0, _in_batches(entries, batch_size)
+    while True:
+        with ledger_batch():
+            for count, batch in enumerate(batches, start=1):
+                AccountEntry.objects.bulk_create(batch)
+                ledger_bulk_changed.send(sender=AccountEntry, added=batch)
+                written += len(batch)
+                if count == BATCHES_PER_TRANSACTION:
+                    break
+            else:
+                return written
+        log(f"  {written} {label}...")
+
+
+def _random_entries(spec, rng, accounts, categories, ranges, days, today):
+    # Receitas são raras e grandes; despesas, frequentes e menores.
+    incomes = [c for c in categories if c.type == 'R'] or categories
+    expenses = [c for c in categories if c.type == 'D'] or categories
+    for _ in range(spec.entries):
+        category = rng.choice(incomes) if rng.random() < 0.08 else rng.choice(expenses)
+        entry = AccountEntry(category_id=category.pk, account_id=rng.choice(accounts).pk,
+                             value=_money(rng, *ranges[category.pk]),
+                             competence_date=today - timedelta(days=rng.randrange(days)),
+                             describe=rng.choice(DESCRIPTIONS) or None)
+        entry.refresh_fingerprint()
+        yield entry
+
+
+def _random_transfers(spec, rng, accounts, days, today):
+    for _ in range(spec.transfers if len(accounts) > 1 else 0):
+        origin, destination = rng.sample(accounts, 2)
+        yield Transfer(account_origin_id=origin.pk, account_destination_id=destination.pk,
+                       value=_money(rng, 50, 3000), date=today - timedelta(days=rng.randrange(days)),
+                       describe=rng.choice(DESCRIPTIONS) or None)
+
+
+def seed_synthetic(spec, seed=0, batch_size=SEED_BATCH_SIZE, log=None):
+    """
+    Gera dados sintéticos reproduzíveis (mesma semente, mesmos dados) com bulk_create em lotes.
+    Contas e categorias recebem o prefixo SYNTHETIC_PREFIX para poderem ser removidas depois.
+    """
+    log = log or (lambda message: None)
+    rng, started, today = random.Random(seed), time.monotonic(), timezone.now().date()
+    result, days = SeedResult(seed=seed), max(spec.months * 30, 1)
+
+    with transaction.atomic():
+        accounts, categories, ranges = _create_reference(spec, rng)
+        invalidate_reference_data()  # bulk_create não dispara post_save
+        bump_data_version()
+    result.counts.update(accounts=len(accounts), categories=len(categories))
+    log(f"  {len(accounts)} contas e {len(categories)} categorias criadas.")
+
+    result.counts['entries'] = _write_entries(_random_entries(spec, rng, accounts, categories, ranges, days, today),
+                                              batch_size, log, 'lançamentos')
+
+    transfers = 0
+    for batch in _in_batches(_random_transfers(spec, rng, accounts, days, today), batch_size):
+        with transaction.atomic():
+            Transfer.objects.bulk_create(batch)
+            balances.apply_deltas(balances.transfer_deltas(added=batch))
+            bump_data_version()
+        transfers += len(batch)
+    result.counts['transfers'] = transfers
+    log(f"  {transfers} transferências...")
+
+    cards = [a for a in accounts if a.type == 'CREDIT_CARD'] or accounts
+    expenses = [c for c in categories if c.type == 'D'] or categories
+    with transaction.atomic():
+        plans = InstallmentPlan.objects.bulk_create([
+            InstallmentPlan(name=f'Compra parcelada {n + 1}', total_value=_money(rng, 200, 8000),
+                            number_of_installments=rng.randint(2, 24), account_id=rng.choice(cards).pk,
+                            category_id=rng.choice(expenses).pk,
+                            first_installment_date=today - timedelta(days=rng.randrange(days)))
+            for n in range(spec.installment_plans)
+        ])
+    installments = _write_entries((entry for plan in plans for entry in build_schedule(plan)),
+                                  batch_size, log, 'parcelas')
+    result.counts.update(installment_plans=len(plans), installment_entries=installments)
+
+    investments = [c for c in categories if c.financial_bucket == 'INV' and c.type == 'D'] or expenses
+    recurring = []
+    for n in range(spec.recurrences):
+        rt = RecurringTransaction(category_id=rng.choice(categories).pk, account_id=rng.choice(accounts).pk,
+                                  value=_money(rng, 20, 2000), describe=f'Recorrência {n + 1}',
+                                  frequency=rng.choice(['WEEKLY', 'MONTHLY', 'MONTHLY', 'YEARLY']),
+                                  start_date=today - timedelta(days=rng.randrange(365)))
+        rt.refresh_next_due_date()
+        recurring.append(rt)
+    with transaction.atomic():
+        Goal.objects.bulk_create([
+            Goal(name=f'Meta {n + 1}', target_amount=_money(rng, 1000, 100000),
+                 target_date=today + timedelta(days=rng.randint(30, 1500)),
+                 linked_category_id=rng.choice(investments).pk)
+            for n in range(spec.goals)
+        ])
+        RecurringTransaction.objects.bulk_create(recurring, batch_size=batch_size)
+        bump_data_version()
+    result.counts.update(goals=spec.goals, recurrences=len(recurring))
+
+    result.elapsed_seconds = time.monotonic() - started
+    return result
+
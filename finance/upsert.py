@@ -0,0 +1,39 @@
+from django.db import transaction
+
+
+# ===============================================
+# LINHAS DE RESUMO: bloquear ou criar sem corrida
+# ===============================================
+def _key(row, key_fields):
+    return tuple(getattr(row, name) for name in key_fields)
+
+
+def _select_locked(model, key_fields, keys):
+    """Linhas existentes das chaves, bloqueadas (SELECT ... FOR UPDATE) até o fim da transação."""
+    lookups = {f'{name}__in': {key[index] for key in keys} for index, name in enumerate(key_fields)}
+    rows = {}
+    for row in model.objects.select_for_update().filter(**lookups):
+        key = _key(row, key_fields)
+        if key in keys:
+            rows[key] = row
+    return rows
+
+
+def lock_rows(model, key_fields, keys, defaults):
+    """
+    Devolve {chave: linha} de `model` para cada chave (tupla com os valores de key_fields),
+    bloqueadas até o fim da transação, criando as que faltam com `defaults`.
+    As chaves novas entram com INSERT ... ON CONFLICT DO NOTHING e são lidas de novo: duas
+    transações que criam a mesma chave ao mesmo tempo não falham com IntegrityError, a segunda
+    espera a primeira e soma sobre a linha já gravada. Deve rodar dentro de transaction.atomic().
+    """
+    if not transaction.get_connection().in_atomic_block:
+        raise transaction.TransactionManagementError('lock_rows() precisa de uma transação.')
+    keys = set(keys)
+    rows = _select_locked(model, key_fields, keys)
+    missing = keys - rows.keys()
+    if missing:
+        model.objects.bulk_create([model(**dict(zip(key_fields, key)), **defaults) for key in missing],
+                                  ignore_conflicts=True)
+        rows.update(_select_locked(model, key_fields, missing))
+    return rows
@@ -6,6 +6,7 @@ urlpatterns = [
 
     # URLs de Transações (Lançamentos)
     path('transactions/', views.transactions_list, name='transactions_list'),
+    path('transactions/export/', views.transactions_export, name='transactions_export'),
     path('transactions/create/', views.transactions_create, name='transactions_create'),
     path('transactions/<int:pk>/edit/', views.transactions_edit, name='transactions_edit'),
     path('transactions/<int:pk>/delete/', views.transactions_delete, name='transactions_delete'),
@@ -13,6 +14,7 @@ urlpatterns = [
     # URLs de Transações (Tipos Especiais)
     path('transactions/create_installment/', views.transactions_create_installment, name='transactions_create_installment'),
     path('transactions/create_transfer/', views.transactions_create_transfer, name='transactions_create_transfer'),
+    path('transactions/import/', views.transactions_import, name='transactions_import'),
 
     # URLs de Plano de Parcelamento
     path('installments/<int:plan_pk>/edit/', views.installment_plan_edit, name='installment_plan_edit'),
@@ -50,4 +52,8 @@ urlpatterns = [
     path('recurring/<int:pk>/edit/', views.recurring_transaction_edit, name='recurring_transaction_edit'),
     path('recurring/<int:pk>/toggle/', views.recurring_transaction_toggle_active, name='recurring_transaction_toggle_active'),
     path('recurring/<int:pk>/delete/', views.recurring_transaction_delete, name='recurring_transaction_delete'),
-]
\ No newline at end of file
+
+    # URLs de Previsão de Caixa
+    path('forecast/', views.forecast, name='forecast'),
+    path('api/forecast/', views.forecast_api, name='forecast_api'),
+]
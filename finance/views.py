@@ -1,19 +1,16 @@
 from django.db import models
-from django.db.models import Sum, Q
-from decimal import Decimal, ROUND_HALF_UP
 from datetime import datetime, timedelta, date
-from dateutil.relativedelta import relativedelta
+from functools import partial
+from asgiref.sync import sync_to_async
 from django.shortcuts import render, redirect, get_object_or_404
 from django.urls import reverse
-from django.core.paginator import Paginator
 from django.contrib import messages
 from django.utils import timezone
-from django.db.models.functions import TruncMonth
 from django.contrib.auth.decorators import login_required
 # ===============================================
 # IMPORT ADICIONADO: JsonResponse
 # ===============================================
-from django.http import JsonResponse
+from django.http import JsonResponse, StreamingHttpResponse
 # ===============================================
 
 
@@ -22,19 +19,42 @@ from .models import (
     AccountEntry, Category, Goal, Account, Transfer,
     InstallmentPlan, RecurringTransaction
 )
+from .balances import net_worth
+from .exporter import EXPORT_FORMATS, iter_ledger_rows
+from .feed import Cursor, FeedFilters, fetch_feed_page
+from .forecast import FORECAST_DEFAULT_MONTHS, FORECAST_MAX_MONTHS, get_forecast
+from .importer import StatementError, detect_format, import_statement, iter_csv, iter_ofx
+from .installments import create_installment_plan, delete_installment_plan, update_installment_plan
+from .conditional import conditional_on_data_version
+from .querygroups import run_query_groups
+from .reports import (
+    build_dashboard_summary, category_totals, format_category_breakdown, goal_progress_row, goals_with_progress,
+    monthly_totals, period_totals
+)
 from .forms import (
     AccountEntryForm, CategoryForm, GoalForm, AccountForm,
-    TransferForm, InstallmentEntryForm, RecurringTransactionForm
+    TransferForm, InstallmentEntryForm, RecurringTransactionForm, ImportStatementForm
 )
 
 from django.views.generic.base import RedirectView
 
 
 # ===============================================
-# VIEW: dashboard (Sem alterações)
+# VIEW: dashboard (totais calculados em finance/reports.py)
 # ===============================================
+def _upcoming_goals(today):
+    return [goal_progress_row(goal) for goal in goals_with_progress(today, 'active')[:3]]
+
+
+def _recent_transactions():
+    return list(AccountEntry.objects.select_related('category', 'account').order_by('-competence_date',
+                                                                                    '-date_added')[:5])
+
+
 @login_required
-def dashboard(request):
+@conditional_on_data_version
+async def dashboard(request):
+    """Assíncrona: os grupos de consultas independentes rodam em paralelo (finance/querygroups.py)."""
     now = timezone.now()
     date_from_str = request.GET.get('date_from')
     date_to_str = request.GET.get('date_to')
@@ -46,151 +66,64 @@ def dashboard(request):
             date_to_str, '%Y-%m-%d').date() if date_to_str else default_date_to
     except ValueError:
         date_from = default_date_from; date_to = default_date_to
-    base_qs = AccountEntry.objects.filter(competence_date__gte=date_from, competence_date__lte=date_to)
-    all_receitas = AccountEntry.objects.filter(category__type='R').aggregate(total=Sum('value'))['total'] or Decimal(
-        '0.00')
-    all_despesas = AccountEntry.objects.filter(category__type='D').aggregate(total=Sum('value'))['total'] or Decimal(
-        '0.00')
-    saldo_total = all_receitas - all_despesas
-    receitas_periodo = base_qs.filter(category__type='R').aggregate(total=Sum('value'))['total'] or Decimal('0.00')
-    despesas_periodo = base_qs.filter(category__type='D').aggregate(total=Sum('value'))['total'] or Decimal('0.00')
-    start_month_chart = (now.replace(day=1) - timedelta(days=180)).replace(day=1)
-    qs_period_chart = AccountEntry.objects.filter(competence_date__gte=start_month_chart)
-    monthly = (qs_period_chart.annotate(month=TruncMonth('competence_date')).values('month').annotate(
-        total_receitas=Sum('value', filter=models.Q(category__type='R')),
-        total_despesas=Sum('value', filter=models.Q(category__type='D'))).order_by('month'))
-    meses, receitas_data, despesas_data = [], [], []
-    for row in monthly: m = row['month']; meses.append(m.strftime('%b')); receitas_data.append(
-        float(row['total_receitas'] or 0)); despesas_data.append(float(row['total_despesas'] or 0))
-    if not meses:
-        for i in range(5, -1, -1): dt = (now.replace(day=1) - timedelta(days=30 * i)); meses.append(
-            dt.strftime('%b')); receitas_data.append(0); despesas_data.append(0)
-    current_year, current_month = now.year, now.month
-    previous_month_date = now - relativedelta(months=1)
-    previous_month_year, previous_month = previous_month_date.year, previous_month_date.month
-    current_month_receitas = AccountEntry.objects.filter(category__type='R', competence_date__year=current_year,
-                                                         competence_date__month=current_month).aggregate(
-        total=Sum('value'))['total'] or Decimal('0.00')
-    current_month_despesas = AccountEntry.objects.filter(category__type='D', competence_date__year=current_year,
-                                                         competence_date__month=current_month).aggregate(
-        total=Sum('value'))['total'] or Decimal('0.00')
-    current_month_profit = current_month_receitas - current_month_despesas
-    previous_month_receitas = AccountEntry.objects.filter(category__type='R', competence_date__year=previous_month_year,
-                                                          competence_date__month=previous_month).aggregate(
-        total=Sum('value'))['total'] or Decimal('0.00')
-    previous_month_despesas = AccountEntry.objects.filter(category__type='D', competence_date__year=previous_month_year,
-                                                          competence_date__month=previous_month).aggregate(
-        total=Sum('value'))['total'] or Decimal('0.00')
-    previous_month_profit = previous_month_receitas - previous_month_despesas
-    has_previous_month_data = AccountEntry.objects.filter(competence_date__year=previous_month_year,
-                                                          competence_date__month=previous_month).exists()
-    categorias = []
-    for c in Category.objects.filter(type='D', is_active=True):
-        total_gasto = base_qs.filter(category=c).aggregate(total=Sum('value')).get('total') or Decimal('0.00')
-        if total_gasto > 0: percent_of_revenue = round((total_gasto / receitas_periodo) * 100,
-                                                       2) if receitas_periodo > 0 else 0; categorias.append(
-            {'name': c.name, 'total_gasto': float(total_gasto), 'percent_of_revenue': float(percent_of_revenue)})
-    categorias.sort(key=lambda item: item['total_gasto'], reverse=True)
-    gasto_essenciais = \
-    base_qs.filter(category__type='D', category__financial_bucket='ESS', category__is_active=True).aggregate(
-        total=Sum('value'))['total'] or Decimal('0.00')
-    gasto_lazer = \
-    base_qs.filter(category__type='D', category__financial_bucket='LAZ', category__is_active=True).aggregate(
-        total=Sum('value'))['total'] or Decimal('0.00')
-    gasto_investimentos = \
-    base_qs.filter(category__type='D', category__financial_bucket='INV', category__is_active=True).aggregate(
-        total=Sum('value'))['total'] or Decimal('0.00')
-    if receitas_periodo > 0:
-        meta_essenciais, meta_lazer, meta_investimentos = receitas_periodo * Decimal(
-            '0.50'), receitas_periodo * Decimal('0.30'), receitas_periodo * Decimal(
-            '0.20'); percent_receita_essenciais = round((gasto_essenciais / receitas_periodo) * 100,
-                                                        2); percent_receita_lazer = round(
-            (gasto_lazer / receitas_periodo) * 100, 2); percent_receita_investimentos = round(
-            (gasto_investimentos / receitas_periodo) * 100, 2); perc_utilizado_essenciais = round(
-            (gasto_essenciais / meta_essenciais) * 100, 2) if meta_essenciais > 0 else 0; perc_utilizado_lazer = round(
-            (gasto_lazer / meta_lazer) * 100, 2) if meta_lazer > 0 else 0; perc_utilizado_investimentos = round(
-            (gasto_investimentos / meta_investimentos) * 100, 2) if meta_investimentos > 0 else 0
-    else:
-        meta_essenciais, meta_lazer, meta_investimentos = Decimal('0.00'), Decimal('0.00'), Decimal(
-            '0.00'); percent_receita_essenciais, percent_receita_lazer, percent_receita_investimentos = Decimal(
-            '0.00'), Decimal('0.00'), Decimal(
-            '0.00'); perc_utilizado_essenciais, perc_utilizado_lazer, perc_utilizado_investimentos = 0, 0, 0
-    budget_50_30_20 = {'essenciais_gasto': float(gasto_essenciais), 'essenciais_meta': float(meta_essenciais),
-                       'essenciais_percent_receita': float(percent_receita_essenciais),
-                       'essenciais_perc_utilizado': float(perc_utilizado_essenciais), 'lazer_gasto': float(gasto_lazer),
-                       'lazer_meta': float(meta_lazer), 'lazer_percent_receita': float(percent_receita_lazer),
-                       'lazer_perc_utilizado': float(perc_utilizado_lazer),
-                       'investimentos_gasto': float(gasto_investimentos),
-                       'investimentos_meta': float(meta_investimentos),
-                       'investimentos_percent_receita': float(percent_receita_investimentos),
-                       'investimentos_perc_utilizado': float(perc_utilizado_investimentos)}
-    upcoming_goals = []
-    today = timezone.now().date()
-    all_goals_qs = Goal.objects.select_related('linked_category').all()
-    all_goals_calculated = []
-    for goal in all_goals_qs:
-        current_amount = AccountEntry.objects.filter(category=goal.linked_category).aggregate(total=Sum('value')).get(
-            'total') or Decimal('0.00')
-        is_completed = current_amount >= goal.target_amount
-        if not is_completed: progress_percent = round((current_amount / goal.target_amount) * 100,
-                                                      2) if goal.target_amount > 0 else 0; days_diff = (
-                    goal.target_date - today).days; status, status_color = ("Em Andamento", "blue");
-        if days_diff < 0: status, status_color = (f"Atrasada em {-days_diff} dia(s)",
-                                                  "red"); all_goals_calculated.append(
-            {'goal': goal, 'current_amount': float(current_amount), 'progress_percent': float(progress_percent),
-             'status': status, 'status_color': status_color, 'days_remaining': days_diff if days_diff >= 0 else None,
-             'days_diff_sort': days_diff})
-    all_goals_calculated.sort(key=lambda x: x['days_diff_sort'])
-    upcoming_goals = all_goals_calculated[:3]
-    recent_transactions = AccountEntry.objects.select_related('category', 'account').order_by('-competence_date',
-                                                                                              '-date_added')[:5]
-    context = {'saldo_total': float(saldo_total), 'receitas_mes': float(receitas_periodo),
-               'despesas_mes': float(despesas_periodo), 'investimentos': float(gasto_investimentos),
+    groups = await run_query_groups({
+        'monthly': partial(monthly_totals, now.date()), 'period': partial(period_totals, date_from, date_to),
+        'categories': partial(category_totals, date_from, date_to), 'goals': partial(_upcoming_goals, now.date()),
+        'recent': _recent_transactions,
+    })
+    summary = build_dashboard_summary(date_from, date_to, groups['monthly'], groups['period'])
+    receitas_periodo = summary.receitas_periodo
+    meses, receitas_data, despesas_data = summary.chart_series(now.date())
+    categorias = format_category_breakdown(groups['categories'], receitas_periodo)
+    budget_50_30_20 = summary.budget_50_30_20()
+    upcoming_goals, recent_transactions = groups['goals'], groups['recent']
+    context = {'saldo_total': float(summary.saldo_total), 'receitas_mes': float(receitas_periodo),
+               'despesas_mes': float(summary.despesas_periodo), 'investimentos': float(summary.gasto_investimentos),
                'categorias': categorias, 'budget': budget_50_30_20, 'meses': meses, 'receitas_data': receitas_data,
                'despesas_data': despesas_data, 'date_from': date_from.strftime('%Y-%m-%d'),
-               'date_to': date_to.strftime('%Y-%m-%d'), 'current_month_profit': float(current_month_profit),
-               'previous_month_profit': float(previous_month_profit),
-               'has_previous_month_data': has_previous_month_data, 'upcoming_goals': upcoming_goals,
+               'date_to': date_to.strftime('%Y-%m-%d'), 'current_month_profit': float(summary.current_month_profit),
+               'previous_month_profit': float(summary.previous_month_profit),
+               'has_previous_month_data': summary.has_previous_month_data, 'upcoming_goals': upcoming_goals,
                'recent_transactions': recent_transactions}
-    return render(request, 'dashboard.html', context)
+    # O template usa request.user: reaproveita o usuário já carregado pelo login_required
+    # (auser) e renderiza na thread da requisição, onde o ORM síncrono é permitido.
+    request.user = await request.auser()
+    return await sync_to_async(render)(request, 'dashboard.html', context)
 
 
 # ===============================================
-# VIEW: transactions_list (Sem alterações)
+# VIEW: transactions_list (histórico paginado por cursor, ver finance/feed.py)
 # ===============================================
+def _transactions_context(request, form=None, installment_form=None, transfer_form=None, import_form=None):
+    """Contexto de transactions.html: página atual do histórico + os formulários das abas."""
+    filters = FeedFilters.from_query(request.GET)
+    page = fetch_feed_page(filters, after=Cursor.decode(request.GET.get('after')),
+                           before=Cursor.decode(request.GET.get('before')))
+    feed_query = request.GET.copy()
+    for param in ('after', 'before', 'page'): feed_query.pop(param, None)
+    return {'entries': page.items, 'form': form or AccountEntryForm(),
+            'installment_form': installment_form or InstallmentEntryForm(),
+            'transfer_form': transfer_form or TransferForm(), 'import_form': import_form or ImportStatementForm(),
+            'is_paginated': page.has_other_pages,
+            'page_obj': page, 'feed_query': feed_query.urlencode()}
+
+
 @login_required
+@conditional_on_data_version
 def transactions_list(request):
-    tipo = request.GET.get('type');
-    date_from_str = request.GET.get('date_from');
-    date_to_str = request.GET.get('date_to')
-    dt_from, dt_to = None, None
-    try:
-        if date_from_str: dt_from = datetime.strptime(date_from_str, '%Y-%m-%d').date()
-        if date_to_str: dt_to = datetime.strptime(date_to_str, '%Y-%m-%d').date()
-    except ValueError:
-        pass
-    entries_qs = AccountEntry.objects.select_related('category', 'account', 'installment_plan').all()
-    if tipo in ('R', 'D'): entries_qs = entries_qs.filter(category__type=tipo)
-    if dt_from: entries_qs = entries_qs.filter(competence_date__gte=dt_from)
-    if dt_to: entries_qs = entries_qs.filter(competence_date__lte=dt_to)
-    transfers_qs = Transfer.objects.select_related('account_origin', 'account_destination')
-    if dt_from: transfers_qs = transfers_qs.filter(date__gte=dt_from)
-    if dt_to: transfers_qs = transfers_qs.filter(date__lte=dt_to)
-    if tipo in ('R', 'D'): transfers_qs = transfers_qs.none()
-    combined_list = []
-    for entry in entries_qs: combined_list.append({'type': 'entry', 'sort_date': entry.competence_date, 'obj': entry})
-    for transfer in transfers_qs: combined_list.append(
-        {'type': 'transfer', 'sort_date': transfer.date, 'obj': transfer})
-    combined_list.sort(key=lambda x: x['sort_date'], reverse=True)
-    paginator = Paginator(combined_list, 12);
-    page_number = request.GET.get('page');
-    page_obj = paginator.get_page(page_number)
-    form = AccountEntryForm();
-    installment_form = InstallmentEntryForm();
-    transfer_form = TransferForm()
-    context = {'entries': page_obj.object_list, 'form': form, 'installment_form': installment_form,
-               'transfer_form': transfer_form, 'is_paginated': page_obj.has_other_pages(), 'page_obj': page_obj}
-    return render(request, 'transactions.html', context)
+    return render(request, 'transactions.html', _transactions_context(request))
+
+
+@login_required
+def transactions_export(request):
+    """Exporta o histórico com os mesmos filtros da listagem, em streaming (CSV ou JSON lines)."""
+    fmt = request.GET.get('format', 'csv')
+    if fmt not in EXPORT_FORMATS: fmt = 'csv'
+    writer, content_type = EXPORT_FORMATS[fmt]
+    response = StreamingHttpResponse(writer(iter_ledger_rows(FeedFilters.from_query(request.GET))),
+                                     content_type=content_type)
+    response['Content-Disposition'] = f'attachment; filename="lancamentos-{timezone.localdate():%Y%m%d}.{fmt}"'
+    return response
 
 
 # ===============================================
@@ -204,14 +137,7 @@ def transactions_create(request):
         form.save(); messages.success(request, 'Transação criada com sucesso.'); return redirect(
             reverse('transactions_list'))
     else:
-        qs = AccountEntry.objects.select_related('category', 'account', 'installment_plan').order_by('-competence_date',
-                                                                                                     '-date_added')[
-            :12];
-        paginator = Paginator(qs, 12);
-        page_obj = paginator.get_page(1)
-        installment_form, transfer_form = InstallmentEntryForm(), TransferForm()
-        context = {'entries': page_obj.object_list, 'form': form, 'installment_form': installment_form,
-                   'transfer_form': transfer_form, 'is_paginated': page_obj.has_other_pages(), 'page_obj': page_obj}
+        context = _transactions_context(request, form=form)
         messages.error(request, 'Corrija os erros no formulário de transação simples.');
         return render(request, 'transactions.html', context)
 
@@ -222,33 +148,17 @@ def transactions_create_installment(request):
     form = InstallmentEntryForm(request.POST)
     if form.is_valid():
         data = form.cleaned_data;
-        total_value, num_installments, first_date = data['total_value'], data['number_of_installments'], data[
-            'first_installment_date']
+        num_installments = data['number_of_installments']
         try:
-            plan = InstallmentPlan.objects.create(name=data['describe'], total_value=total_value,
-                                                  number_of_installments=num_installments, account=data['account'],
-                                                  category=data['category'], first_installment_date=first_date)
-            installment_value = (total_value / Decimal(num_installments)).quantize(Decimal('0.01'),
-                                                                                   rounding=ROUND_HALF_UP);
-            last_installment_value = total_value - (installment_value * (num_installments - 1))
-            for i in range(num_installments): current_date = first_date + relativedelta(
-                months=i); current_describe = f"{data['describe']} ({i + 1}/{num_installments})"; current_value = last_installment_value if (
-                        i == num_installments - 1) else installment_value; AccountEntry.objects.create(
-                category=data['category'], account=data['account'], value=current_value, describe=current_describe,
-                competence_date=current_date, installment_plan=plan, installment_number=(i + 1))
+            create_installment_plan(name=data['describe'], total_value=data['total_value'],
+                                    number_of_installments=num_installments, account=data['account'],
+                                    category=data['category'], first_installment_date=data['first_installment_date'])
             messages.success(request, f'Plano "{data["describe"]}" ({num_installments} parcelas) criado com sucesso.')
         except Exception as e:
             messages.error(request, f'Erro ao criar parcelas: {e}')
         return redirect(reverse('transactions_list'))
     else:
-        qs = AccountEntry.objects.select_related('category', 'account', 'installment_plan').order_by('-competence_date',
-                                                                                                     '-date_added')[
-            :12];
-        paginator = Paginator(qs, 12);
-        page_obj = paginator.get_page(1)
-        account_form, transfer_form = AccountEntryForm(), TransferForm()
-        context = {'entries': page_obj.object_list, 'form': account_form, 'installment_form': form,
-                   'transfer_form': transfer_form, 'is_paginated': page_obj.has_other_pages(), 'page_obj': page_obj}
+        context = _transactions_context(request, installment_form=form)
         messages.error(request, 'Corrija os erros no formulário de parcelamento.');
         return render(request, 'transactions.html', context)
 
@@ -263,17 +173,35 @@ def transactions_create_transfer(request):
         else:
             form.save(); messages.success(request, 'Transferência registrada com sucesso.'); return redirect(
                 reverse('transactions_list'))
-    qs = AccountEntry.objects.select_related('category', 'account', 'installment_plan').order_by('-competence_date',
-                                                                                                 '-date_added')[:12];
-    paginator = Paginator(qs, 12);
-    page_obj = paginator.get_page(1)
-    account_form, installment_form = AccountEntryForm(), InstallmentEntryForm()
-    context = {'entries': page_obj.object_list, 'form': account_form, 'installment_form': installment_form,
-               'transfer_form': form, 'is_paginated': page_obj.has_other_pages(), 'page_obj': page_obj}
+    context = _transactions_context(request, transfer_form=form)
     if not form.is_valid(): messages.error(request, 'Corrija os erros no formulário de transferência.'); return render(
         request, 'transactions.html', context)
 
 
+@login_required
+def transactions_import(request):
+    if request.method != 'POST': return redirect(reverse('transactions_list'))
+    form = ImportStatementForm(request.POST, request.FILES)
+    if not form.is_valid():
+        messages.error(request, 'Corrija os erros no formulário de importação.')
+        return render(request, 'transactions.html', _transactions_context(request, import_form=form))
+    upload = form.cleaned_data['file']
+    reader = iter_ofx if detect_format(upload.name) == 'ofx' else iter_csv
+    try:
+        # O arquivo é lido em streaming (linha a linha) e gravado em lotes (finance/importer.py).
+        result = import_statement(reader(upload.file), account=form.cleaned_data['account'],
+                                  income_category=form.cleaned_data['income_category'],
+                                  expense_category=form.cleaned_data['expense_category'])
+    except (StatementError, UnicodeDecodeError) as e:
+        messages.error(request, f'Não foi possível ler o extrato: {e}')
+        return redirect(reverse('transactions_list'))
+    messages.success(request, f'{result.imported} lançamentos importados, {result.duplicates} duplicados ignorados '
+                              f'({result.rows_per_second or 0} linhas/s).')
+    if result.skipped:
+        messages.error(request, f'{result.skipped} linhas ignoradas. ' + ' '.join(result.errors[:5]))
+    return redirect(reverse('transactions_list'))
+
+
 # ===============================================
 # VIEWS: Edição/Exclusão de Transações, Planos e Transferências (Sem alterações)
 # ===============================================
@@ -311,23 +239,10 @@ def installment_plan_edit(request, plan_pk):
         form = InstallmentEntryForm(request.POST)
         if form.is_valid():
             data = form.cleaned_data;
-            plan.name, plan.total_value, plan.number_of_installments = data['describe'], data['total_value'], data[
-                'number_of_installments'];
-            plan.account, plan.category, plan.first_installment_date = data['account'], data['category'], data[
-                'first_installment_date'];
-            plan.save()
-            total_value, num_installments, first_date = data['total_value'], data['number_of_installments'], data[
-                'first_installment_date']
-            installment_value = (total_value / Decimal(num_installments)).quantize(Decimal('0.01'),
-                                                                                   rounding=ROUND_HALF_UP);
-            last_installment_value = total_value - (installment_value * (num_installments - 1))
-            plan.accountentry_set.all().delete()
-            for i in range(num_installments): current_date = first_date + relativedelta(
-                months=i); current_describe = f"{data['describe']} ({i + 1}/{num_installments})"; current_value = last_installment_value if (
-                        i == num_installments - 1) else installment_value; AccountEntry.objects.create(
-                category=data['category'], account=data['account'], value=current_value, describe=current_describe,
-                competence_date=current_date, installment_plan=plan, installment_number=(i + 1))
-            messages.success(request, f'Plano "{plan.name}" foi atualizado e parcelas recriadas.')
+            update_installment_plan(plan, name=data['describe'], total_value=data['total_value'],
+                                    number_of_installments=data['number_of_installments'], account=data['account'],
+                                    category=data['category'], first_installment_date=data['first_installment_date'])
+            messages.success(request, f'Plano "{plan.name}" foi atualizado e parcelas sincronizadas.')
             return redirect(reverse('transactions_list'))
         else:
             messages.error(request, 'Erro ao atualizar plano. Verifique os campos.')
@@ -346,7 +261,7 @@ def installment_plan_delete(request, plan_pk):
     if request.method != 'POST': return redirect(reverse('transactions_list'))
     plan = get_object_or_404(InstallmentPlan, pk=plan_pk);
     plan_name = plan.name;
-    plan.delete()
+    delete_installment_plan(plan)
     messages.success(request, f'O plano "{plan_name}" e todas as suas parcelas foram excluídos.')
     return redirect(reverse('transactions_list'))
 
@@ -502,8 +417,8 @@ def account_list_create(request):
         accounts_qs = Account.objects.all()
     else:
         status_filter = 'active'; accounts_qs = Account.objects.filter(is_active=True)
-    accounts = accounts_qs.order_by('name');
-    context = {'form': form, 'accounts': accounts, 'current_filter': status_filter}
+    accounts = accounts_qs.select_related('balance_snapshot').order_by('name');
+    context = {'form': form, 'accounts': accounts, 'current_filter': status_filter, 'net_worth': net_worth()}
     return render(request, 'accounts.html', context)
 
 
@@ -559,6 +474,7 @@ def account_delete(request, pk):
 # VIEWS: CRUD de Metas (Sem alterações)
 # ===============================================
 @login_required
+@conditional_on_data_version
 def goals_list_create(request):
     if request.method == 'POST':
         form = GoalForm(request.POST)
@@ -569,35 +485,11 @@ def goals_list_create(request):
             messages.error(request, 'Erro ao criar meta. Verifique os campos.')
     else:
         form = GoalForm()
-    status_filter = request.GET.get('status', 'active');
-    goals_qs = Goal.objects.select_related('linked_category').all();
-    today = timezone.now().date();
-    all_goals_calculated = []
-    for goal in goals_qs:
-        current_amount = AccountEntry.objects.filter(category=goal.linked_category).aggregate(total=Sum('value')).get(
-            'total') or Decimal('0.00');
-        is_completed = current_amount >= goal.target_amount;
-        progress_percent = 0;
-        status = "Em Andamento";
-        status_color = "blue";
-        days_diff = (goal.target_date - today).days
-        if is_completed:
-            status, status_color = "Concluída!", "green"
-        elif days_diff < 0:
-            status, status_color = f"Atrasada em {-days_diff} dia(s)", "red"
-        if goal.target_amount > 0: progress_percent = round((current_amount / goal.target_amount) * 100, 2)
-        all_goals_calculated.append(
-            {'goal': goal, 'current_amount': float(current_amount), 'progress_percent': float(progress_percent),
-             'status': status, 'status_color': status_color,
-             'days_remaining': days_diff if days_diff >= 0 and not is_completed else None, 'is_completed': is_completed,
-             'days_diff_sort': days_diff})
-    if status_filter == 'completed':
-        goals_data = [g for g in all_goals_calculated if g['is_completed']]
-    elif status_filter == 'all':
-        goals_data = sorted(all_goals_calculated, key=lambda x: x['days_diff_sort'])
-    else:
-        status_filter = 'active'; goals_data = sorted([g for g in all_goals_calculated if not g['is_completed']],
-                                                      key=lambda x: x['days_diff_sort'])
+    status_filter = request.GET.get('status', 'active')
+    if status_filter not in ('completed', 'all'):
+        status_filter = 'active'
+    goals_qs = goals_with_progress(timezone.now().date(), status_filter)
+    goals_data = [goal_progress_row(goal) for goal in goals_qs]
     context = {'form': form, 'goals_data': goals_data, 'current_filter': status_filter};
     return render(request, 'goals.html', context)
 
@@ -632,6 +524,7 @@ def goals_delete(request, pk):
 # VIEWS: CRUD de Recorrências (Sem alterações)
 # ===============================================
 @login_required
+@conditional_on_data_version
 def recurring_transaction_list_create(request):
     if request.method == 'POST':
         form = RecurringTransactionForm(request.POST)
@@ -679,10 +572,7 @@ def recurring_transaction_toggle_active(request, pk):
     if request.method != 'POST': return redirect('recurring_transaction_list_create')
     instance = get_object_or_404(RecurringTransaction, pk=pk);
     instance.is_active = not instance.is_active
-    if instance.is_active:
-        instance.next_due_date = instance.calculate_next_due_date(from_date=instance.last_generated_date)
-    else:
-        instance.next_due_date = None
+    # save() recalcula next_due_date; a varredura do cron só considera as ativas.
     instance.save(update_fields=['is_active', 'next_due_date'])
     action = "reativada" if instance.is_active else "desativada";
     messages.success(request, f'Recorrência "{instance.describe}" {action} com sucesso.')
@@ -697,4 +587,38 @@ def recurring_transaction_delete(request, pk):
     instance_name = instance.describe;
     instance.delete()
     messages.success(request, f'Recorrência "{instance_name}" excluída com sucesso.')
-    return redirect(reverse('recurring_transaction_list_create') + '?status=active')
\ No newline at end of file
+    return redirect(reverse('recurring_transaction_list_create') + '?status=active')
+
+
+# ===============================================
+# VIEWS: Previsão de caixa (motor em finance/forecast.py)
+# ===============================================
+def _forecast_months(request):
+    try:
+        months = int(request.GET.get('months', FORECAST_DEFAULT_MONTHS))
+    except ValueError:
+        months = FORECAST_DEFAULT_MONTHS
+    return max(1, min(months, FORECAST_MAX_MONTHS))
+
+
+@login_required
+def forecast(request):
+    months = _forecast_months(request)
+    result = get_forecast(timezone.localdate(), months)
+    totals = result.totals
+    month_rows = [{'date': result.days[i], 'total': totals[i],
+                   'accounts': [account.balances[i] for account in result.accounts]}
+                  for i in result.month_ends()]
+    context = {
+        'forecast': result, 'months': months, 'month_options': [3, 6, 12, 24], 'month_rows': month_rows,
+        'chart_labels': [day.strftime('%d/%m/%y') for day in result.days],
+        'chart_totals': [float(value) for value in totals],
+    }
+    return render(request, 'forecast.html', context)
+
+
+@login_required
+def forecast_api(request):
+    result = get_forecast(timezone.localdate(), _forecast_months(request))
+    return JsonResponse(result.as_dict())
+
@@ -0,0 +1,97 @@
+"""
+Configuração do banco a partir do ambiente (DATABASE_URL e DB_CONNECTION_MODE).
+
+Modos de conexão do PostgreSQL:
+- pool: pool de conexões do próprio Django (psycopg 3 + psycopg_pool), para processos de
+  longa duração; cada requisição pega uma conexão pronta e a devolve ao terminar.
+- transaction: compatível com um pooler em modo transação (Supabase na porta 6543, PgBouncer);
+  a conexão fecha ao fim de cada requisição e não há cursores do lado do servidor (a exportação
+  então pagina por chave, finance/exporter.py).
+- persistent: uma conexão por processo, reaproveitada por DB_CONN_MAX_AGE segundos.
+
+Os modos ainda não foram medidos contra um PostgreSQL: nenhum é "mais rápido" por princípio.
+Meça com `manage.py benchmark_connections` antes de trocar o padrão de um ambiente.
+
+Perfis do SQLite (SQLITE_PROFILE), para quando DATABASE_URL não é definida:
+- default: pragmas padrão do SQLite (journal de rollback).
+- tuned: WAL, synchronous=NORMAL, mmap, cache maior e busy_timeout em toda conexão, com
+  transações de escrita IMMEDIATE; leitores não esperam mais pelos escritores.
+"""
+
+import os
+
+import dj_database_url
+
+CONNECTION_MODES = ('pool', 'transaction', 'persistent')
+# Versões antigas do dj_database_url ainda devolvem o nome do backend anterior ao Django 3.0.
+POSTGRES_ENGINES = ('django.db.backends.postgresql', 'django.db.backends.postgresql_psycopg2')
+SQLITE_PROFILES = ('default', 'tuned')
+
+
+def _int(environ, name, default):
+    return int(environ.get(name) or default)
+
+
+def sqlite_options(profile, environ=os.environ):
+    """OPTIONS do backend sqlite3 para o perfil (vazio no perfil default)."""
+    if profile not in SQLITE_PROFILES:
+        raise ValueError(f"SQLITE_PROFILE inválido: {profile!r} (opções: {', '.join(SQLITE_PROFILES)}).")
+    if profile == 'default':
+        return {}
+    busy_timeout_ms = _int(environ, 'SQLITE_BUSY_TIMEOUT_MS', 5000)
+    pragmas = [
+        'PRAGMA journal_mode=WAL',        # leitores e um escritor ao mesmo tempo
+        'PRAGMA synchronous=NORMAL',      # seguro com WAL; só o último commit pode se perder numa queda de energia
+        f"PRAGMA mmap_size={_int(environ, 'SQLITE_MMAP_BYTES', 256 * 1024 * 1024)}",
+        f"PRAGMA cache_size=-{_int(environ, 'SQLITE_CACHE_KIB', 64 * 1024)}",  # negativo = KiB
+        f'PRAGMA busy_timeout={busy_timeout_ms}',
+        'PRAGMA temp_store=MEMORY',
+    ]
+    return {
+        'init_command': '; '.join(pragmas),
+        # Escritas reservam o banco no BEGIN: sem o "database is locked" imediato de quando
+        # duas transações tentam promover a leitura para escrita.
+        'transaction_mode': 'IMMEDIATE',
+    }
+
+
+def default_connection_mode(environ):
+    # Na Vercel cada lambda abre sua própria conexão e nenhum pool sobrevive entre elas: o pooler
+    # do Supabase (modo transação) limita quantas chegam ao servidor.
+    return 'transaction' if environ.get('VERCEL') else 'pool'
+
+
+def database_config(default_url, environ=os.environ):
+    """Dicionário de DATABASES['default'] para DATABASE_URL (ou default_url) e o modo escolhido."""
+    config = dj_database_url.parse(environ.get('DATABASE_URL') or default_url)
+    if config['ENGINE'] == 'django.db.backends.sqlite3':
+        config['OPTIONS'] = sqlite_options(environ.get('SQLITE_PROFILE') or 'default', environ)
+        return config
+    if config['ENGINE'] not in POSTGRES_ENGINES:
+        return config
+
+    mode = environ.get('DB_CONNECTION_MODE') or default_connection_mode(environ)
+    if mode not in CONNECTION_MODES:
+        raise ValueError(f"DB_CONNECTION_MODE inválido: {mode!r} (opções: {', '.join(CONNECTION_MODES)}).")
+
+    config.update({
+        'ENGINE': 'django.db.backends.postgresql',
+        'CONN_MAX_AGE': 0,
+        'CONN_HEALTH_CHECKS': True,    # no modo pool vira o check do psycopg_pool
+        'OPTIONS': {
+            'client_encoding': 'UTF8', # Correção para problemas de Unicode
+            'sslmode': environ.get('DB_SSLMODE', 'require'),  # Garante conexão SSL com Supabase
+        },
+    })
+    if mode == 'pool':
+        config['OPTIONS']['pool'] = {
+            'min_size': _int(environ, 'DB_POOL_MIN_SIZE', 1),
+            'max_size': _int(environ, 'DB_POOL_MAX_SIZE', 4),
+            'timeout': _int(environ, 'DB_POOL_TIMEOUT', 10),  # espera máxima por uma conexão livre
+        }
+    elif mode == 'transaction':
+        # O pooler troca a conexão do servidor entre transações: cursores nomeados se perderiam.
+        config['DISABLE_SERVER_SIDE_CURSORS'] = True
+    else:
+        config['CONN_MAX_AGE'] = _int(environ, 'DB_CONN_MAX_AGE', 600)
+    return config
@@ -12,11 +12,16 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 
 from pathlib import Path
 import os
-import dj_database_url
-from dotenv import load_dotenv
-import psycopg2
+import tempfile
 
-load_dotenv()
+from .database import database_config
+
+# Na Vercel as variáveis já vêm do ambiente; o .env (e o dotenv) só servem no desenvolvimento.
+# O driver do PostgreSQL não é importado aqui: o backend do Django o carrega quando é usado.
+SERVERLESS = bool(os.getenv('VERCEL'))
+if not SERVERLESS:
+    from dotenv import load_dotenv
+    load_dotenv()
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -44,7 +49,14 @@ INSTALLED_APPS = [
     'finance'
 ]
 
+# Admin desligado por padrão na função serverless (é a maior parte do tempo de importação das
+# apps); ADMIN_ENABLED=1 o liga de volta.
+ADMIN_ENABLED = os.getenv('ADMIN_ENABLED', '0' if SERVERLESS else '1') == '1'
+if not ADMIN_ENABLED:
+    INSTALLED_APPS.remove('django.contrib.admin')
+
 MIDDLEWARE = [
+    'finance.middleware.RequestMetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
@@ -53,13 +65,20 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'finance.middleware.ReferenceDataMiddleware',
+    'finance.middleware.ProfilingMiddleware',
 ]
 
+# Na Vercel os estáticos são servidos pela rota /static do vercel.json, sem passar pelo WhiteNoise.
+if SERVERLESS:
+    INSTALLED_APPS.remove('whitenoise.runserver_nostatic')
+    MIDDLEWARE.remove('whitenoise.middleware.WhiteNoiseMiddleware')
+
 ROOT_URLCONF = 'financial_management.urls'
 
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        'BACKEND': 'finance.metrics.TimedDjangoTemplates',  # DjangoTemplates com tempo de renderização medido
         'DIRS': [BASE_DIR / 'templates'],
         'APP_DIRS': True,
         'OPTIONS': {
@@ -74,28 +93,23 @@ TEMPLATES = [
 
 WSGI_APPLICATION = 'financial_management.wsgi.app'
 
-DB_CONFIG = dj_database_url.config(
-    # Fallback para SQLite: Se DATABASE_URL não for definida, usa o SQLite local.
-    default=f'sqlite:///{BASE_DIR / "db.sqlite3"}',
-)
-
-# 2. Adiciona opções específicas do Django *APÓS* a análise da URL
-#    (Incluindo conn_max_age, conn_health_checks, sslmode e codificação)
-if DB_CONFIG['ENGINE'] == 'django.db.backends.postgresql':
-    DB_CONFIG.update({
-        'CONN_MAX_AGE': 600,             # Reutiliza conexões por 10 minutos
-        'CONN_HEALTH_CHECKS': True,    # Verifica se a conexão ainda é válida
-        'OPTIONS': {
-            'client_encoding': 'UTF8', # Correção para problemas de Unicode
-            'sslmode': 'require',      # Garante conexão SSL com Supabase
-        }
-    })
-# Se for SQLite (fallback), não adiciona nada extra.
+# Fallback para SQLite: Se DATABASE_URL não for definida, usa o SQLite local
+# (SQLITE_PROFILE=tuned liga WAL, mmap e busy_timeout).
+# No PostgreSQL, DB_CONNECTION_MODE escolhe pool, transaction (pooler do Supabase) ou persistent;
+# veja financial_management/database.py.
+DB_CONFIG = database_config(f'sqlite:///{BASE_DIR / "db.sqlite3"}')
 
 DATABASES = {
     'default': DB_CONFIG
 }
 
+# Views assíncronas (dashboard) rodam os grupos de consultas independentes ao mesmo tempo, cada um
+# numa conexão própria (no modo pool, limitados às vagas do pool). Desligado por padrão no SQLite
+# local, na Vercel e no modo transaction, onde cada grupo abriria uma conexão nova a cada requisição.
+CONCURRENT_QUERY_GROUPS = os.getenv('CONCURRENT_QUERY_GROUPS', '0' if (
+    DB_CONFIG['ENGINE'] == 'django.db.backends.sqlite3' or SERVERLESS or DB_CONFIG.get('DISABLE_SERVER_SIDE_CURSORS')
+) else '1') == '1'
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -151,3 +165,43 @@ LOGOUT_REDIRECT_URL = '/accounts/login/'
 
 
 
+# Orçamento de tempo (segundos) do cron de recorrências; fica abaixo do limite da função serverless.
+RECURRENCE_CRON_MAX_SECONDS = float(os.getenv('RECURRENCE_CRON_MAX_SECONDS', '8'))
+
+# Orçamento de consultas SQL por view (nome da URL), aplicado às leituras (GET/HEAD). Acima dele
+# o RequestMetricsMiddleware registra um aviso no logger finance.metrics.
+VIEW_QUERY_BUDGETS = {
+    'dashboard': 8,
+    'transactions_list': 8,
+    'goals_list_create': 6,
+    'recurring_transaction_list_create': 6,
+    'account_list_create': 6,
+    'category_list_create': 6,
+    'forecast': 6,
+    'forecast_api': 6,
+}
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'finance.metrics': {
+            'handlers': ['console'],
+            'level': os.getenv('METRICS_LOG_LEVEL', 'INFO'),
+            'propagate': False,
+        },
+    },
+}
+
+# Perfis sob demanda (ProfilingMiddleware e --profile nos comandos): diretório e tamanho máximo,
+# acima do qual os perfis mais antigos são apagados. Na Vercel só o diretório temporário aceita escrita.
+PROFILING_DIR = os.getenv('PROFILING_DIR', str(Path(tempfile.gettempdir()) / 'profiles' if SERVERLESS
+                                               else BASE_DIR / 'profiles'))
+PROFILING_MAX_BYTES = int(os.getenv('PROFILING_MAX_BYTES', str(50 * 1024 * 1024)))
+
+# Orçamento do cold start (ms até a aplicação WSGI ficar pronta), conferido por startup_profile.
+# A configuração padrão (sem SERVERLESS) fica entre 370 e 430 ms; a folga absorve essa variação.
+COLD_START_BUDGET_MS = float(os.getenv('COLD_START_BUDGET_MS', '500'))
@@ -1,19 +1,27 @@
 # financial_management/urls.py
 
-from django.contrib import admin
 from django.urls import path, include
-from django.http import HttpResponse  # <--- IMPORT ADICIONADO
-from django.core import management  # <--- IMPORT ADICIONADO
+from django.http import JsonResponse
 from django.conf import settings  # <--- IMPORT ADICIONADO
+from django.utils import timezone
 
 
 # ===============================================
 # FUNÇÃO SIMPLES PARA A VERCEL CHAMAR O CRON
 # ===============================================
+def _budget_param(request, name, cast, default):
+    try:
+        return cast(request.GET[name])
+    except (KeyError, ValueError):
+        return default
+
+
 def vercel_cron_handler(request):
     """
     View simples que a Vercel chama.
-    Ela executa o management command e retorna uma resposta HTTP.
+    Gera as recorrências pendentes dentro de um orçamento de tempo/linhas (para caber no
+    limite da função serverless) e retorna um relatório JSON; se "has_more" vier true,
+    a próxima chamada continua das recorrências ainda vencidas (next_due_date <= hoje).
     Adicione uma camada de segurança se precisar (ex: verificar um header secreto).
     """
     # Simples verificação de segurança (opcional, mas recomendado)
@@ -22,19 +30,21 @@ def vercel_cron_handler(request):
     # expected_secret = f"Bearer {settings.CRON_SECRET}"
     # if not settings.CRON_SECRET or auth_header != expected_secret:
     #    return HttpResponse("Unauthorized", status=401)
+    from finance.recurrences import generate_due_entries  # importação tardia: só o cron usa, fora do cold start
 
+    max_seconds = _budget_param(request, 'max_seconds', float, settings.RECURRENCE_CRON_MAX_SECONDS)
+    max_recurrences = _budget_param(request, 'max_recurrences', int, None)
     try:
-        management.call_command('generate_recurrences')
-        return HttpResponse("Cron job executed successfully.")
+        result = generate_due_entries(timezone.now().date(), max_seconds=max_seconds, max_recurrences=max_recurrences)
+        return JsonResponse({'status': 'ok', **result.as_report()})
     except Exception as e:
         # Logar o erro seria ideal aqui
-        return HttpResponse(f"Error executing cron job: {e}", status=500)
+        return JsonResponse({'status': 'error', 'error': str(e)}, status=500)
 
 
 # ===============================================
 
 urlpatterns = [
-    path('admin/', admin.site.urls),
     path('accounts/', include('django.contrib.auth.urls')),  # Para login/logout
     path('', include('finance.urls')),  # Inclui as URLs da sua app finance
 
@@ -46,5 +56,9 @@ urlpatterns = [
 
 ]
 
+if settings.ADMIN_ENABLED:
+    from django.contrib import admin
+    urlpatterns.insert(0, path('admin/', admin.site.urls))
+
 if settings.DEBUG:
     urlpatterns += static(settings.STATIC_URL, document_root=settings.STATICFILES_DIRS[0])